@@ -0,0 +1,187 @@
+import os
+import shutil
+import threading
+import contextlib
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import pandas as pd
+
+from wandb_utils import log_artifact as modulo_log_artifact
+from wandb_utils.utils import download_file, extract_csv_from_zip
+from wandb_utils.prsa import carregar_prsa, gravar_parquet_prsa
+from wandb_utils.consulta import ArmazemPRSA
+from wandb_utils.imputacao import imputar
+from wandb_utils.atributos import gerar_atributos
+from wandb_utils.aqi import CalculadoraAQI
+from wandb_utils.validacao import validar
+from wandb_utils.uci import ler_csv_uci
+
+from .dados_sinteticos import gravar_csv_uci, gravar_zip_prsa
+
+# Cada caso é um gerenciador de contexto que prepara os dados (fora da medição) e entrega
+# ``(executar, volume)``: a função medida a cada repetição e ``{"linhas", "bytes"}``.
+CASOS = {}
+
+
+def _caso(nome):
+    def registrar(funcao):
+        CASOS[nome] = contextlib.contextmanager(funcao)
+        return funcao
+    return registrar
+
+
+def _tamanho(caminhos):
+    return sum(os.path.getsize(c) for c in caminhos)
+
+
+class _HandlerSilencioso(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@_caso("download")
+def caso_download(diretorio_dados, n_linhas, diretorio_trabalho):
+    caminho_zip, _ = gravar_zip_prsa(diretorio_dados, n_linhas)
+    handler = functools.partial(_HandlerSilencioso, directory=os.path.dirname(caminho_zip))
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/{os.path.basename(caminho_zip)}"
+    destino = os.path.join(diretorio_trabalho, "download.zip")
+
+    def executar():
+        if not download_file(url, destino):
+            raise RuntimeError(f"Falha ao baixar {url}")
+
+    try:
+        yield executar, {"linhas": n_linhas, "bytes": os.path.getsize(caminho_zip)}
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+@_caso("extract")
+def caso_extract(diretorio_dados, n_linhas, diretorio_trabalho):
+    caminho_zip, caminhos = gravar_zip_prsa(diretorio_dados, n_linhas)
+    destino = os.path.join(diretorio_trabalho, "extraidos")
+
+    def executar():
+        shutil.rmtree(destino, ignore_errors=True)
+        if not extract_csv_from_zip(caminho_zip, destino, delete_zip_after_extraction=False, max_workers=4):
+            raise RuntimeError(f"Nenhum CSV extraído de {caminho_zip}")
+
+    yield executar, {"linhas": n_linhas, "bytes": _tamanho(caminhos)}
+
+
+@_caso("parse")
+def caso_parse(diretorio_dados, n_linhas, diretorio_trabalho):
+    _, caminhos = gravar_zip_prsa(diretorio_dados, n_linhas)
+    yield (lambda: carregar_prsa(caminhos)), {"linhas": n_linhas, "bytes": _tamanho(caminhos)}
+
+
+@_caso("parse_uci")
+def caso_parse_uci(diretorio_dados, n_linhas, diretorio_trabalho):
+    caminho = gravar_csv_uci(diretorio_dados, n_linhas)
+    yield (lambda: ler_csv_uci(caminho)), {"linhas": n_linhas, "bytes": _tamanho([caminho])}
+
+
+@_caso("validate")
+def caso_validate(diretorio_dados, n_linhas, diretorio_trabalho):
+    _, caminhos = gravar_zip_prsa(diretorio_dados, n_linhas)
+    yield (lambda: validar(caminhos)), {"linhas": n_linhas, "bytes": _tamanho(caminhos)}
+
+
+@_caso("impute")
+def caso_impute(diretorio_dados, n_linhas, diretorio_trabalho):
+    _, caminhos = gravar_zip_prsa(diretorio_dados, n_linhas)
+    df = carregar_prsa(caminhos)
+    yield (lambda: imputar(df, "interpolacao")), {"linhas": n_linhas, "bytes": int(df.memory_usage(deep=True).sum())}
+
+
+@_caso("features")
+def caso_features(diretorio_dados, n_linhas, diretorio_trabalho):
+    _, caminhos = gravar_zip_prsa(diretorio_dados, n_linhas)
+    df = carregar_prsa(caminhos)
+    yield (lambda: gerar_atributos(df)), {"linhas": n_linhas, "bytes": int(df.memory_usage(deep=True).sum())}
+
+
+@_caso("aqi")
+def caso_aqi(diretorio_dados, n_linhas, diretorio_trabalho):
+    _, caminhos = gravar_zip_prsa(diretorio_dados, n_linhas)
+    df = carregar_prsa(caminhos)
+    yield (lambda: CalculadoraAQI().processar(df)), {"linhas": n_linhas, "bytes": int(df.memory_usage(deep=True).sum())}
+
+
+def _armazem_consulta(diretorio_dados, n_linhas, diretorio_trabalho):
+    _, caminhos = gravar_zip_prsa(diretorio_dados, n_linhas)
+    dataset = os.path.join(diretorio_trabalho, "parquet")
+    gravar_parquet_prsa(carregar_prsa(caminhos), dataset)
+    armazem = ArmazemPRSA(dataset)
+    # Um mês de uma estação no meio do histórico: o volume lido é o mesmo em qualquer tamanho
+    estacao = armazem.estacoes[-1]
+    primeiro, ultimo = armazem.intervalo(estacao)
+    inicio = (primeiro + (ultimo - primeiro) / 2).floor("D")
+    consulta = {"estacoes": [estacao], "inicio": inicio, "fim": inicio + pd.Timedelta(days=31), "colunas": ["PM2.5", "TEMP"]}
+    resultado = armazem.consultar(**consulta)
+    # "linhas" é o tamanho do histórico (chave de comparação entre execuções); "bytes" é o
+    # que a consulta devolve. A latência deve ficar estável conforme o histórico cresce.
+    volume = {"linhas": n_linhas, "bytes": int(resultado.memory_usage(deep=True).sum())}
+    return armazem, consulta, volume
+
+
+@_caso("query")
+def caso_query(diretorio_dados, n_linhas, diretorio_trabalho):
+    armazem, consulta, volume = _armazem_consulta(diretorio_dados, n_linhas, diretorio_trabalho)
+
+    def executar():
+        # Sem cache: mede a leitura dos grupos de linhas localizados pelo índice
+        armazem.cache.limpar()
+        armazem.consultar(**consulta)
+
+    yield executar, volume
+
+
+@_caso("query_cache")
+def caso_query_cache(diretorio_dados, n_linhas, diretorio_trabalho):
+    armazem, consulta, volume = _armazem_consulta(diretorio_dados, n_linhas, diretorio_trabalho)
+    yield (lambda: armazem.consultar(**consulta)), volume
+
+
+class _ArtefatoFalso:
+    def __init__(self, nome, type=None, description=None):
+        self.nome = nome
+        self.metadata = {}
+        self.arquivos = []
+
+    def add_file(self, caminho, name=None):
+        self.arquivos.append(caminho)
+
+    def add_dir(self, caminho):
+        self.arquivos.append(caminho)
+
+
+class _ExecucaoFalsa:
+    project = None
+
+    def log_artifact(self, artefato):
+        pass
+
+
+@_caso("log_artifact")
+def caso_log_artifact(diretorio_dados, n_linhas, diretorio_trabalho):
+    # W&B substituído por stubs: mede a deduplicação (hash do conteúdo) e a montagem do artefato
+    _, caminhos = gravar_zip_prsa(diretorio_dados, n_linhas)
+    originais = modulo_log_artifact.wandb, modulo_log_artifact.obter_metadados_artefato
+    modulo_log_artifact.wandb = type("WandbFalso", (), {"Artifact": _ArtefatoFalso})
+    modulo_log_artifact.obter_metadados_artefato = lambda *args, **kwargs: None
+    execucao = _ExecucaoFalsa()
+
+    def executar():
+        modulo_log_artifact.log_artifact("prsa_benchmark", "raw_data", "benchmark", caminhos, execucao,
+                                         deduplicar=True, projeto="benchmark")
+
+    try:
+        yield executar, {"linhas": n_linhas, "bytes": _tamanho(caminhos)}
+    finally:
+        modulo_log_artifact.wandb, modulo_log_artifact.obter_metadados_artefato = originais
@@ -0,0 +1,174 @@
+import os
+import zipfile
+import logging
+import numpy as np
+import pandas as pd
+
+from wandb_utils.prsa import COLUNAS_PRSA, COLUNAS_POLUENTES, COLUNAS_METEOROLOGICAS, DIRECOES_VENTO
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+# As 12 estações do conjunto PRSA2017
+ESTACOES = [
+    "Aotizhongxin", "Changping", "Dingling", "Dongsi", "Guanyuan", "Gucheng",
+    "Huairou", "Nongzhanguan", "Shunyi", "Tiantan", "Wanliu", "Wanshouxigong",
+]
+INICIO = np.datetime64("2013-03-01T00", "h")
+LINHAS_POR_BLOCO = 1_000_000
+FRACAO_FALTANTES = 0.02
+
+# Média e amplitude diária aproximadas de cada medição
+_PERFIL = {
+    "PM2.5": (80.0, 40.0), "PM10": (100.0, 45.0), "SO2": (15.0, 8.0), "NO2": (50.0, 20.0),
+    "CO": (1200.0, 500.0), "O3": (55.0, 35.0), "TEMP": (13.0, 8.0), "PRES": (1010.0, 5.0),
+    "DEWP": (2.0, 6.0), "RAIN": (0.1, 0.1), "WSPM": (1.7, 0.8),
+}
+
+
+def interpretar_tamanho(texto):
+    """Converte ``"10k"``, ``"1M"`` ou ``"50M"`` em número de linhas."""
+    texto = str(texto).strip().lower().replace("_", "")
+    multiplicadores = {"k": 1_000, "m": 1_000_000}
+    if texto and texto[-1] in multiplicadores:
+        return int(float(texto[:-1]) * multiplicadores[texto[-1]])
+    return int(texto)
+
+
+def gerar_bloco_prsa(estacao, inicio, n_linhas, gerador, primeiro_no=1):
+    """
+    Gera ``n_linhas`` horas consecutivas de uma estação no formato PRSA, a partir da hora
+    ``inicio`` (contada desde 2013-03-01 00h).
+
+    Os valores seguem um ciclo diário com ruído, e cerca de 2% das medições e das direções
+    do vento ficam faltantes, como no conjunto real.
+
+    Retorna
+    -------
+    pandas.DataFrame
+    """
+    horas = np.arange(inicio, inicio + n_linhas)
+    instantes = INICIO + horas.astype("timedelta64[h]")
+    dias = instantes.astype("datetime64[D]")
+    meses = instantes.astype("datetime64[M]")
+    anos = instantes.astype("datetime64[Y]")
+    dados = {
+        "No": np.arange(primeiro_no, primeiro_no + n_linhas, dtype=np.int64),
+        "year": anos.astype(np.int64) + 1970,
+        "month": (meses - anos).astype(np.int64) + 1,
+        "day": (dias - meses).astype(np.int64) + 1,
+        "hour": (instantes - dias).astype(np.int64),
+    }
+    ciclo = np.sin(2 * np.pi * (horas % 24) / 24)
+    for coluna in COLUNAS_POLUENTES + COLUNAS_METEOROLOGICAS:
+        media, amplitude = _PERFIL[coluna]
+        valores = media + amplitude * ciclo + gerador.normal(0, amplitude / 2, n_linhas)
+        valores = np.round(np.abs(valores), 1)
+        valores[gerador.random(n_linhas) < FRACAO_FALTANTES] = np.nan
+        dados[coluna] = valores
+    wd = np.array(DIRECOES_VENTO, dtype=object)[gerador.integers(0, len(DIRECOES_VENTO), n_linhas)]
+    wd[gerador.random(n_linhas) < FRACAO_FALTANTES] = None
+    dados["wd"] = wd
+    dados["station"] = estacao
+    return pd.DataFrame(dados, columns=COLUNAS_PRSA)
+
+
+def gravar_csvs_prsa(diretorio, n_linhas, n_estacoes=len(ESTACOES), semente=0):
+    """
+    Grava um CSV por estação (``PRSA_Data_<estacao>_sintetico.csv``) somando ``n_linhas``.
+
+    Os dados são gerados e gravados em blocos, de modo que mesmo 50M de linhas cabem em
+    memória. Arquivos já existentes com o mesmo tamanho pedido são reaproveitados.
+
+    Retorna
+    -------
+    list
+        Os caminhos dos CSVs.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    estacoes = ESTACOES[:max(1, min(n_estacoes, len(ESTACOES)))]
+    marcador = os.path.join(diretorio, f".completo_{n_linhas}_{len(estacoes)}_{semente}")
+    caminhos = [os.path.join(diretorio, f"PRSA_Data_{estacao}_sintetico.csv") for estacao in estacoes]
+    if os.path.exists(marcador) and all(os.path.exists(c) for c in caminhos):
+        return caminhos
+
+    gerador = np.random.default_rng(semente)
+    por_estacao = np.full(len(estacoes), n_linhas // len(estacoes))
+    por_estacao[: n_linhas % len(estacoes)] += 1
+    logger.info(f"Gerando {n_linhas} linhas sintéticas PRSA em '{diretorio}'")
+    for estacao, caminho, total in zip(estacoes, caminhos, por_estacao):
+        with open(caminho, "w", encoding="utf-8", newline="") as f:
+            for inicio in range(0, int(total), LINHAS_POR_BLOCO):
+                bloco = gerar_bloco_prsa(estacao, inicio, min(LINHAS_POR_BLOCO, int(total) - inicio), gerador, inicio + 1)
+                bloco.to_csv(f, index=False, header=inicio == 0, float_format="%.1f")
+    open(marcador, "w").close()
+    return caminhos
+
+
+def gravar_zip_prsa(diretorio, n_linhas, n_estacoes=len(ESTACOES), semente=0):
+    """
+    Gera os CSVs sintéticos e os empacota em ``PRSA_sintetico_<n_linhas>.zip``, com a mesma
+    estrutura de pastas do arquivo original.
+
+    Retorna
+    -------
+    tuple
+        ``(caminho_zip, caminhos_csv)``.
+    """
+    caminhos = gravar_csvs_prsa(os.path.join(diretorio, f"csv_{n_linhas}"), n_linhas, n_estacoes, semente)
+    caminho_zip = os.path.join(diretorio, f"PRSA_sintetico_{n_linhas}.zip")
+    if not os.path.exists(caminho_zip):
+        temporario = caminho_zip + ".tmp"
+        with zipfile.ZipFile(temporario, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            for caminho in caminhos:
+                zf.write(caminho, f"PRSA_Data_sintetico/{os.path.basename(caminho)}")
+        os.replace(temporario, caminho_zip)
+    return caminho_zip, caminhos
+
+
+def gravar_csv_uci(diretorio, n_linhas, semente=0):
+    """
+    Grava ``AirQuality_sintetico_<n_linhas>.csv`` no formato do AirQuality.csv do UCI: ``;``
+    como separador, vírgula decimal, Date/Time separados, -200 nos faltantes e duas colunas
+    vazias no fim de cada linha. Os valores vêm de :func:`gerar_bloco_prsa` (CO em mg/m³).
+
+    Retorna
+    -------
+    str
+        O caminho do CSV.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, f"AirQuality_sintetico_{n_linhas}.csv")
+    if os.path.exists(caminho):
+        return caminho
+    gerador = np.random.default_rng(semente)
+    logger.info(f"Gerando {n_linhas} linhas sintéticas UCI em '{caminho}'")
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8", newline="") as f:
+        for inicio in range(0, n_linhas, LINHAS_POR_BLOCO):
+            bloco = gerar_bloco_prsa(ESTACOES[0], inicio, min(LINHAS_POR_BLOCO, n_linhas - inicio), gerador)
+            instantes = pd.DatetimeIndex(INICIO + np.arange(inicio, inicio + len(bloco)).astype("timedelta64[h]"))
+            uci = pd.DataFrame({
+                "Date": instantes.strftime("%d/%m/%Y"),
+                "Time": instantes.strftime("%H.%M.%S"),
+                "CO(GT)": bloco["CO"] / 1000,
+                "PT08.S1(CO)": bloco["CO"].round(),
+                "NMHC(GT)": bloco["SO2"].round(),
+                "C6H6(GT)": bloco["PM2.5"] / 8,
+                "PT08.S2(NMHC)": bloco["PM10"].round() * 10,
+                "NOx(GT)": (bloco["NO2"] * 2).round(),
+                "PT08.S3(NOx)": bloco["PRES"].round(),
+                "NO2(GT)": bloco["NO2"].round(),
+                "PT08.S4(NO2)": bloco["O3"].round() * 20,
+                "PT08.S5(O3)": bloco["O3"].round() * 15,
+                "T": bloco["TEMP"],
+                "RH": (bloco["WSPM"] * 25).clip(upper=100),
+                "AH": bloco["DEWP"] / 10,
+                "": "",
+                " ": "",
+            })
+            texto = uci.to_csv(sep=";", decimal=",", index=False, header=inicio == 0, na_rep="-200", float_format="%.4g")
+            # O cabeçalho original termina em ";;", sem nomes nas colunas vazias
+            f.write(texto.replace("; \n", ";\n", 1) if inicio == 0 else texto)
+    os.replace(temporario, caminho)
+    return caminho
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .casos import CASOS
+from .dados_sinteticos import interpretar_tamanho
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+TAMANHOS_PADRAO = "10k,100k,1M"
+HISTORICO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "historico.json")
+PERCENTIS = (50, 90, 99)
+
+
+def pico_rss_mb():
+    """Pico de memória residente do processo atual, em MiB (None se indisponível)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é dado em KiB no Linux e em bytes no macOS
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def resumir(nome, volume, latencias, repeticoes):
+    """Resume as latências (em segundos) de um caso: percentis, vazão e pico de RSS."""
+    latencias = np.asarray(latencias)
+    mediana = float(np.percentile(latencias, 50))
+    return {
+        "caso": nome,
+        "linhas": volume["linhas"],
+        "bytes": volume["bytes"],
+        "repeticoes": repeticoes,
+        "latencia_ms": {
+            "min": float(latencias.min() * 1000),
+            "media": float(latencias.mean() * 1000),
+            "max": float(latencias.max() * 1000),
+            **{f"p{p}": float(np.percentile(latencias, p) * 1000) for p in PERCENTIS},
+        },
+        # Vazão calculada sobre a mediana, menos sensível a repetições atípicas
+        "linhas_por_segundo": volume["linhas"] / mediana if mediana else None,
+        "mb_por_segundo": volume["bytes"] / (1024 * 1024) / mediana if mediana else None,
+        "pico_rss_mb": pico_rss_mb(),
+    }
+
+
+def executar_caso(nome, n_linhas, diretorio_dados, repeticoes=5, aquecimento=1):
+    """
+    Prepara e mede um caso: ``aquecimento`` execuções descartadas e ``repeticoes`` medidas.
+
+    Retorna
+    -------
+    dict
+        O resumo de :func:`resumir`.
+    """
+    diretorio_trabalho = tempfile.mkdtemp(prefix=f"bench_{nome}_")
+    try:
+        with CASOS[nome](diretorio_dados, n_linhas, diretorio_trabalho) as (executar, volume):
+            for _ in range(aquecimento):
+                executar()
+            latencias = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                executar()
+                latencias.append(time.perf_counter() - inicio)
+        return resumir(nome, volume, latencias, repeticoes)
+    finally:
+        shutil.rmtree(diretorio_trabalho, ignore_errors=True)
+
+
+def executar_isolado(nome, n_linhas, diretorio_dados, repeticoes=5, aquecimento=1):
+    """Executa o caso em um processo novo, para que o pico de RSS seja só dele."""
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+        return executor.submit(executar_caso, nome, n_linhas, diretorio_dados, repeticoes, aquecimento).result()
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def carregar_historico(caminho):
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def salvar_historico(caminho, historico):
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(historico, f, indent=2)
+    os.replace(temporario, caminho)
+
+
+def comparar(anterior, atual, tolerancia=0.10):
+    """
+    Compara duas execuções do histórico, caso a caso e tamanho a tamanho.
+
+    Retorna
+    -------
+    list
+        Mensagens das regressões: latência p50 ou pico de RSS acima de ``1 + tolerancia``
+        vezes o valor anterior.
+    """
+    referencias = {(r["caso"], r["linhas"]): r for r in anterior.get("resultados", [])}
+    regressoes = []
+    for resultado in atual["resultados"]:
+        referencia = referencias.get((resultado["caso"], resultado["linhas"]))
+        if referencia is None:
+            continue
+        metricas = [
+            ("latência p50", referencia["latencia_ms"]["p50"], resultado["latencia_ms"]["p50"], "ms"),
+            ("pico de RSS", referencia.get("pico_rss_mb"), resultado.get("pico_rss_mb"), "MiB"),
+        ]
+        for metrica, antes, depois, unidade in metricas:
+            if antes and depois and depois > antes * (1 + tolerancia):
+                regressoes.append(
+                    f"{resultado['caso']} ({resultado['linhas']} linhas): {metrica} {antes:.1f} -> {depois:.1f} {unidade} "
+                    f"(+{(depois / antes - 1) * 100:.0f}%, commit {anterior.get('commit')})"
+                )
+    return regressoes
+
+
+def go(args):
+    tamanhos = [interpretar_tamanho(t) for t in args.sizes.split(",") if t.strip()]
+    casos = [c.strip() for c in args.cases.split(",") if c.strip()] if args.cases else list(CASOS)
+    desconhecidos = set(casos) - set(CASOS)
+    if desconhecidos:
+        raise ValueError(f"Casos desconhecidos: {sorted(desconhecidos)}. Disponíveis: {sorted(CASOS)}")
+
+    medir = executar_caso if args.no_isolation else executar_isolado
+    resultados = []
+    for n_linhas in tamanhos:
+        for nome in casos:
+            logger.info(f"Medindo {nome} com {n_linhas} linhas")
+            resultado = medir(nome, n_linhas, args.data_dir, args.repetitions, args.warmup)
+            resultados.append(resultado)
+            latencia = resultado["latencia_ms"]
+            logger.info(
+                f"{nome:>12} {n_linhas:>10} linhas | p50 {latencia['p50']:9.1f} ms | p90 {latencia['p90']:9.1f} ms | "
+                f"{resultado['linhas_por_segundo']:,.0f} linhas/s | {resultado['mb_por_segundo']:.1f} MiB/s | "
+                f"pico RSS {resultado['pico_rss_mb'] or 0:.0f} MiB"
+            )
+
+    execucao = {
+        "commit": _commit_atual(),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+    historico = carregar_historico(args.history)
+    regressoes = comparar(historico[-1], execucao, args.tolerance) if historico else []
+    historico.append(execucao)
+    salvar_historico(args.history, historico)
+    logger.info(f"Resultados adicionados ao histórico '{args.history}'")
+
+    for regressao in regressoes:
+        logger.warning(f"Regressão: {regressao}")
+    if regressoes and args.fail_on_regression:
+        sys.exit(1)
+    return execucao
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos críticos do ETL com dados PRSA sintéticos")
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        default=TAMANHOS_PADRAO,
+        help=f"Tamanhos, em linhas, separados por vírgula; aceita k e M, ex.: 10k,1M,50M (padrão: {TAMANHOS_PADRAO})"
+    )
+    parser.add_argument(
+        "--cases",
+        type=str,
+        default=None,
+        help=f"Casos separados por vírgula (padrão: todos: {','.join(CASOS)})"
+    )
+    parser.add_argument("--repetitions", type=int, default=5, help="Repetições medidas por caso (padrão: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="Execuções de aquecimento descartadas (padrão: 1)")
+    parser.add_argument(
+        "--data_dir",
+        type=str,
+        default=os.path.join(tempfile.gettempdir(), "air_quality_benchmarks"),
+        help="Diretório dos dados sintéticos, reaproveitados entre execuções (padrão: <tmp>/air_quality_benchmarks)"
+    )
+    parser.add_argument(
+        "--history",
+        type=str,
+        default=HISTORICO_PADRAO,
+        help="Arquivo JSON com o histórico das execuções (padrão: benchmarks/historico.json)"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Aumento relativo de latência p50 ou pico de RSS considerado regressão (padrão: 0.10)"
+    )
+    parser.add_argument(
+        "--fail_on_regression",
+        action="store_true",
+        help="Termina com código 1 se houver regressão em relação à execução anterior"
+    )
+    parser.add_argument(
+        "--no_isolation",
+        action="store_true",
+        help="Mede todos os casos neste processo (mais rápido, mas o pico de RSS passa a ser cumulativo)"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    go(build_parser().parse_args())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+import argparse
+import os
+import shutil
+import logging
+import wandb
+from wandb_utils.agregacao import agregar, ROLLUPS, GLOBAL
+from wandb_utils.log_artifact import log_artifact
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def write_aggregates(aggregate, output_dir, quantiles):
+    """
+    Grava os agregados em ``output_dir``: resumo por estação e global, matrizes de correlação
+    e covariância globais e os rollups por hora do dia, dia e mês.
+
+    Retorna
+    -------
+    pandas.DataFrame
+        O resumo (``describe()`` + faltantes) por estação e global.
+    """
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    summary = aggregate.resumo(quantiles)
+    summary.to_csv(os.path.join(output_dir, "resumo.csv"))
+    aggregate.correlacao().to_csv(os.path.join(output_dir, "correlacao.csv"))
+    aggregate.covariancia().to_csv(os.path.join(output_dir, "covariancia.csv"))
+    for name in ROLLUPS:
+        aggregate.rollup(name).reset_index().to_parquet(os.path.join(output_dir, f"rollup_{name}.parquet"), index=False)
+    logger.info(f"Agregados gravados em '{output_dir}'")
+    return summary
+
+
+def go(args):
+    run = wandb.init(job_type="aggregate")
+    run.config.update(vars(args))
+
+    logger.info(f"Baixando artefato {args.input_artifact}")
+    artifact = run.use_artifact(args.input_artifact)
+    artifact_dir = artifact.download(os.path.join(args.local_data_dir, "aggregate_input"))
+
+    quantiles = [float(q) for q in args.quantiles.split(",") if q.strip()]
+    aggregate = agregar(
+        artifact_dir,
+        tamanho_bloco=args.chunk_size,
+        processos=args.processes,
+        precisao=args.relative_accuracy,
+    )
+    if not aggregate.estacoes:
+        logger.error(f"O artefato {args.input_artifact} não contém dados para agregar.")
+        run.finish()
+        return
+
+    output_dir = os.path.join(args.local_data_dir, args.artifact_name)
+    summary = write_aggregates(aggregate, output_dir, quantiles)
+
+    # Médias e faltantes globais ficam visíveis no resumo da execução
+    for column, row in summary.loc[GLOBAL].iterrows():
+        run.summary[f"agregacao/{column}/media"] = row["mean"]
+        run.summary[f"agregacao/{column}/faltantes"] = int(row["missing"])
+
+    logger.info(f"Enviando {args.artifact_name} para o Weights & Biases")
+    log_artifact(
+        args.artifact_name,
+        args.artifact_type,
+        args.artifact_description,
+        output_dir,
+        run,
+        metadados={"estacoes": sorted(aggregate.estacoes), "quantis": quantiles, "precisao_relativa": args.relative_accuracy},
+    )
+    run.finish()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Calcula estatísticas por estação e globais em uma passada sobre o dataset e envia para o W&B")
+    parser.add_argument("--input_artifact", type=str, help="Artefato do W&B com o dataset (Parquet particionado ou CSVs PRSA)")
+    parser.add_argument("--artifact_name", type=str, help="Nome do artefato com os agregados no W&B")
+    parser.add_argument("--artifact_type", type=str, help="Tipo do artefato (ex.: aggregates)")
+    parser.add_argument("--artifact_description", type=str, help="Descrição do artefato")
+    parser.add_argument("--chunk_size", type=int, default=100000, help="Linhas lidas por vez de cada arquivo (padrão: 100000)")
+    parser.add_argument("--processes", type=int, default=1, help="Processos que agregam arquivos em paralelo (padrão: 1)")
+    parser.add_argument(
+        "--quantiles",
+        type=str,
+        default="0.01,0.05,0.25,0.5,0.75,0.95,0.99",
+        help="Quantis aproximados calculados, separados por vírgula (padrão: 0.01,0.05,0.25,0.5,0.75,0.95,0.99)"
+    )
+    parser.add_argument(
+        "--relative_accuracy",
+        type=float,
+        default=0.01,
+        help="Erro relativo máximo dos quantis aproximados (padrão: 0.01)"
+    )
+    parser.add_argument(
+        "--local_data_dir",
+        type=str,
+        default="data",
+        help="Diretório local para baixar o artefato e gravar os agregados (padrão: data)"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    go(args)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+import argparse
+import os
+import shutil
+import logging
+import wandb
+from wandb_utils.prsa import gravar_parquet_prsa
+from wandb_utils.aqi import CHAVE_ESTADO, INDICADOR_GERAL, CalculadoraAQI, ler_particoes
+from wandb_utils.incremental import CHAVE_MARCAS, obter_versao_anterior
+from wandb_utils.log_artifact import log_artifact
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+# O prefixo "_" faz o pyarrow ignorar o arquivo ao ler o dataset Parquet do AQI
+EPISODES_FILE = "_episodios.csv"
+
+
+def resume_calculator(run, args):
+    """
+    Retorna ``(calculadora, artefato anterior)``. No modo incremental, a calculadora continua
+    do estado gravado na última versão do artefato (caudas das janelas e episódios abertos).
+    """
+    calculator = CalculadoraAQI(args.threshold)
+    if not getattr(args, "incremental", False):
+        return calculator, None
+    previous_artifact, _ = obter_versao_anterior(run, args.artifact_name)
+    state = ((previous_artifact.metadata or {}).get(CHAVE_ESTADO) if previous_artifact is not None else None)
+    if not state:
+        return calculator, None
+    if float(state["limiar"]) != calculator.limiar:
+        logger.warning(f"Limiar mudou de {state['limiar']} para {calculator.limiar}. Recalculando todo o histórico.")
+        return calculator, None
+    return CalculadoraAQI.de_estado(state), previous_artifact
+
+
+def go(args):
+    run = wandb.init(job_type="aqi")
+    run.config.update(vars(args))
+
+    logger.info(f"Baixando artefato {args.input_artifact}")
+    artifact = run.use_artifact(args.input_artifact)
+    artifact_dir = artifact.download(os.path.join(args.local_data_dir, "aqi_input"))
+
+    calculator, previous_artifact = resume_calculator(run, args)
+    output_dir = os.path.join(args.local_data_dir, args.artifact_name)
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+
+    # Uma partição por vez: a memória não cresce com o tamanho do histórico
+    rows = 0
+    for block in ler_particoes(artifact_dir, calculator.marcas()):
+        result = calculator.processar(block)
+        if not result.empty:
+            # A primeira hora do bloco nomeia o arquivo: nomes estáveis entre execuções (digest
+            # determinístico) e sem colidir com os arquivos das versões incrementais anteriores
+            gravar_parquet_prsa(result, output_dir, acrescentar=True, parte=f"{result.index[0]:%Y%m%d%H}")
+            rows += len(result)
+    if rows == 0:
+        logger.info(f"O artefato {args.input_artifact} não contém horas novas. Nada será enviado ao W&B.")
+        run.finish()
+        return
+
+    episodes = calculator.resumo_episodios()
+    episodes.to_csv(os.path.join(output_dir, EPISODES_FILE))
+    # Marcas d'água e estado ficam só nos metadados; o resumo acumulado de episódios substitui o
+    # da versão anterior no rascunho, que não aceita o mesmo caminho duas vezes
+    watermarks = calculator.marcas()
+
+    run.summary["aqi/linhas_adicionadas"] = rows
+    for indicator, totals in episodes.groupby(level="indicador").sum().iterrows():
+        run.summary[f"aqi/{indicator}/episodios"] = int(totals["episodios"])
+        run.summary[f"aqi/{indicator}/horas_excedidas"] = int(totals["horas_excedidas"])
+    logger.info(f"{rows} horas novas; episódios de {INDICADOR_GERAL} > {calculator.limiar:g}: "
+                f"{run.summary.get(f'aqi/{INDICADOR_GERAL}/episodios', 0)}")
+
+    logger.info(f"Enviando {args.artifact_name} para o Weights & Biases")
+    log_artifact(
+        args.artifact_name,
+        args.artifact_type,
+        args.artifact_description,
+        output_dir,
+        run,
+        metadados={CHAVE_MARCAS: watermarks, CHAVE_ESTADO: calculator.estado(), "linhas_adicionadas": rows},
+        artefato_base=previous_artifact,
+        deduplicar=previous_artifact is None,
+        substituir=[EPISODES_FILE],
+    )
+    run.finish()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Calcula os índices de qualidade do ar (AQI) e os episódios de excedência e envia para o W&B")
+    parser.add_argument("--input_artifact", type=str, help="Artefato do W&B com o dataset (Parquet particionado ou CSVs PRSA)")
+    parser.add_argument("--artifact_name", type=str, help="Nome do artefato com o AQI no W&B")
+    parser.add_argument("--artifact_type", type=str, help="Tipo do artefato (ex.: aqi)")
+    parser.add_argument("--artifact_description", type=str, help="Descrição do artefato")
+    parser.add_argument("--threshold", type=float, default=100, help="Índice acima do qual uma hora conta como excedência (padrão: 100)")
+    parser.add_argument(
+        "--local_data_dir",
+        type=str,
+        default="data",
+        help="Diretório local para baixar o artefato e gravar o resultado (padrão: data)"
+    )
+    parser.add_argument(
+        "--incremental",
+        type=lambda v: str(v).lower() in ("1", "true", "yes", "sim"),
+        default=False,
+        help="Continua a partir do estado (caudas das janelas e episódios abertos) da última versão do artefato (padrão: false)"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    go(args)
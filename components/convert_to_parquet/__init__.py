@@ -0,0 +1 @@
+# This file makes Python treat the 'convert_to_parquet' directory as a sub-package.
\ No newline at end of file
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+import argparse
+import os
+import glob
+import shutil
+import logging
+import wandb
+import pandas as pd
+from pandas.api.types import union_categoricals
+from wandb_utils.prsa import eh_csv_prsa, carregar_prsa, gravar_parquet_prsa, relatorio_memoria
+from wandb_utils.uci import eh_csv_uci, ler_csv_uci
+from wandb_utils.incremental import (
+    CHAVE_MARCAS, calcular_marcas, filtrar_novas_linhas, mesclar_marcas, obter_versao_anterior,
+)
+from wandb_utils.log_artifact import log_artifact
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def load_csvs(prsa_files, uci_files, watermarks=None):
+    """
+    Carrega os CSVs PRSA e UCI em um único DataFrame no esquema PRSA. As colunas extras do
+    UCI ficam NaN nas linhas PRSA e as categorias de ``station`` são unidas. Com
+    ``watermarks``, os leitores pulam direto para as linhas posteriores à marca de cada
+    estação, sem fazer o parse do histórico.
+
+    Retorna
+    -------
+    pandas.DataFrame ou None
+        None se nenhum arquivo tiver linhas a carregar.
+    """
+    watermarks = watermarks or {}
+    frames = [carregar_prsa(prsa_files, marcas=watermarks)] if prsa_files else []
+    for uci_file in uci_files:
+        station = os.path.splitext(os.path.basename(uci_file))[0]
+        frames.append(ler_csv_uci(uci_file, marca=watermarks.get(station)))
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return None
+    if len(frames) == 1:
+        return frames[0]
+    stations = union_categoricals([f["station"] for f in frames]).categories
+    for frame in frames:
+        frame["station"] = frame["station"].cat.set_categories(stations)
+    return pd.concat(frames)
+
+
+def convert_csvs_to_parquet(csv_files, output_dir, watermarks=None, append=False):
+    """
+    Converte CSVs PRSA e UCI (AirQuality.csv) em um dataset Parquet particionado por estação e ano.
+
+    Parâmetros
+    ----------
+    csv_files : list
+        Caminhos dos CSVs extraídos. Arquivos fora dos formatos PRSA e UCI são ignorados.
+    output_dir : str
+        Diretório do dataset Parquet. É recriado a cada conversão.
+    watermarks : dict, opcional
+        Marcas d'água por estação. Se informadas, apenas as linhas posteriores são gravadas.
+    append : bool, opcional
+        Se True, a saída será acrescentada a um rascunho da versão anterior do artefato: os
+        arquivos recebem como rótulo a primeira hora nova, para não repetir os caminhos já
+        presentes na versão anterior.
+
+    Retorna
+    -------
+    tuple
+        ``(linhas_gravadas, marcas_atualizadas)``.
+    """
+    prsa_files, uci_files = [], []
+    for csv_file in csv_files:
+        if eh_csv_prsa(csv_file):
+            prsa_files.append(csv_file)
+        elif eh_csv_uci(csv_file):
+            uci_files.append(csv_file)
+        else:
+            logger.warning(f"'{csv_file}' não está no formato PRSA (year/month/day/hour/station) nem UCI (Date;Time). Ignorado.")
+    if not prsa_files and not uci_files:
+        return 0, dict(watermarks or {})
+
+    df = load_csvs(prsa_files, uci_files, watermarks)
+    if df is None:
+        return 0, dict(watermarks or {})
+    relatorio_memoria(df)
+    # Rede de segurança para CSVs fora de ordem cronológica; nos ordenados nada é descartado
+    df = filtrar_novas_linhas(df, watermarks)
+    if df.empty:
+        return 0, dict(watermarks or {})
+    if append:
+        if os.path.isdir(output_dir):
+            shutil.rmtree(output_dir)
+        gravar_parquet_prsa(df, output_dir, acrescentar=True, parte=f"{df.index.min():%Y%m%d%H}")
+    else:
+        gravar_parquet_prsa(df, output_dir)
+    return len(df), mesclar_marcas(watermarks, calcular_marcas(df))
+
+
+def go(args):
+    run = wandb.init(job_type="convert_to_parquet")
+    run.config.update(vars(args))
+
+    logger.info(f"Baixando artefato {args.input_artifact}")
+    artifact = run.use_artifact(args.input_artifact)
+    artifact_dir = artifact.download(os.path.join(args.local_data_dir, "csv"))
+    csv_files = sorted(glob.glob(os.path.join(artifact_dir, "**", "*.csv"), recursive=True))
+    if not csv_files:
+        logger.error(f"Nenhum arquivo CSV encontrado no artefato {args.input_artifact}.")
+        run.finish()
+        return
+
+    previous_artifact, watermarks = None, {}
+    if getattr(args, "incremental", False):
+        previous_artifact, watermarks = obter_versao_anterior(run, args.artifact_name)
+
+    output_dir = os.path.join(args.local_data_dir, args.artifact_name)
+    n_rows, new_watermarks = convert_csvs_to_parquet(csv_files, output_dir, watermarks,
+                                                     append=previous_artifact is not None)
+    if not n_rows:
+        if watermarks:
+            logger.info("Nenhuma linha nova após as marcas d'água. Nada será enviado ao W&B.")
+        else:
+            logger.error("Nenhum CSV no formato esperado. Nada será enviado ao W&B.")
+        run.finish()
+        return
+
+    # As marcas d'água ficam só nos metadados: um arquivo fixo repetiria o caminho da versão anterior
+    logger.info(f"Enviando {args.artifact_name} para o Weights & Biases")
+    log_artifact(
+        args.artifact_name,
+        args.artifact_type,
+        args.artifact_description,
+        output_dir,
+        run,
+        metadados={CHAVE_MARCAS: new_watermarks, "linhas_adicionadas": n_rows},
+        artefato_base=previous_artifact,
+        deduplicar=previous_artifact is None,
+    )
+    run.finish()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Converte os CSVs extraídos em um dataset Parquet particionado e envia para o W&B")
+    parser.add_argument("--input_artifact", type=str, help="Artefato do W&B com os CSVs extraídos")
+    parser.add_argument("--artifact_name", type=str, help="Nome do artefato Parquet no W&B")
+    parser.add_argument("--artifact_type", type=str, help="Tipo do artefato (ex.: parquet_data)")
+    parser.add_argument("--artifact_description", type=str, help="Descrição do artefato")
+    parser.add_argument(
+        "--local_data_dir",
+        type=str,
+        default="data",
+        help="Diretório local para baixar os CSVs e gravar o dataset Parquet (padrão: data)"
+    )
+    parser.add_argument(
+        "--incremental",
+        type=lambda v: str(v).lower() in ("1", "true", "yes", "sim"),
+        default=False,
+        help="Grava apenas as linhas posteriores às marcas d'água da última versão do artefato (padrão: false)"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    go(args)
@@ -0,0 +1 @@
+# This file makes Python treat the 'features' directory as a sub-package.
\ No newline at end of file
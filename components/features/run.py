@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+import argparse
+import os
+import logging
+import wandb
+from wandb_utils.prsa import carregar_parquet_prsa, gravar_parquet_prsa
+from wandb_utils.atributos import gerar_atributos
+from wandb_utils.log_artifact import log_artifact
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def _split(value, cast=str):
+    return [cast(v.strip()) for v in str(value).split(",") if v.strip()]
+
+
+def go(args):
+    run = wandb.init(job_type="features")
+    run.config.update(vars(args))
+
+    logger.info(f"Baixando artefato {args.input_artifact}")
+    artifact = run.use_artifact(args.input_artifact)
+    artifact_dir = artifact.download(os.path.join(args.local_data_dir, "features_input"))
+    df = carregar_parquet_prsa(artifact_dir)
+    if df.empty:
+        logger.error(f"O artefato {args.input_artifact} não contém dados.")
+        run.finish()
+        return
+
+    df_features, metrics = gerar_atributos(
+        df,
+        colunas=_split(args.columns) or None,
+        processos=args.processes,
+        lags=_split(args.lags, int),
+        janelas=_split(args.windows, int),
+        spans_ewm=_split(args.ewm_spans, int),
+        quantis=_split(args.quantiles, float),
+        codificacao_wd=args.wd_encoding,
+    )
+    for key in ("linhas", "atributos", "segundos", "linhas_por_segundo"):
+        run.summary[f"atributos/{key}"] = metrics[key]
+
+    output_dir = os.path.join(args.local_data_dir, args.artifact_name)
+    gravar_parquet_prsa(df_features, output_dir)
+
+    logger.info(f"Enviando {args.artifact_name} para o Weights & Biases")
+    log_artifact(
+        args.artifact_name,
+        args.artifact_type,
+        args.artifact_description,
+        output_dir,
+        run,
+        metadados={"atributos": [c for c in df_features.columns if c not in ("year", "month", "day", "hour", "station")]},
+    )
+    run.finish()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Gera os atributos de séries temporais por estação e envia a matriz para o W&B")
+    parser.add_argument("--input_artifact", type=str, help="Artefato do W&B com o dataset Parquet (normalmente o imputado)")
+    parser.add_argument("--artifact_name", type=str, help="Nome do artefato com os atributos no W&B")
+    parser.add_argument("--artifact_type", type=str, help="Tipo do artefato (ex.: features)")
+    parser.add_argument("--artifact_description", type=str, help="Descrição do artefato")
+    parser.add_argument("--columns", type=str, default="", help="Colunas usadas nos lags e janelas, separadas por vírgula (padrão: poluentes)")
+    parser.add_argument("--lags", type=str, default="1,2,3,24", help="Defasagens em horas, separadas por vírgula (padrão: 1,2,3,24)")
+    parser.add_argument("--windows", type=str, default="6,24", help="Janelas móveis de média e quantis, em horas (padrão: 6,24)")
+    parser.add_argument("--ewm_spans", type=str, default="6,24", help="Spans das médias exponenciais, em horas (padrão: 6,24)")
+    parser.add_argument("--quantiles", type=str, default="0.5,0.9", help="Quantis calculados em cada janela móvel (padrão: 0.5,0.9)")
+    parser.add_argument("--wd_encoding", type=str, default="sincos", help="Codificação da direção do vento: sincos, onehot ou nenhuma (padrão: sincos)")
+    parser.add_argument("--processes", type=int, default=1, help="Processos para gerar os atributos das estações em paralelo (padrão: 1)")
+    parser.add_argument(
+        "--local_data_dir",
+        type=str,
+        default="data",
+        help="Diretório local para baixar o artefato e gravar os atributos (padrão: data)"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    go(args)
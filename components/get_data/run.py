@@ -1,80 +1,227 @@
 #!/usr/bin/env python
 import argparse
 import os
+import time
 import logging
-import wandb
-import sys
-from wandb_utils.utils import download_file, extract_csv_from_zip, artifact_exists
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from wandb_utils.utils import (
+    download_file,
+    download_file_paralelo,
+    extract_csv_from_zip,
+    artifact_exists,
+    limpar_cache_artefatos,
+    LimitadorPorHost,
+    espera_backoff,
+)
 from wandb_utils.log_artifact import log_artifact
+from wandb_utils.cache import CacheDownloads
+from wandb_utils.importacao import ModuloTardio
+from wandb_utils.instrumentacao import Instrumentacao
+
+# Importado só quando há algo a enviar ou baixar do W&B; --help e cache hits não pagam o custo
+wandb = ModuloTardio("wandb")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
 logger = logging.getLogger(__name__)
 
-print("Argumentos do sistema:", sys.argv)
+
+def _split(value):
+    """Separa uma lista de valores por vírgula (ex.: várias URLs em ``--sample``)."""
+    return [v.strip() for v in str(value or "").split(",") if v.strip()]
+
+
+def download_with_retries(url, output_path, retries=3, limiter=None, backoff=1.0, parts=1):
+    """
+    Baixa a URL tentando novamente, com backoff exponencial, em caso de falha.
+    O download ocupa uma vaga do limitador por host apenas enquanto está em andamento.
+    Com ``parts`` > 1, usa requisições Range paralelas; cada tentativa retoma os bytes já
+    baixados e a última remove os arquivos parciais se falhar.
+    """
+    result = False
+    for attempt in range(1, max(1, retries) + 1):
+        with limiter(url) if limiter else contextlib.nullcontext():
+            if parts > 1:
+                result = download_file_paralelo(url, output_path, num_partes=parts, manter_parcial=attempt < retries)
+            else:
+                result = download_file(url, output_path)
+        if result:
+            return result
+        if attempt < retries:
+            wait = espera_backoff(attempt, backoff)
+            logger.warning(f"Tentativa {attempt}/{retries} de baixar {url} falhou. Nova tentativa em {wait:.1f}s.")
+            time.sleep(wait)
+    return result
+
+
+def _phase(instrumentation, name):
+    return instrumentation.fase(name) if instrumentation is not None else contextlib.nullcontext({})
+
+
+def fetch_source(args, url, cache, limiter=None, instrumentation=None, name=None):
+    """
+    Obtém os CSVs de uma fonte: do cache de downloads ou baixando a URL e extraindo o zip.
+    Cada fonte usa o próprio subdiretório ``<local_data_dir>/<name>``, para que fontes
+    baixadas em paralelo com arquivos de mesmo nome não se sobrescrevam. Com
+    ``instrumentation``, o download e a extração são medidos como fases ``download:<name>``
+    e ``extract:<name>``.
+
+    Retorna
+    -------
+    list ou None
+        Os CSVs da fonte, ou None se o download falhar ou o arquivo não for .zip nem .csv.
+    """
+    name = name or os.path.basename(url)
+    # Subdiretório da fonte dentro do diretório de dados local
+    source_dir = os.path.join(args.local_data_dir, name)
+    output_path = os.path.join(source_dir, os.path.basename(url))
+    os.makedirs(source_dir, exist_ok=True)
+    cache_entry = cache.consultar(url)
+    extract_options = {
+        "filtro": getattr(args, "csv_filter", None),
+        "max_workers": getattr(args, "extract_workers", 1),
+    }
+
+    if cache_entry is not None:
+        # Cache hit: não baixa nada e reaproveita os CSVs já extraídos, se ainda existirem
+        csv_files = cache.arquivos_extraidos(cache_entry)
+        if csv_files is None:
+            with _phase(instrumentation, f"extract:{name}"):
+                if output_path.endswith(".zip"):
+                    csv_files = extract_csv_from_zip(cache_entry["caminho"], diretorio_extracao=source_dir, delete_zip_after_extraction=False, **extract_options)
+                else:
+                    csv_files = [cache.materializar(cache_entry, output_path)]
+            cache.registrar_extracao(url, csv_files)
+        else:
+            logger.info(f"Arquivos extraídos de {url} encontrados no cache. Extração ignorada.")
+    else:
+        with _phase(instrumentation, f"download:{name}") as record:
+            download_result = download_with_retries(
+                url, output_path, getattr(args, "retries", 3), limiter, parts=getattr(args, "parallel_parts", 1) or 1
+            )
+            record["bytes_baixados"] = getattr(download_result, "bytes_baixados", None)
+
+        if not download_result:
+            logger.error(f"Falha ao baixar o arquivo de {url}. Verifique a URL e a conexão de rede.")
+            return None
+
+        cache.armazenar(url, output_path, download_result)
+        if output_path.endswith(".zip"):
+            # Extrai para o subdiretório da fonte; o zip continua disponível no cache
+            with _phase(instrumentation, f"extract:{name}"):
+                csv_files = extract_csv_from_zip(output_path, diretorio_extracao=source_dir, delete_zip_after_extraction=True, **extract_options)
+        elif output_path.endswith(".csv"):
+            csv_files = [output_path]
+        else:
+            csv_files = []
+        cache.registrar_extracao(url, csv_files)
+
+    if not (output_path.endswith(".zip") or output_path.endswith(".csv")):
+        logger.error(f"O arquivo baixado de {url} não é .zip nem .csv. Nada será enviado ao W&B.")
+        return None
+    return csv_files
+
+
 def go(args):
+    # Mede cada fase (download, extração, envio) e, com --profile, perfila a execução
+    instrumentation = Instrumentacao("get_data", perfil=getattr(args, "profile", None)).iniciar()
+    try:
+        run = fetch_and_log(args, instrumentation)
+    finally:
+        instrumentation.finalizar()
+    if run is not None:
+        instrumentation.registrar_wandb(run)
+        profile_files = instrumentation.salvar_perfil(os.path.join(args.local_data_dir, "profile"))
+        if profile_files:
+            log_artifact("perfil_get_data", "profile", "Profile_of_the_get_data_step", profile_files, run)
+        run.finish()
+    instrumentation.salvar_trace(getattr(args, "trace_dir", None) or os.path.join(args.local_data_dir, "traces"))
+
+
+def fetch_and_log(args, instrumentation=None):
+    """
+    Obtém todas as fontes e envia ao W&B as que não estavam lá.
+
+    Retorna
+    -------
+    wandb.Run ou None
+        A execução do W&B usada, ainda aberta, ou None se nenhuma foi necessária.
+    """
     # Usa o diretório de dados local fornecido por argumento
     logger.info(f"Usando diretório de dados local: {args.local_data_dir}")
     os.makedirs(args.local_data_dir, exist_ok=True)
-    
+
+    # Várias fontes podem ser informadas separadas por vírgula; cada uma gera o próprio artefato
+    sources = _split(args.sample)
+    artifact_names = _split(args.artifact_name) or [os.path.basename(url) for url in sources]
+    if len(artifact_names) != len(sources):
+        logger.error(f"Informe um nome de artefato por fonte: {len(sources)} fontes e {len(artifact_names)} nomes.")
+        return
+
     project = os.environ.get("WANDB_PROJECT")
-    # Mantido artifact_full_name por clareza, já que é um nome composto
-    artifact_full_name = args.artifact_name
-
-    if project and artifact_exists(project, artifact_full_name):
-        logger.info(f"Artefato '{artifact_full_name}' encontrado no W&B. Baixando diretamente do W&B.")
-        run = wandb.init(project=project, job_type="download_file")
-        artifact = run.use_artifact(artifact_full_name)
-        # Baixa para o diretório de dados local configurado
-        artifact_dir = artifact.download(args.local_data_dir)
-        logger.info(f"Arquivo {artifact_full_name} baixado para a pasta '{args.local_data_dir}'")
-        csv_files = [os.path.join(artifact_dir, f) for f in os.listdir(artifact_dir) if f.endswith(".csv")]
+    cache_max_mb = getattr(args, "cache_max_mb", None)
+    cache = CacheDownloads(
+        os.path.join(args.local_data_dir, ".cache"),
+        tamanho_maximo=cache_max_mb * 1024 * 1024 if cache_max_mb else None,
+    )
+    limiter = LimitadorPorHost(getattr(args, "max_per_host", 2))
+
+    def fetch(url, artifact_name):
+        if project and artifact_exists(project, artifact_name):
+            logger.info(f"Artefato '{artifact_name}' encontrado no W&B. Baixando diretamente do W&B.")
+            return "wandb", None
+        logger.info(f"Artefato '{artifact_name}' não encontrado no W&B. Baixando de {url}.")
+        return "url", fetch_source(args, url, cache, limiter, instrumentation, artifact_name)
+
+    # As fontes são baixadas ao mesmo tempo; o tempo total fica próximo ao do download mais lento
+    max_workers = max(1, min(getattr(args, "max_workers", 4), len(sources)))
+    with _phase(instrumentation, "fetch"), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(fetch, sources, artifact_names))
+
+    run = None
+    for url, artifact_name, (origin, csv_files) in zip(sources, artifact_names, results):
+        if origin == "wandb":
+            run = run or wandb.init(project=project, job_type="download_file")
+            artifact = run.use_artifact(artifact_name)
+            # Baixa para o subdiretório do artefato no diretório de dados local
+            with _phase(instrumentation, f"wandb_download:{artifact_name}"):
+                artifact_dir = artifact.download(os.path.join(args.local_data_dir, artifact_name))
+            logger.info(f"Arquivo {artifact_name} baixado para a pasta '{artifact_dir}'")
+            if not any(f.endswith(".csv") for f in os.listdir(artifact_dir)):
+                logger.error(f"Nenhum arquivo CSV encontrado no artefato '{artifact_name}' do W&B.")
+            continue
+        if csv_files is None:
+            continue
         if not csv_files:
-            logger.error("Nenhum arquivo CSV encontrado no artefato do W&B.")
-            return
-        file_to_log = csv_files[0] # Mantido file_to_log por clareza
-        run.finish()
-    else:
-        logger.info(f"Artefato '{artifact_full_name}' não encontrado no W&B. Baixando do link fornecido.")
-        # Usa o diretório de dados local para o caminho de saída
-        output_path = os.path.join(args.local_data_dir, os.path.basename(args.sample))
-        download_successful = download_file(args.sample, output_path)
+            logger.error(f"Nenhum arquivo CSV de {url} encontrado para enviar ao W&B.")
+            continue
+        # Um único CSV é enviado como arquivo; vários (ex.: um por estação) como lista de arquivos
+        file_to_log = csv_files[0] if len(csv_files) == 1 else csv_files
 
-        if not download_successful:
-            logger.error(f"Falha ao baixar o arquivo de {args.sample}. Verifique a URL e a conexão de rede. Interrompendo o processo.")
-            return
+        if run is None:
+            run = wandb.init(job_type="download_file")
+            run.config.update(vars(args)) # vars(args) é idiomático, mantido
 
-        if output_path.endswith(".zip"):
-            # Extrai para o diretório de dados local configurado
-            csv_files = extract_csv_from_zip(output_path, extract_dir=args.local_data_dir, delete_zip_after_extraction=True)
-            if not csv_files:
-                logger.error("Nenhum arquivo CSV encontrado para enviar ao W&B.")
-                return
-            file_to_log = csv_files[0]
-        elif output_path.endswith(".csv"):
-            file_to_log = output_path
-        else:
-            logger.error("O arquivo baixado não é .zip nem .csv. Nada será enviado ao W&B.")
-            return
-
-        run = wandb.init(job_type="download_file")
-        run.config.update(vars(args)) # vars(args) é idiomático, mantido
-
-        logger.info(f"Enviando {args.artifact_name} para o Weights & Biases")
-        log_artifact(
-            args.artifact_name,
-            args.artifact_type,
-            args.artifact_description,
-            file_to_log,
-            run,
-        )
-        run.finish()
+        logger.info(f"Enviando {artifact_name} para o Weights & Biases")
+        with _phase(instrumentation, f"upload:{artifact_name}"):
+            log_artifact(
+                artifact_name,
+                args.artifact_type,
+                args.artifact_description,
+                file_to_log,
+                run,
+            )
+        # A consulta em cache ficaria desatualizada após registrar a nova versão
+        if project:
+            limpar_cache_artefatos(project, artifact_name)
+    return run
 
-if __name__ == "__main__":
-    import argparse
+
+def build_parser():
     # Mantido parser por ser convenção
     parser = argparse.ArgumentParser(description="Baixa uma URL para um destino local e envia o CSV para o W&B")
-    parser.add_argument("--sample", type=str, help="URL da amostra para baixar")
-    parser.add_argument("--artifact_name", type=str, help="Nome do artefato no W&B (padrão: nome do arquivo baixado)")
+    parser.add_argument("--sample", type=str, help="URL da amostra para baixar; várias URLs podem ser separadas por vírgula")
+    parser.add_argument("--artifact_name", type=str, help="Nome do artefato no W&B, um por URL separados por vírgula (padrão: nome do arquivo baixado)")
     parser.add_argument("--artifact_type", type=str, help="Tipo do artefato (padrão: raw_data)")
     parser.add_argument("--artifact_description", type=str, help="Descrição do artefato (padrão: Dados brutos)")
     # Novo argumento para o diretório de dados local
@@ -84,6 +231,64 @@ if __name__ == "__main__":
         default="data", 
         help="Diretório local para baixar e extrair arquivos (padrão: data)"
     )
-    args = parser.parse_args() # Mantido args por ser convenção
-    print("Argumentos:", args)
+    parser.add_argument(
+        "--cache_max_mb",
+        type=int,
+        default=None,
+        help="Tamanho máximo do cache de downloads em MB; os itens menos usados são removidos (padrão: sem limite)"
+    )
+    parser.add_argument(
+        "--csv_filter",
+        type=str,
+        default=None,
+        help="Padrão glob dos CSVs a extrair do zip, ex.: 'PRSA_Data_*.csv' (padrão: todos)"
+    )
+    parser.add_argument(
+        "--extract_workers",
+        type=int,
+        default=4,
+        help="Número de threads usadas para extrair os CSVs do zip (padrão: 4)"
+    )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=4,
+        help="Número máximo de fontes baixadas ao mesmo tempo (padrão: 4)"
+    )
+    parser.add_argument(
+        "--max_per_host",
+        type=int,
+        default=2,
+        help="Número máximo de downloads simultâneos para um mesmo host (padrão: 2)"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Número de tentativas por download, com backoff exponencial entre elas (padrão: 3)"
+    )
+    parser.add_argument(
+        "--parallel_parts",
+        type=int,
+        default=1,
+        help="Número de partes baixadas em paralelo com requisições Range; 1 usa um único stream (padrão: 1)"
+    )
+    parser.add_argument(
+        "--profile",
+        type=lambda v: None if str(v).lower() in ("", "false", "none", "0") else str(v).lower(),
+        default=None,
+        help="Perfila a execução ('amostragem': todas as threads; 'cprofile': thread principal) e envia o perfil ao W&B como artefato (padrão: false)"
+    )
+    parser.add_argument(
+        "--trace_dir",
+        type=str,
+        default=None,
+        help="Diretório do trace JSON com as métricas de cada fase (padrão: <local_data_dir>/traces)"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args() # Mantido args por ser convenção
+    logger.debug(f"Argumentos: {args}")
     go(args)
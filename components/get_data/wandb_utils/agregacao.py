@@ -0,0 +1,423 @@
+import os
+import math
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from .prsa import COLUNAS_POLUENTES, COLUNAS_METEOROLOGICAS, COLUNAS_TEMPO, DTYPES_PRSA, montar_datetime
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+COLUNAS_AGREGADAS = COLUNAS_POLUENTES + COLUNAS_METEOROLOGICAS
+QUANTIS_PADRAO = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+PRECISAO_RELATIVA_PADRAO = 0.01
+TAMANHO_BLOCO_PADRAO = 100_000
+ROLLUPS = ("hora", "dia", "mes")
+GLOBAL = "__global__"
+
+
+class Momentos:
+    """
+    Contagens, médias, variâncias e covariâncias pareadas de ``k`` colunas, mescláveis.
+
+    Todas as estatísticas são matrizes ``k x k`` calculadas sobre as linhas em que as duas
+    colunas estão presentes (como ``DataFrame.corr``): ``n[i, j]`` é a contagem, ``media[i, j]``
+    e ``m2[i, j]`` são a média e a soma dos quadrados dos desvios de ``x_i`` e ``c[i, j]`` é o
+    co-momento de ``x_i`` e ``x_j``. A diagonal traz as estatísticas univariadas. Blocos são
+    combinados com as fórmulas de Chan et al., sem guardar os dados.
+    """
+
+    def __init__(self, k):
+        self.n = np.zeros((k, k))
+        self.media = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+        self.c = np.zeros((k, k))
+
+    @classmethod
+    def de_bloco(cls, x):
+        """Calcula os momentos de um bloco ``(linhas, k)`` em float64, com NaN para faltantes."""
+        momentos = cls(x.shape[1])
+        presente = ~np.isnan(x)
+        # Centralizar pela média da coluna deixa a soma de quadrados numericamente estável;
+        # m2 e c não dependem do deslocamento, e a média é corrigida no final.
+        with np.errstate(invalid="ignore", divide="ignore"):
+            deslocamento = np.where(presente.any(axis=0), np.nanmean(np.where(presente, x, np.nan), axis=0), 0.0)
+        y = np.where(presente, x - deslocamento, 0.0)
+        p = presente.astype(np.float64)
+        n = p.T @ p
+        soma = y.T @ p
+        with np.errstate(invalid="ignore", divide="ignore"):
+            media = np.where(n > 0, soma / n, 0.0)
+        momentos.n = n
+        momentos.m2 = (y * y).T @ p - soma * media
+        momentos.c = y.T @ y - soma * media.T
+        momentos.media = np.where(n > 0, media + deslocamento[:, None], 0.0)
+        return momentos
+
+    def mesclar(self, outro):
+        n = self.n + outro.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            peso = np.where(n > 0, self.n * outro.n / n, 0.0)
+            delta = outro.media - self.media
+            self.media = np.where(n > 0, self.media + delta * np.where(n > 0, outro.n / n, 0.0), 0.0)
+        self.m2 = self.m2 + outro.m2 + delta * delta * peso
+        self.c = self.c + outro.c + delta * delta.T * peso
+        self.n = n
+        return self
+
+    def contagem(self):
+        return np.diag(self.n).copy()
+
+    def medias(self):
+        return np.where(np.diag(self.n) > 0, np.diag(self.media), np.nan)
+
+    def variancias(self, ddof=1):
+        n = np.diag(self.n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > ddof, np.diag(self.m2) / (n - ddof), np.nan)
+
+    def covariancia(self, ddof=1):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n > ddof, self.c / (self.n - ddof), np.nan)
+
+    def correlacao(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = self.c / np.sqrt(self.m2 * self.m2.T)
+        r = np.where((self.n > 1) & np.isfinite(r), np.clip(r, -1.0, 1.0), np.nan)
+        np.fill_diagonal(r, np.where(np.diag(self.n) > 1, 1.0, np.nan))
+        return r
+
+
+class SketchQuantis:
+    """
+    Sketch de quantis aproximados com erro relativo garantido (no estilo do DDSketch).
+
+    Cada valor cai em um balde logarítmico ``ceil(log_gamma(|x|))``; o quantil devolvido está a
+    no máximo ``precisao`` (relativa) do valor exato. Sketches são mesclados somando as contagens
+    dos baldes, e o número de baldes depende só da amplitude dos valores, não da quantidade.
+
+    Parâmetros
+    ----------
+    k : int
+        Número de colunas.
+    precisao : float, opcional
+        Erro relativo máximo dos quantis.
+    """
+
+    MINIMO = 1e-9
+
+    def __init__(self, k, precisao=PRECISAO_RELATIVA_PADRAO):
+        self.precisao = precisao
+        self.gamma = (1 + precisao) / (1 - precisao)
+        self._log_gamma = math.log(self.gamma)
+        self.positivos = [Counter() for _ in range(k)]
+        self.negativos = [Counter() for _ in range(k)]
+        self.zeros = np.zeros(k, dtype=np.int64)
+
+    def _baldes(self, valores):
+        indices = np.ceil(np.log(valores) / self._log_gamma).astype(np.int64)
+        return dict(zip(*np.unique(indices, return_counts=True)))
+
+    def atualizar(self, x):
+        for j in range(x.shape[1]):
+            coluna = x[:, j]
+            coluna = coluna[~np.isnan(coluna)]
+            positivos = coluna[coluna > self.MINIMO]
+            negativos = -coluna[coluna < -self.MINIMO]
+            self.zeros[j] += len(coluna) - len(positivos) - len(negativos)
+            if len(positivos):
+                self.positivos[j].update(self._baldes(positivos))
+            if len(negativos):
+                self.negativos[j].update(self._baldes(negativos))
+        return self
+
+    def mesclar(self, outro):
+        for j in range(len(self.zeros)):
+            self.positivos[j].update(outro.positivos[j])
+            self.negativos[j].update(outro.negativos[j])
+        self.zeros += outro.zeros
+        return self
+
+    def _valor(self, indice):
+        return 2 * self.gamma ** indice / (self.gamma + 1)
+
+    def quantis(self, qs):
+        """Retorna uma matriz ``(len(qs), k)`` com os quantis aproximados de cada coluna."""
+        resultado = np.full((len(qs), len(self.zeros)), np.nan)
+        for j in range(len(self.zeros)):
+            # Valores em ordem crescente: negativos do maior módulo ao menor, zeros, positivos
+            baldes = [(-self._valor(i), c) for i, c in sorted(self.negativos[j].items(), reverse=True)]
+            baldes.append((0.0, int(self.zeros[j])))
+            baldes += [(self._valor(i), c) for i, c in sorted(self.positivos[j].items())]
+            valores = np.array([v for v, _ in baldes])
+            acumulado = np.cumsum([c for _, c in baldes])
+            total = acumulado[-1]
+            if total == 0:
+                continue
+            posicoes = np.searchsorted(acumulado, np.asarray(qs) * (total - 1), side="right")
+            resultado[:, j] = valores[np.minimum(posicoes, len(valores) - 1)]
+        return resultado
+
+
+class AcumuladorEstacao:
+    """Estatísticas de uma estação (ou globais): linhas, faltantes, extremos, momentos e quantis."""
+
+    def __init__(self, k, precisao=PRECISAO_RELATIVA_PADRAO):
+        self.linhas = 0
+        self.faltantes = np.zeros(k, dtype=np.int64)
+        self.minimo = np.full(k, np.inf)
+        self.maximo = np.full(k, -np.inf)
+        self.momentos = Momentos(k)
+        self.sketch = SketchQuantis(k, precisao)
+
+    def atualizar(self, x):
+        self.linhas += len(x)
+        self.faltantes += np.isnan(x).sum(axis=0)
+        self.minimo = np.fmin(self.minimo, np.nanmin(x, axis=0, initial=np.inf))
+        self.maximo = np.fmax(self.maximo, np.nanmax(x, axis=0, initial=-np.inf))
+        self.momentos.mesclar(Momentos.de_bloco(x))
+        self.sketch.atualizar(x)
+        return self
+
+    def mesclar(self, outro):
+        self.linhas += outro.linhas
+        self.faltantes += outro.faltantes
+        self.minimo = np.fmin(self.minimo, outro.minimo)
+        self.maximo = np.fmax(self.maximo, outro.maximo)
+        self.momentos.mesclar(outro.momentos)
+        self.sketch.mesclar(outro.sketch)
+        return self
+
+
+def _chaves_rollup(df, datetimes):
+    return {
+        "hora": np.asarray(df["hour"], dtype=np.int8),
+        "dia": datetimes.astype("datetime64[D]"),
+        "mes": datetimes.astype("datetime64[M]").astype("datetime64[D]"),
+    }
+
+
+class Agregado:
+    """
+    Agregados de uma passada sobre dados PRSA, por estação e globais, mescláveis entre blocos
+    e entre processos.
+
+    Além das estatísticas de :class:`AcumuladorEstacao`, guarda somas e contagens por estação
+    para o perfil por hora do dia (``hora``) e as séries diárias (``dia``) e mensais (``mes``).
+    A memória depende do número de estações e do período coberto, não do número de linhas.
+
+    Parâmetros
+    ----------
+    colunas : list, opcional
+        Colunas numéricas agregadas. O padrão são os poluentes e as variáveis meteorológicas.
+    precisao : float, opcional
+        Erro relativo máximo dos quantis aproximados.
+    """
+
+    def __init__(self, colunas=None, precisao=PRECISAO_RELATIVA_PADRAO):
+        self.colunas = list(colunas or COLUNAS_AGREGADAS)
+        self.precisao = precisao
+        self.estacoes = {}
+        self.rollups = {nome: None for nome in ROLLUPS}
+
+    def _acumulador(self, estacao):
+        if estacao not in self.estacoes:
+            self.estacoes[estacao] = AcumuladorEstacao(len(self.colunas), self.precisao)
+        return self.estacoes[estacao]
+
+    def atualizar(self, df):
+        """Acrescenta um bloco com as colunas de data, ``station`` e as colunas agregadas."""
+        if df.empty:
+            return self
+        estacoes = np.asarray(df["station"].astype(str))
+        x = df[self.colunas].to_numpy(dtype=np.float64, na_value=np.nan)
+        for estacao in pd.unique(estacoes):
+            self._acumulador(estacao).atualizar(x[estacoes == estacao])
+
+        datetimes = montar_datetime(df["year"], df["month"], df["day"], df["hour"])
+        valores = pd.DataFrame(x, columns=self.colunas)
+        for nome, chave in _chaves_rollup(df, datetimes).items():
+            agrupado = valores.groupby([estacoes, chave], sort=False).agg(["sum", "count"])
+            self._somar_rollup(nome, agrupado)
+        return self
+
+    def _somar_rollup(self, nome, parcial):
+        atual = self.rollups[nome]
+        self.rollups[nome] = parcial if atual is None else pd.concat([atual, parcial]).groupby(level=[0, 1]).sum()
+
+    def mesclar(self, outro):
+        for estacao, acumulador in outro.estacoes.items():
+            if estacao in self.estacoes:
+                self.estacoes[estacao].mesclar(acumulador)
+            else:
+                self.estacoes[estacao] = acumulador
+        for nome, parcial in outro.rollups.items():
+            if parcial is not None:
+                self._somar_rollup(nome, parcial)
+        return self
+
+    def acumulador_global(self):
+        """Mescla todas as estações em um único acumulador."""
+        total = AcumuladorEstacao(len(self.colunas), self.precisao)
+        for acumulador in self.estacoes.values():
+            total.mesclar(acumulador)
+        return total
+
+    def _resumo(self, acumulador, quantis):
+        contagem = acumulador.momentos.contagem()
+        resumo = {
+            "count": contagem,
+            "missing": acumulador.faltantes,
+            "missing_ratio": acumulador.faltantes / max(acumulador.linhas, 1),
+            "mean": acumulador.momentos.medias(),
+            "std": np.sqrt(acumulador.momentos.variancias()),
+            "min": np.where(contagem > 0, acumulador.minimo, np.nan),
+        }
+        for q, valores in zip(quantis, acumulador.sketch.quantis(quantis)):
+            resumo[f"{q:.0%}" if (q * 100).is_integer() else f"{q:.1%}"] = valores
+        resumo["max"] = np.where(contagem > 0, acumulador.maximo, np.nan)
+        return pd.DataFrame(resumo, index=pd.Index(self.colunas, name="coluna"))
+
+    def resumo(self, quantis=QUANTIS_PADRAO):
+        """
+        Equivalente a ``describe()`` + ``isnull().sum()`` por estação e global.
+
+        Retorna
+        -------
+        pandas.DataFrame
+            Indexado por ``(station, coluna)``; as linhas globais têm ``station == "__global__"``.
+        """
+        partes = {estacao: self._resumo(a, quantis) for estacao, a in sorted(self.estacoes.items())}
+        partes[GLOBAL] = self._resumo(self.acumulador_global(), quantis)
+        return pd.concat(partes, names=["station", "coluna"])
+
+    def correlacao(self, estacao=None):
+        """Matriz de correlação de Pearson (pares completos) de uma estação ou global."""
+        acumulador = self.estacoes[estacao] if estacao is not None else self.acumulador_global()
+        return pd.DataFrame(acumulador.momentos.correlacao(), index=self.colunas, columns=self.colunas)
+
+    def covariancia(self, estacao=None):
+        acumulador = self.estacoes[estacao] if estacao is not None else self.acumulador_global()
+        return pd.DataFrame(acumulador.momentos.covariancia(), index=self.colunas, columns=self.colunas)
+
+    def rollup(self, nome):
+        """
+        Médias por estação e chave do rollup (``hora``, ``dia`` ou ``mes``), incluindo as médias
+        globais (todas as estações) com ``station == "__global__"``.
+        """
+        somas_contagens = self.rollups[nome]
+        if somas_contagens is None:
+            return pd.DataFrame(columns=self.colunas)
+        somas = somas_contagens.xs("sum", axis=1, level=1)
+        contagens = somas_contagens.xs("count", axis=1, level=1)
+        globais_somas = somas.groupby(level=1).sum()
+        globais_contagens = contagens.groupby(level=1).sum()
+        globais_somas.index = pd.MultiIndex.from_product([[GLOBAL], globais_somas.index])
+        globais_contagens.index = globais_somas.index
+        somas = pd.concat([somas, globais_somas])
+        contagens = pd.concat([contagens, globais_contagens])
+        medias = (somas / contagens.where(contagens > 0)).sort_index()
+        medias.index.names = ["station", nome]
+        return medias
+
+
+def _partes_particao(caminho):
+    # Diretórios no formato Hive (station=X/year=Y) do dataset gravado por gravar_parquet_prsa
+    chaves = {}
+    for parte in os.path.normpath(caminho).split(os.sep):
+        if "=" in parte:
+            chave, valor = parte.split("=", 1)
+            chaves[chave] = valor
+    return chaves
+
+
+def listar_arquivos(caminhos):
+    """Expande arquivos e diretórios em uma lista ordenada de arquivos ``.csv`` e ``.parquet``."""
+    arquivos = []
+    for caminho in [caminhos] if isinstance(caminhos, str) else caminhos:
+        if os.path.isdir(caminho):
+            for raiz, _, nomes in os.walk(caminho):
+                arquivos += [os.path.join(raiz, n) for n in nomes if n.endswith((".csv", ".parquet"))]
+        else:
+            arquivos.append(caminho)
+    return sorted(arquivos)
+
+
+def ler_blocos(caminho, colunas=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Lê um CSV PRSA ou um arquivo Parquet em blocos de até ``tamanho_bloco`` linhas, apenas com
+    as colunas de data, ``station`` e ``colunas``. Em Parquet particionado, ``station`` e
+    ``year`` vêm do caminho.
+    """
+    colunas = list(colunas or COLUNAS_AGREGADAS)
+    necessarias = COLUNAS_TEMPO + ["station"] + colunas
+    if caminho.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        particao = _partes_particao(os.path.dirname(caminho))
+        arquivo = pq.ParquetFile(caminho)
+        presentes = [c for c in necessarias if c in arquivo.schema_arrow.names]
+        for lote in arquivo.iter_batches(batch_size=tamanho_bloco, columns=presentes):
+            bloco = lote.to_pandas()
+            for chave, valor in particao.items():
+                if chave in necessarias and chave not in bloco.columns:
+                    bloco[chave] = int(valor) if chave == "year" else valor
+            yield bloco
+    else:
+        dtypes = {c: t for c, t in DTYPES_PRSA.items() if c in necessarias}
+        yield from pd.read_csv(caminho, usecols=necessarias, dtype=dtypes, chunksize=tamanho_bloco, engine="c")
+
+
+def agregar_arquivo(caminho, colunas=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO, precisao=PRECISAO_RELATIVA_PADRAO):
+    """Agrega um arquivo bloco a bloco. Só um bloco fica em memória por vez."""
+    agregado = Agregado(colunas, precisao)
+    for bloco in ler_blocos(caminho, colunas, tamanho_bloco):
+        agregado.atualizar(bloco)
+    return agregado
+
+
+def agregar(caminhos, colunas=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO, processos=None, precisao=PRECISAO_RELATIVA_PADRAO):
+    """
+    Calcula os agregados por estação e globais em uma única passada sobre CSVs ou Parquet.
+
+    Cada arquivo é lido em blocos por um processo; os agregados parciais são mesclados à medida
+    que ficam prontos. A memória usada é de ``processos`` blocos mais os acumuladores, que não
+    crescem com o número de linhas.
+
+    Parâmetros
+    ----------
+    caminhos : str ou list
+        Arquivos ou diretórios (por exemplo o dataset Parquet particionado).
+    colunas : list, opcional
+        Colunas numéricas agregadas. O padrão são os poluentes e as variáveis meteorológicas.
+    tamanho_bloco : int, opcional
+        Linhas lidas por vez de cada arquivo.
+    processos : int, opcional
+        Número de processos. Se None ou 1, os arquivos são agregados neste processo.
+    precisao : float, opcional
+        Erro relativo máximo dos quantis aproximados.
+
+    Retorna
+    -------
+    Agregado
+    """
+    arquivos = listar_arquivos(caminhos)
+    total = Agregado(colunas, precisao)
+    if not arquivos:
+        logger.warning(f"Nenhum arquivo .csv ou .parquet encontrado em {caminhos}")
+        return total
+    if not processos or processos <= 1 or len(arquivos) == 1:
+        for arquivo in arquivos:
+            total.mesclar(agregar_arquivo(arquivo, colunas, tamanho_bloco, precisao))
+    else:
+        with ProcessPoolExecutor(max_workers=min(processos, len(arquivos))) as executor:
+            futuros = [executor.submit(agregar_arquivo, a, colunas, tamanho_bloco, precisao) for a in arquivos]
+            for futuro in as_completed(futuros):
+                total.mesclar(futuro.result())
+    linhas = sum(a.linhas for a in total.estacoes.values())
+    logger.info(f"{len(arquivos)} arquivos agregados: {linhas} linhas, {len(total.estacoes)} estações")
+    return total
@@ -0,0 +1,313 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+
+from .prsa import COLUNAS_TEMPO, DTYPES_PRSA, montar_datetime
+from .agregacao import _partes_particao, ler_blocos, listar_arquivos
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+POLUENTES_AQI = ["PM2.5", "PM10", "SO2", "NO2", "CO", "O3"]
+
+# Índice individual (IAQI) da norma chinesa HJ 633-2012, a mesma região e as mesmas unidades
+# do conjunto PRSA. Os pontos de corte estão em µg/m³, inclusive os de CO (mg/m³ × 1000).
+NIVEIS_IAQI = (0, 50, 100, 150, 200, 300, 400, 500)
+# indicador -> (coluna, horas da média móvel, pontos de corte)
+INDICADORES = {
+    "PM2.5_24h": ("PM2.5", 24, (0, 35, 75, 115, 150, 250, 350, 500)),
+    "PM10_24h": ("PM10", 24, (0, 50, 150, 250, 350, 420, 500, 600)),
+    "SO2_24h": ("SO2", 24, (0, 50, 150, 475, 800, 1600, 2100, 2620)),
+    "NO2_24h": ("NO2", 24, (0, 40, 80, 180, 280, 565, 750, 940)),
+    "CO_24h": ("CO", 24, (0, 2000, 4000, 14000, 24000, 36000, 48000, 60000)),
+    "O3_1h": ("O3", 1, (0, 160, 200, 300, 400, 800, 1000, 1200)),
+    # Acima de 800 µg/m³ a média de 8h não tem IAQI; vale o da média horária
+    "O3_8h": ("O3", 8, (0, 100, 160, 215, 265, 800)),
+}
+# Mínimo de horas válidas para que a média móvel seja calculada
+HORAS_MINIMAS = {1: 1, 8: 6, 24: 20}
+# IAQI acima do qual a hora conta como excedência (início da faixa "levemente poluído")
+LIMIAR_EXCEDENCIA_PADRAO = 100
+LIMITES_NIVEL = (50, 100, 150, 200, 300)
+CHAVE_ESTADO = "estado_aqi"
+INDICADOR_GERAL = "AQI"
+COLUNAS_EPISODIOS = ["episodios", "horas_excedidas", "maior_episodio_horas", "em_andamento_horas"]
+
+_COLUNAS_USADAS = sorted({coluna for coluna, _, _ in INDICADORES.values()}, key=POLUENTES_AQI.index)
+_MAIOR_JANELA = max(horas for _, horas, _ in INDICADORES.values())
+
+
+def subindice(concentracoes, pontos_corte, niveis=NIVEIS_IAQI):
+    """
+    Converte concentrações em índice individual por interpolação linear entre pontos de corte.
+
+    A faixa de cada valor é encontrada com ``np.searchsorted`` sobre o array inteiro. O
+    resultado é arredondado para cima, como na norma. Valores negativos ou ausentes viram NaN;
+    acima do último ponto de corte o índice é o teto da escala (500) ou NaN quando a tabela
+    termina antes dele (O3 de 8h).
+
+    Parâmetros
+    ----------
+    concentracoes : array-like
+        Concentrações nas unidades dos pontos de corte.
+    pontos_corte : sequence
+        Pontos de corte crescentes, um por nível de ``niveis``.
+    niveis : sequence, opcional
+        Valores do índice em cada ponto de corte.
+
+    Retorna
+    -------
+    numpy.ndarray
+        Array float32.
+    """
+    c = np.asarray(concentracoes, dtype="float64")
+    pontos = np.asarray(pontos_corte, dtype="float64")
+    niveis = np.asarray(niveis[:len(pontos)], dtype="float64")
+    faixa = np.clip(np.searchsorted(pontos, c, side="right"), 1, len(pontos) - 1)
+    baixo, alto = pontos[faixa - 1], pontos[faixa]
+    iaqi = niveis[faixa - 1] + (niveis[faixa] - niveis[faixa - 1]) * (c - baixo) / (alto - baixo)
+    iaqi = np.ceil(iaqi)
+    iaqi[c > pontos[-1]] = NIVEIS_IAQI[-1] if niveis[-1] == NIVEIS_IAQI[-1] else np.nan
+    iaqi[c < 0] = np.nan
+    return iaqi.astype("float32")
+
+
+def medias_moveis(grade, horas, minimo):
+    """
+    Médias móveis finais (a hora atual e as ``horas - 1`` anteriores) das colunas de uma grade
+    horária contínua, com somas acumuladas. Janelas com menos de ``minimo`` valores válidos
+    resultam em NaN.
+    """
+    grade = np.asarray(grade, dtype="float64")
+    if horas == 1:
+        return grade.copy()
+    validos = ~np.isnan(grade)
+    zeros = np.zeros((1,) + grade.shape[1:])
+    somas = np.concatenate([zeros, np.cumsum(np.where(validos, grade, 0.0), axis=0)])
+    contagens = np.concatenate([zeros, np.cumsum(validos, axis=0)])
+    inicio = np.maximum(np.arange(1, len(grade) + 1) - horas, 0)
+    soma = somas[1:] - somas[inicio]
+    contagem = contagens[1:] - contagens[inicio]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(contagem >= minimo, soma / contagem, np.nan)
+
+
+def _hora_iso(hora):
+    return pd.Timestamp(int(hora), unit="h").isoformat()
+
+
+def _hora_int(iso):
+    return int(np.datetime64(pd.Timestamp(iso).to_datetime64(), "h").astype("int64"))
+
+
+class CalculadoraAQI:
+    """
+    Calcula médias móveis, índices individuais, AQI e episódios de excedência em fluxo.
+
+    Os dados podem chegar em blocos de qualquer tamanho, desde que, para cada estação, cada
+    bloco traga horas posteriores às já processadas (horas repetidas ou anteriores são
+    descartadas). Entre blocos, cada estação guarda apenas as últimas ``23`` horas de
+    concentrações (a cauda das janelas de 24h) e, por indicador, os contadores de episódios e
+    a duração do episódio em andamento. Esse estado é serializável em JSON
+    (:meth:`estado` / :meth:`de_estado`), o que permite continuar o cálculo em outra execução.
+
+    Parâmetros
+    ----------
+    limiar : float, opcional
+        IAQI acima do qual uma hora conta como excedência.
+    """
+
+    def __init__(self, limiar=LIMIAR_EXCEDENCIA_PADRAO):
+        self.limiar = float(limiar)
+        self._caudas = {}
+        self._ultimas = {}
+        self._episodios = {}
+
+    def _processar_estacao(self, estacao, df):
+        horas = df.index.to_numpy().astype("datetime64[h]").astype("int64")
+        ultima = self._ultimas.get(estacao)
+        # Horas já vistas são descartadas; dentro do bloco, a primeira leitura de cada hora vale
+        horas, posicoes = np.unique(horas, return_index=True)
+        if ultima is not None:
+            novas = horas > ultima
+            horas, posicoes = horas[novas], posicoes[novas]
+        if len(horas) == 0:
+            return None
+        df = df.iloc[posicoes]
+        valores = df.reindex(columns=_COLUNAS_USADAS).to_numpy(dtype="float64")
+
+        cauda = self._caudas.get(estacao)
+        continua = cauda is not None and horas[0] - ultima < _MAIOR_JANELA
+        inicio = ultima - len(cauda) + 1 if continua else horas[0]
+        grade = np.full((horas[-1] - inicio + 1, len(_COLUNAS_USADAS)), np.nan)
+        if continua:
+            grade[:len(cauda)] = cauda
+        grade[horas - inicio] = valores
+        linhas = horas - inicio
+
+        medias, iaqi = {}, {}
+        for indicador, (coluna, janela, pontos) in INDICADORES.items():
+            media = medias_moveis(grade[:, _COLUNAS_USADAS.index(coluna)], janela, HORAS_MINIMAS[janela])[linhas]
+            medias[indicador] = media.astype("float32")
+            iaqi[indicador] = subindice(media, pontos)
+        matriz = np.column_stack(list(iaqi.values()))
+        aqi = np.fmax.reduce(matriz, axis=1)
+
+        resultado = pd.DataFrame(index=df.index)
+        for coluna in COLUNAS_TEMPO:
+            resultado[coluna] = getattr(df.index, coluna).to_numpy().astype(DTYPES_PRSA[coluna])
+        resultado["station"] = estacao
+        for indicador in INDICADORES:
+            resultado[indicador] = medias[indicador]
+        for indicador in INDICADORES:
+            resultado[f"IAQI_{indicador}"] = iaqi[indicador]
+        resultado["AQI"] = aqi
+        nivel = np.searchsorted(LIMITES_NIVEL, aqi, side="left") + 1
+        resultado["nivel"] = np.where(np.isnan(aqi), 0, nivel).astype("int8")
+        # Poluente principal só existe quando o AQI passa de 50
+        principal = np.argmax(np.where(np.isnan(matriz), -1, matriz), axis=1)
+        nomes = np.array([INDICADORES[i][0] for i in INDICADORES], dtype=object)[principal]
+        resultado["poluente_principal"] = pd.Categorical(np.where(aqi > 50, nomes, None), categories=POLUENTES_AQI)
+
+        excedencias = {i: np.nan_to_num(v, nan=-np.inf) > self.limiar for i, v in iaqi.items()}
+        excedencias[INDICADOR_GERAL] = np.nan_to_num(aqi, nan=-np.inf) > self.limiar
+        for indicador, excede in excedencias.items():
+            self._contar_episodios(estacao, indicador, horas, excede, ultima)
+
+        self._ultimas[estacao] = int(horas[-1])
+        self._caudas[estacao] = grade[-(_MAIOR_JANELA - 1):]
+        return resultado
+
+    def _contar_episodios(self, estacao, indicador, horas, excede, ultima):
+        # Um episódio é uma sequência de horas consecutivas em excedência. O episódio em
+        # andamento no fim do bloco anterior continua se a primeira hora nova o prolongar.
+        contadores = self._episodios.setdefault((estacao, indicador), [0, 0, 0, 0])
+        anterior = np.empty(len(horas), dtype=bool)
+        anterior[0] = contadores[3] > 0 and ultima is not None and horas[0] == ultima + 1
+        anterior[1:] = excede[:-1] & (np.diff(horas) == 1)
+        inicios = excede & ~anterior
+        rotulos = np.cumsum(inicios)
+        duracoes = np.bincount(rotulos[excede], minlength=rotulos[-1] + 1)
+        if anterior[0] and excede[0]:
+            duracoes[0] += contadores[3]
+        contadores[0] += int(inicios.sum())
+        contadores[1] += int(excede.sum())
+        contadores[2] = max(contadores[2], int(duracoes.max()))
+        contadores[3] = int(duracoes[rotulos[-1]]) if excede[-1] else 0
+
+    def processar(self, df):
+        """
+        Processa um bloco de leituras.
+
+        Parâmetros
+        ----------
+        df : pandas.DataFrame
+            Leituras indexadas por datetime, com ``station`` e as colunas de ``POLUENTES_AQI``.
+
+        Retorna
+        -------
+        pandas.DataFrame
+            Uma linha por hora nova: colunas de data, ``station``, as médias de cada indicador,
+            os índices ``IAQI_<indicador>``, ``AQI``, ``nivel`` (1 a 6; 0 sem dados) e
+            ``poluente_principal``. Ordenado por estação e hora.
+        """
+        if df.empty:
+            return pd.DataFrame()
+        estacoes = df["station"].astype(str).to_numpy()
+        partes = []
+        for estacao in pd.unique(estacoes):
+            parte = self._processar_estacao(estacao, df[estacoes == estacao])
+            if parte is not None:
+                partes.append(parte)
+        if not partes:
+            return pd.DataFrame()
+        resultado = pd.concat(partes)
+        resultado["station"] = resultado["station"].astype("category")
+        return resultado
+
+    def marcas(self):
+        """Última hora processada de cada estação, no formato das marcas d'água."""
+        return {estacao: _hora_iso(hora) for estacao, hora in self._ultimas.items()}
+
+    def resumo_episodios(self):
+        """
+        Episódios de excedência acumulados por estação e indicador.
+
+        Retorna
+        -------
+        pandas.DataFrame
+            Indexado por (``station``, ``indicador``), com ``episodios``, ``horas_excedidas``,
+            ``maior_episodio_horas`` e ``em_andamento_horas``.
+        """
+        indice = pd.MultiIndex.from_tuples(sorted(self._episodios), names=["station", "indicador"])
+        return pd.DataFrame([self._episodios[chave] for chave in indice], index=indice, columns=COLUNAS_EPISODIOS)
+
+    def estado(self):
+        """Estado da calculadora em um dicionário serializável em JSON."""
+        estacoes = {}
+        for estacao, ultima in self._ultimas.items():
+            cauda = self._caudas[estacao]
+            estacoes[estacao] = {
+                "ultima": _hora_iso(ultima),
+                "cauda": [[None if np.isnan(v) else float(v) for v in linha] for linha in cauda],
+                "episodios": {i: list(c) for (e, i), c in self._episodios.items() if e == estacao},
+            }
+        return {"limiar": self.limiar, "colunas": list(_COLUNAS_USADAS), "estacoes": estacoes}
+
+    @classmethod
+    def de_estado(cls, estado):
+        """Recria uma calculadora a partir de :meth:`estado`."""
+        calculadora = cls(estado["limiar"])
+        if list(estado.get("colunas", [])) != _COLUNAS_USADAS:
+            raise ValueError(f"Estado de AQI com colunas {estado.get('colunas')}; esperado {_COLUNAS_USADAS}.")
+        for estacao, dados in estado["estacoes"].items():
+            calculadora._ultimas[estacao] = _hora_int(dados["ultima"])
+            calculadora._caudas[estacao] = np.array(
+                [[np.nan if v is None else v for v in linha] for linha in dados["cauda"]], dtype="float64"
+            ).reshape(-1, len(_COLUNAS_USADAS))
+            for indicador, contadores in dados["episodios"].items():
+                calculadora._episodios[(estacao, indicador)] = [int(c) for c in contadores]
+        return calculadora
+
+
+def ler_particoes(caminhos, marcas=None):
+    """
+    Lê o dataset (Parquet particionado ou CSVs PRSA) uma partição por vez, em ordem de estação
+    e ano, com as colunas de data, ``station`` e os poluentes, indexado por datetime.
+
+    Cada partição (ou CSV) é um bloco: só ele fica em memória. Partições de anos anteriores ao
+    da marca d'água da estação não são lidas.
+
+    Parâmetros
+    ----------
+    caminhos : str ou list
+        Arquivos ou diretórios.
+    marcas : dict, opcional
+        ``{estacao: instante}`` das últimas horas já processadas.
+
+    Retorna
+    -------
+    generator
+        DataFrames ordenados por datetime.
+    """
+    anos_minimos = {e: pd.Timestamp(i).year for e, i in (marcas or {}).items()}
+    grupos = {}
+    for arquivo in listar_arquivos(caminhos):
+        chave = os.path.dirname(arquivo) if arquivo.endswith(".parquet") else arquivo
+        grupos.setdefault(chave, []).append(arquivo)
+
+    def ordem(chave):
+        particao = _partes_particao(chave)
+        return particao.get("station", ""), int(particao.get("year", 0)), chave
+
+    for chave in sorted(grupos, key=ordem):
+        particao = _partes_particao(chave)
+        if "station" in particao and "year" in particao and int(particao["year"]) < anos_minimos.get(particao["station"], 0):
+            continue
+        blocos = [b for arquivo in grupos[chave] for b in ler_blocos(arquivo, POLUENTES_AQI)]
+        if not blocos:
+            continue
+        df = pd.concat(blocos, ignore_index=True)
+        df.index = pd.DatetimeIndex(montar_datetime(df["year"], df["month"], df["day"], df["hour"]), name="datetime")
+        yield df.sort_index(kind="stable")
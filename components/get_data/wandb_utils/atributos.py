@@ -0,0 +1,254 @@
+import time
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from .prsa import COLUNAS_POLUENTES, COLUNAS_TEMPO, DIRECOES_VENTO
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+LAGS_PADRAO = (1, 2, 3, 24)
+JANELAS_PADRAO = (6, 24)
+SPANS_EWM_PADRAO = (6, 24)
+QUANTIS_PADRAO = (0.5, 0.9)
+CODIFICACOES_WD = ("sincos", "onehot")
+
+
+def _nome_quantil(q):
+    return f"p{q * 100:g}".replace(".", "_")
+
+
+def nomes_atributos(colunas, lags=LAGS_PADRAO, janelas=JANELAS_PADRAO, spans_ewm=SPANS_EWM_PADRAO,
+                    quantis=QUANTIS_PADRAO, codificacao_wd="sincos"):
+    """Nomes, na ordem de saída, das colunas geradas por :func:`gerar_atributos`."""
+    nomes = []
+    for coluna in colunas:
+        nomes.append(coluna)
+        nomes += [f"{coluna}_lag_{lag}h" for lag in lags]
+        for janela in janelas:
+            nomes.append(f"{coluna}_media_{janela}h")
+            nomes += [f"{coluna}_{_nome_quantil(q)}_{janela}h" for q in quantis]
+        nomes += [f"{coluna}_ewm_{span}h" for span in spans_ewm]
+    if codificacao_wd == "onehot":
+        nomes += [f"wd_{direcao}" for direcao in DIRECOES_VENTO]
+    elif codificacao_wd == "sincos":
+        nomes += ["wd_sin", "wd_cos"]
+    nomes += ["hora_sin", "hora_cos", "mes_sin", "mes_cos"]
+    return nomes
+
+
+def _grade_horaria(indice):
+    # Posição de cada linha em uma grade horária contínua da estação: lags e janelas passam
+    # a ser contados em horas, mesmo quando há horas faltando no dataset
+    horas = indice.to_numpy().astype("datetime64[h]").astype("int64")
+    posicoes = horas - horas.min()
+    return posicoes, int(posicoes.max()) + 1
+
+
+def _codificar_wd(wd, codificacao):
+    # Em colunas categóricas (o caso do dataset) só os códigos são remapeados
+    codigos = np.asarray(pd.Series(wd).astype(pd.CategoricalDtype(DIRECOES_VENTO)).cat.codes)
+    validos = codigos >= 0
+    if codificacao == "onehot":
+        # Direção ausente (ou "calm") fica com todas as colunas zeradas
+        matriz = np.zeros((len(codigos), len(DIRECOES_VENTO)), dtype=np.float32)
+        matriz[np.flatnonzero(validos), codigos[validos]] = 1.0
+        return matriz
+    angulo = np.where(validos, codigos * (2 * np.pi / len(DIRECOES_VENTO)), np.nan)
+    return np.column_stack([np.sin(angulo), np.cos(angulo)]).astype(np.float32)
+
+
+def _ciclicos(valores, periodo):
+    angulo = np.asarray(valores, dtype=np.float64) * (2 * np.pi / periodo)
+    return np.column_stack([np.sin(angulo), np.cos(angulo)])
+
+
+def _interpolar_quantis(ordenadas, quantis, ultimo):
+    # ordenadas: (janelas, tamanho) com os valores válidos no início; ultimo: índice do último válido
+    for q in quantis:
+        posicao = q * ultimo
+        abaixo = np.floor(posicao).astype(np.int64)
+        acima = np.minimum(abaixo + 1, ultimo)
+        inferior = np.take_along_axis(ordenadas, abaixo[:, None], axis=-1)[:, 0]
+        superior = np.take_along_axis(ordenadas, acima[:, None], axis=-1)[:, 0]
+        yield inferior + (superior - inferior) * (posicao - abaixo).astype(np.float32)
+
+
+def _quantis_moveis(grade, janela, quantis, elementos_por_bloco=2**22):
+    """
+    Quantis de janelas móveis (terminando em cada hora, com os valores disponíveis nelas)
+    para todas as colunas de ``grade``, com interpolação linear como ``rolling().quantile()``.
+
+    Cada janela é ordenada uma única vez para todos os quantis. Nas janelas completas as
+    posições dos quantis são as mesmas em todas as linhas; só as janelas com lacunas precisam
+    de índices por linha. O trabalho é feito em blocos de linhas para limitar a memória das
+    janelas ordenadas.
+    """
+    n_horas, n_colunas = grade.shape
+    resultado = np.full((len(quantis), n_horas, n_colunas), np.nan, dtype=np.float32)
+    # As medições são float32: ordenar em float32 é mais rápido e não perde precisão
+    preenchida = np.concatenate([np.full((janela - 1, n_colunas), np.nan, dtype=np.float32), grade.astype(np.float32)])
+    janelas = np.lib.stride_tricks.sliding_window_view(preenchida, janela, axis=0)
+    # Faltantes em cada janela por diferença de somas acumuladas, sem materializar as janelas
+    acumulado = np.concatenate([np.zeros((1, n_colunas), dtype=np.int64), np.cumsum(np.isnan(preenchida), axis=0)])
+    contagem = janela - (acumulado[janela:] - acumulado[:-janela])
+
+    posicoes = np.asarray(quantis, dtype=np.float64) * (janela - 1)
+    abaixo = np.floor(posicoes).astype(np.int64)
+    acima = np.minimum(abaixo + 1, janela - 1)
+    fracoes = (posicoes - abaixo).astype(np.float32)
+
+    passo = max(1, elementos_por_bloco // (janela * n_colunas))
+    for inicio in range(0, n_horas, passo):
+        fim = min(inicio + passo, n_horas)
+        bloco, contagem_bloco = janelas[inicio:fim], contagem[inicio:fim]
+        # NaN vão para o fim de cada janela ordenada
+        ordenadas = np.sort(bloco, axis=-1)
+        for i in range(len(quantis)):
+            inferior = ordenadas[..., abaixo[i]]
+            resultado[i, inicio:fim] = inferior + (ordenadas[..., acima[i]] - inferior) * fracoes[i]
+        parciais = contagem_bloco < janela
+        if parciais.any():
+            ultimo = contagem_bloco[parciais] - 1
+            for i, valores in enumerate(_interpolar_quantis(ordenadas[parciais], quantis, np.maximum(ultimo, 0))):
+                resultado[i, inicio:fim][parciais] = np.where(ultimo >= 0, valores, np.nan)
+    return resultado
+
+
+def atributos_estacao(df, colunas, lags=LAGS_PADRAO, janelas=JANELAS_PADRAO, spans_ewm=SPANS_EWM_PADRAO,
+                      quantis=QUANTIS_PADRAO, codificacao_wd="sincos"):
+    """
+    Gera a matriz de atributos de uma única estação.
+
+    As séries são colocadas em uma grade horária contínua, de modo que um lag de 24h é sempre
+    o valor de 24 horas antes (NaN se essa hora não existe) e as janelas cobrem horas, não
+    linhas. As janelas móveis terminam na hora corrente (inclusive) e usam os valores
+    disponíveis dentro delas; as médias exponenciais decaem por hora, inclusive nas lacunas.
+    Todas as colunas são processadas de uma vez, sem laços por coluna.
+
+    Retorna
+    -------
+    pandas.DataFrame
+        Colunas de data, ``station`` e os atributos em float32, com o mesmo índice de ``df``.
+    """
+    posicoes, n_horas = _grade_horaria(df.index)
+    grade = np.full((n_horas, len(colunas)), np.nan)
+    grade[posicoes] = df[colunas].to_numpy(dtype=np.float64, na_value=np.nan)
+    quadro = pd.DataFrame(grade)
+
+    # Cada bloco tem uma coluna por coluna de entrada; a ordem final segue nomes_atributos
+    blocos = {"valor": grade}
+    for lag in lags:
+        deslocado = np.full_like(grade, np.nan)
+        deslocado[lag:] = grade[:n_horas - lag]
+        blocos[("lag", lag)] = deslocado
+    for janela in janelas:
+        blocos[("media", janela)] = quadro.rolling(janela, min_periods=1).mean().to_numpy()
+        for q, valores in zip(quantis, _quantis_moveis(grade, janela, quantis)):
+            blocos[("quantil", janela, q)] = valores
+    for span in spans_ewm:
+        blocos[("ewm", span)] = quadro.ewm(span=span).mean().to_numpy()
+
+    ordem = ["valor"] + [("lag", lag) for lag in lags]
+    for janela in janelas:
+        ordem += [("media", janela)] + [("quantil", janela, q) for q in quantis]
+    ordem += [("ewm", span) for span in spans_ewm]
+    # (linhas, colunas, blocos) -> (linhas, colunas x blocos): atributos agrupados por coluna de entrada
+    pilha = np.empty((len(df), len(colunas), len(ordem)), dtype=np.float32)
+    for i, chave in enumerate(ordem):
+        pilha[:, :, i] = blocos[chave][posicoes]
+    partes = [pilha.reshape(len(df), -1)]
+
+    if codificacao_wd in CODIFICACOES_WD and "wd" in df.columns:
+        partes.append(_codificar_wd(df["wd"], codificacao_wd))
+    elif codificacao_wd in CODIFICACOES_WD:
+        largura = len(DIRECOES_VENTO) if codificacao_wd == "onehot" else 2
+        partes.append(np.full((len(df), largura), np.nan, dtype=np.float32))
+    partes.append(_ciclicos(df.index.hour, 24).astype(np.float32))
+    partes.append(_ciclicos(df.index.month - 1, 12).astype(np.float32))
+
+    nomes = nomes_atributos(colunas, lags, janelas, spans_ewm, quantis, codificacao_wd)
+    atributos = pd.DataFrame(np.concatenate(partes, axis=1), index=df.index, columns=nomes)
+    tempo = pd.DataFrame({
+        "year": df.index.year.astype("int16"),
+        "month": df.index.month.astype("int8"),
+        "day": df.index.day.astype("int8"),
+        "hour": df.index.hour.astype("int8"),
+        "station": df["station"].to_numpy(),
+    }, index=df.index)
+    return pd.concat([tempo, atributos], axis=1)
+
+
+def _atributos_bloco(df, colunas, opcoes):
+    return atributos_estacao(df, colunas, **opcoes)
+
+
+def gerar_atributos(df, colunas=None, processos=None, lags=LAGS_PADRAO, janelas=JANELAS_PADRAO,
+                    spans_ewm=SPANS_EWM_PADRAO, quantis=QUANTIS_PADRAO, codificacao_wd="sincos"):
+    """
+    Gera a matriz de atributos de séries temporais, estação por estação.
+
+    Parâmetros
+    ----------
+    df : pandas.DataFrame
+        Dados indexados por datetime, com a coluna ``station`` (e ``wd``, se houver).
+    colunas : list, opcional
+        Colunas numéricas usadas nos lags, janelas e médias exponenciais. Se None, usa os
+        poluentes presentes em ``df``.
+    processos : int, opcional
+        Se maior que 1, as estações são processadas em um pool de processos com esse
+        número de workers.
+    lags : sequence of int, opcional
+        Defasagens, em horas.
+    janelas : sequence of int, opcional
+        Tamanhos, em horas, das janelas móveis de média e quantis.
+    spans_ewm : sequence of int, opcional
+        Spans, em horas, das médias móveis exponenciais.
+    quantis : sequence of float, opcional
+        Quantis calculados em cada janela móvel.
+    codificacao_wd : str, opcional
+        ``"sincos"`` (seno e cosseno do ângulo), ``"onehot"`` (uma coluna por direção) ou
+        ``"nenhuma"``.
+
+    Retorna
+    -------
+    tuple
+        ``(df_atributos, metricas)``. ``df_atributos`` tem as colunas de data, ``station`` e
+        os atributos em float32; ``metricas`` traz ``linhas``, ``atributos``, ``segundos`` e
+        ``linhas_por_segundo``.
+    """
+    if codificacao_wd not in CODIFICACOES_WD + ("nenhuma",):
+        raise ValueError(f"Codificação de wd desconhecida: {codificacao_wd}. Opções: {list(CODIFICACOES_WD) + ['nenhuma']}")
+    colunas = list(colunas or [c for c in COLUNAS_POLUENTES if c in df.columns])
+    opcoes = {
+        "lags": tuple(lags), "janelas": tuple(janelas), "spans_ewm": tuple(spans_ewm),
+        "quantis": tuple(quantis), "codificacao_wd": codificacao_wd,
+    }
+
+    inicio = time.perf_counter()
+    estacoes = [grupo for _, grupo in df.groupby("station", observed=True, sort=False)]
+    if processos and processos > 1 and len(estacoes) > 1:
+        with ProcessPoolExecutor(max_workers=min(processos, len(estacoes))) as executor:
+            partes = list(executor.map(
+                _atributos_bloco, estacoes, [colunas] * len(estacoes), [opcoes] * len(estacoes),
+            ))
+    else:
+        partes = [_atributos_bloco(grupo, colunas, opcoes) for grupo in estacoes]
+    resultado = pd.concat(partes) if partes else pd.DataFrame(columns=COLUNAS_TEMPO + ["station"])
+    resultado["station"] = resultado["station"].astype(str).astype("category")
+    segundos = time.perf_counter() - inicio
+
+    metricas = {
+        "processos": processos or 1,
+        "linhas": len(df),
+        "atributos": resultado.shape[1] - len(COLUNAS_TEMPO) - 1,
+        "segundos": segundos,
+        "linhas_por_segundo": len(df) / segundos if segundos > 0 else float("inf"),
+    }
+    logger.info(
+        f"Atributos ({metricas['processos']} processo(s)): {metricas['linhas']} linhas x "
+        f"{metricas['atributos']} atributos em {segundos:.2f}s ({metricas['linhas_por_segundo']:.0f} linhas/s)"
+    )
+    return resultado, metricas
@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import shutil
+import logging
+import tempfile
+import functools
+import threading
+
+from .utils import TIMEOUT_PADRAO, _gravar_stream, _hash_arquivo
+from .importacao import ModuloTardio
+
+requests = ModuloTardio("requests")
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+NOME_INDICE = "indice.json"
+
+
+def _sincronizado(metodo):
+    # O índice é compartilhado quando várias fontes são baixadas em paralelo
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        with self._trava:
+            return metodo(self, *args, **kwargs)
+    return envolvido
+
+
+class CacheDownloads:
+    """
+    Cache local de downloads endereçado por conteúdo.
+
+    Cada arquivo é guardado em ``<diretorio>/objetos/<sha256>/<nome original>`` e o índice
+    (``<diretorio>/indice.json``) mapeia a URL de origem para o hash do conteúdo, os cabeçalhos
+    de validação (ETag / Last-Modified) e os arquivos já extraídos a partir dele. URLs diferentes
+    com o mesmo conteúdo compartilham o mesmo objeto.
+
+    Parâmetros
+    ----------
+    diretorio : str
+        Diretório do cache, normalmente ``<local_data_dir>/.cache``.
+    tamanho_maximo : int, opcional
+        Tamanho máximo, em bytes, ocupado pelos objetos. Quando ultrapassado, as entradas
+        usadas há mais tempo são removidas (LRU). Se None, o cache não tem limite.
+    sessao : requests.Session, opcional
+        Sessão usada nas requisições de revalidação.
+    timeout : float ou tuple, opcional
+        Timeout repassado ao ``requests``.
+    """
+
+    def __init__(self, diretorio, tamanho_maximo=None, sessao=None, timeout=TIMEOUT_PADRAO):
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        self.sessao = sessao or requests
+        self.timeout = timeout
+        self.caminho_indice = os.path.join(diretorio, NOME_INDICE)
+        self._trava = threading.RLock()
+        os.makedirs(os.path.join(diretorio, "objetos"), exist_ok=True)
+        self.indice = self._carregar_indice()
+
+    def _carregar_indice(self):
+        if not os.path.exists(self.caminho_indice):
+            return {}
+        try:
+            with open(self.caminho_indice, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Índice do cache '{self.caminho_indice}' ilegível ({e}). Recomeçando com cache vazio.")
+            return {}
+
+    def _salvar_indice(self):
+        temporario = self.caminho_indice + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.indice, f, indent=2)
+        os.replace(temporario, self.caminho_indice)
+
+    def _remover_entrada(self, url):
+        entrada = self.indice.pop(url, None)
+        if entrada is None:
+            return
+        em_uso = any(e["sha256"] == entrada["sha256"] for e in self.indice.values())
+        if not em_uso:
+            shutil.rmtree(os.path.dirname(entrada["caminho"]), ignore_errors=True)
+
+    @_sincronizado
+    def tamanho_total(self):
+        """Soma, em bytes, dos objetos distintos guardados no cache."""
+        return sum({e["sha256"]: e["tamanho"] for e in self.indice.values()}.values())
+
+    def _revalidar(self, url, entrada):
+        """
+        Faz uma requisição condicional e retorna a entrada válida para a URL: a própria
+        ``entrada`` se o servidor responder 304 (ou não puder ser consultado) e uma nova entrada
+        se o conteúdo mudou, gravada a partir do corpo da mesma resposta 200, sem um segundo
+        GET. Retorna None se não houver cabeçalhos de validação ou se a resposta não for 200.
+        """
+        cabecalhos = {}
+        if entrada.get("etag"):
+            cabecalhos["If-None-Match"] = entrada["etag"]
+        if entrada.get("last_modified"):
+            cabecalhos["If-Modified-Since"] = entrada["last_modified"]
+        if not cabecalhos:
+            return None
+        recebendo = None
+        try:
+            with self.sessao.get(url, headers=cabecalhos, stream=True, timeout=self.timeout) as resposta:
+                if resposta.status_code == 304:
+                    return entrada
+                resposta.raise_for_status()
+                if resposta.status_code != 200:
+                    return None
+                logger.info(f"Conteúdo de {url} mudou no servidor. Gravando a resposta da revalidação no cache.")
+                recebendo = tempfile.mkdtemp(dir=self.diretorio, prefix=".recebendo-")
+                resultado = _gravar_stream(resposta, os.path.join(recebendo, os.path.basename(entrada["caminho"])))
+            return self.armazenar(url, resultado.caminho, resultado)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Não foi possível revalidar {url} ({e}). Usando a cópia em cache.")
+            return entrada
+        finally:
+            if recebendo is not None:
+                shutil.rmtree(recebendo, ignore_errors=True)
+
+    def consultar(self, url, revalidar=True):
+        """
+        Procura a URL no cache.
+
+        Parâmetros
+        ----------
+        url : str
+            A URL de origem.
+        revalidar : bool, opcional
+            Se True, confirma com o servidor (If-None-Match / If-Modified-Since) que o
+            conteúdo não mudou; se mudou, o novo conteúdo vem na própria resposta e a entrada
+            retornada já é a atualizada. Se False, qualquer entrada existente é considerada válida.
+
+        Retorna
+        -------
+        dict ou None
+            A entrada do cache, com o caminho do objeto em ``"caminho"``, ou None se não
+            houver entrada válida.
+        """
+        with self._trava:
+            entrada = self.indice.get(url)
+            if entrada is None:
+                return None
+            if not os.path.exists(entrada["caminho"]):
+                logger.info(f"Objeto em cache de {url} não existe mais em disco. Descartando a entrada.")
+                self._remover_entrada(url)
+                self._salvar_indice()
+                return None
+        # A revalidação é feita fora da trava para não serializar as fontes baixadas em paralelo
+        if revalidar:
+            atualizada = self._revalidar(url, entrada)
+            if atualizada is None:
+                logger.info(f"Entrada em cache de {url} não confirmada pelo servidor. O arquivo será baixado de novo.")
+                return None
+            if atualizada is not entrada:
+                return atualizada
+        with self._trava:
+            entrada["ultimo_acesso"] = time.time()
+            self._salvar_indice()
+        logger.info(f"Cache hit para {url} (sha256={entrada['sha256']}).")
+        return entrada
+
+    @_sincronizado
+    def armazenar(self, url, caminho_arquivo, resultado=None):
+        """
+        Guarda um arquivo recém-baixado no cache.
+
+        O arquivo original é mantido: o objeto é criado como hard link quando possível e
+        copiado caso contrário.
+
+        Parâmetros
+        ----------
+        url : str
+            A URL de origem.
+        caminho_arquivo : str
+            O arquivo baixado.
+        resultado : ResultadoDownload, opcional
+            Resultado do download. Quando traz um hash sha256 e os cabeçalhos de validação,
+            o arquivo não precisa ser relido.
+
+        Retorna
+        -------
+        dict
+            A nova entrada do cache.
+        """
+        sha256 = getattr(resultado, "hash", None) if getattr(resultado, "algoritmo_hash", None) == "sha256" else None
+        sha256 = sha256 or _hash_arquivo(caminho_arquivo, "sha256")
+        diretorio_objeto = os.path.join(self.diretorio, "objetos", sha256)
+        caminho_objeto = os.path.join(diretorio_objeto, os.path.basename(caminho_arquivo))
+        if not os.path.exists(caminho_objeto):
+            os.makedirs(diretorio_objeto, exist_ok=True)
+            try:
+                os.link(caminho_arquivo, caminho_objeto)
+            except OSError:
+                shutil.copy2(caminho_arquivo, caminho_objeto)
+
+        anterior = self.indice.get(url)
+        if anterior is not None and anterior["sha256"] != sha256:
+            self._remover_entrada(url)
+        entrada = {
+            "sha256": sha256,
+            "caminho": caminho_objeto,
+            "tamanho": os.path.getsize(caminho_objeto),
+            "etag": getattr(resultado, "etag", None),
+            "last_modified": getattr(resultado, "last_modified", None),
+            "ultimo_acesso": time.time(),
+            "extraidos": [],
+        }
+        self.indice[url] = entrada
+        self._evictar(preservar=url)
+        self._salvar_indice()
+        return entrada
+
+    @_sincronizado
+    def registrar_extracao(self, url, arquivos):
+        """Associa à URL a lista de arquivos extraídos a partir do objeto em cache."""
+        if url in self.indice:
+            self.indice[url]["extraidos"] = list(arquivos)
+            self._salvar_indice()
+
+    @staticmethod
+    def arquivos_extraidos(entrada):
+        """Retorna os arquivos extraídos da entrada se todos ainda existirem, ou None."""
+        arquivos = entrada.get("extraidos") or []
+        if arquivos and all(os.path.exists(a) for a in arquivos):
+            return arquivos
+        return None
+
+    @staticmethod
+    def materializar(entrada, destino):
+        """
+        Disponibiliza o objeto em cache em ``destino`` (hard link ou cópia). Um ``destino``
+        existente só é reaproveitado se tiver o tamanho e o sha256 da entrada; caso contrário
+        (ex.: sobra de uma versão anterior) é substituído.
+        """
+        if os.path.exists(destino):
+            if os.path.getsize(destino) == entrada["tamanho"] and (
+                os.path.samefile(destino, entrada["caminho"]) or _hash_arquivo(destino, "sha256") == entrada["sha256"]
+            ):
+                return destino
+            logger.info(f"'{destino}' não corresponde ao objeto em cache. Substituindo.")
+            os.remove(destino)
+        os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+        try:
+            os.link(entrada["caminho"], destino)
+        except OSError:
+            shutil.copy2(entrada["caminho"], destino)
+        return destino
+
+    def _evictar(self, preservar=None):
+        if self.tamanho_maximo is None:
+            return
+        por_acesso = sorted(self.indice.items(), key=lambda item: item[1]["ultimo_acesso"])
+        for url, entrada in por_acesso:
+            if self.tamanho_total() <= self.tamanho_maximo:
+                break
+            if url == preservar:
+                continue
+            logger.info(f"Removendo {url} do cache (LRU, {entrada['tamanho']} bytes).")
+            self._remover_entrada(url)
@@ -0,0 +1,289 @@
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+from .prsa import COLUNAS_PRSA, COLUNAS_TEMPO, montar_datetime
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+# O prefixo "_" faz o pyarrow ignorar o arquivo ao ler o dataset Parquet
+NOME_ARQUIVO_INDICE = "_indice_consulta.json"
+VERSAO_INDICE = 1
+TAMANHO_CACHE_PADRAO = 256 * 2**20
+COLUNAS_GRUPO = ["month", "day", "hour"]
+
+
+def _horas(valor):
+    # Instante -> horas desde 1970, a resolução do dataset
+    return int(pd.Timestamp(valor).to_datetime64().astype("datetime64[h]").astype(np.int64))
+
+
+def _particao(caminho_relativo):
+    chaves = {}
+    for parte in caminho_relativo.split(os.sep):
+        if "=" in parte:
+            chave, valor = parte.split("=", 1)
+            # O pyarrow codifica caracteres especiais nos nomes das partições
+            chaves[chave] = unquote(valor)
+    return chaves
+
+
+class CacheBlocos:
+    """
+    Cache LRU de colunas decodificadas, por arquivo, grupo de linhas e coluna.
+
+    Parâmetros
+    ----------
+    tamanho_maximo : int, opcional
+        Bytes máximos ocupados pelos arrays decodificados. As entradas usadas há mais tempo
+        são descartadas quando o limite é ultrapassado.
+    """
+
+    def __init__(self, tamanho_maximo=TAMANHO_CACHE_PADRAO):
+        self.tamanho_maximo = tamanho_maximo
+        self.tamanho = 0
+        self.acertos = 0
+        self.faltas = 0
+        self._entradas = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, chave):
+        with self._trava:
+            valor = self._entradas.get(chave)
+            if valor is None:
+                self.faltas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return valor[0]
+
+    def guardar(self, chave, valor):
+        tamanho = int(getattr(valor, "nbytes", 0))
+        with self._trava:
+            if chave in self._entradas:
+                self.tamanho -= self._entradas.pop(chave)[1]
+            self._entradas[chave] = (valor, tamanho)
+            self.tamanho += tamanho
+            while self.tamanho > self.tamanho_maximo and len(self._entradas) > 1:
+                _, (_, descartado) = self._entradas.popitem(last=False)
+                self.tamanho -= descartado
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+            self.tamanho = 0
+
+
+class ArmazemPRSA:
+    """
+    Consultas por estação e intervalo de tempo sobre o dataset Parquet particionado.
+
+    O índice guarda, para cada estação, os grupos de linhas (row groups) de cada arquivo
+    ordenados pelo instante inicial, com o primeiro e o último instante de cada grupo.
+    Uma consulta localiza os grupos por busca binária e lê deles apenas as colunas pedidas;
+    as partições de outras estações nem são abertas. O índice é montado lendo só as colunas
+    de data de cada grupo e é gravado em ``_indice_consulta.json`` no próprio dataset,
+    sendo refeito apenas para arquivos cujo tamanho ou data de modificação mudou.
+
+    Parâmetros
+    ----------
+    caminho : str
+        Diretório do dataset gravado por ``gravar_parquet_prsa``.
+    tamanho_cache : int, opcional
+        Bytes máximos do cache LRU de colunas decodificadas.
+    persistir_indice : bool, opcional
+        Se True, grava o índice no dataset para reaproveitá-lo nas próximas aberturas.
+    """
+
+    def __init__(self, caminho, tamanho_cache=TAMANHO_CACHE_PADRAO, persistir_indice=True):
+        self.caminho = caminho
+        self.cache = CacheBlocos(tamanho_cache)
+        self.persistir_indice = persistir_indice
+        self._arquivos = {}
+        self._trava = threading.Lock()
+        self.atualizar_indice()
+
+    def _indexar_arquivo(self, relativo, estado):
+        import pyarrow.parquet as pq
+
+        particao = _particao(os.path.dirname(relativo))
+        arquivo = pq.ParquetFile(os.path.join(self.caminho, relativo))
+        ano = int(particao["year"]) if "year" in particao else None
+        colunas_tempo = COLUNAS_GRUPO if ano is not None else COLUNAS_TEMPO
+        grupos = []
+        for i in range(arquivo.metadata.num_row_groups):
+            if not arquivo.metadata.row_group(i).num_rows:
+                continue
+            tabela = arquivo.read_row_group(i, columns=colunas_tempo)
+            horas = self._horas_grupo(ano, {c: tabela.column(c).to_numpy() for c in colunas_tempo})
+            grupos.append([i, int(horas.min()), int(horas.max()), len(horas), bool(np.all(np.diff(horas) >= 0))])
+        return {
+            "estacao": particao.get("station"),
+            "ano": ano,
+            "tamanho": estado.st_size,
+            "modificado": estado.st_mtime_ns,
+            "colunas": [c for c in arquivo.schema_arrow.names if c in COLUNAS_PRSA],
+            "grupos": grupos,
+        }
+
+    @staticmethod
+    def _horas_grupo(ano, colunas):
+        # Em datasets particionados por ano, o ano vem do caminho e não está no arquivo
+        ano = np.full(len(colunas["month"]), ano) if ano is not None else colunas["year"]
+        datetimes = montar_datetime(ano, colunas["month"], colunas["day"], colunas["hour"])
+        return datetimes.astype("datetime64[h]").astype(np.int64)
+
+    def atualizar_indice(self):
+        """Reindexa arquivos novos ou alterados e descarta os removidos."""
+        caminho_indice = os.path.join(self.caminho, NOME_ARQUIVO_INDICE)
+        anterior = {}
+        if os.path.exists(caminho_indice):
+            try:
+                with open(caminho_indice, "r", encoding="utf-8") as f:
+                    conteudo = json.load(f)
+                if conteudo.get("versao") == VERSAO_INDICE:
+                    anterior = conteudo["arquivos"]
+            except (OSError, ValueError) as e:
+                logger.warning(f"Índice '{caminho_indice}' ilegível ({e}). Reindexando o dataset.")
+
+        arquivos, reindexados = {}, 0
+        for raiz, _, nomes in os.walk(self.caminho):
+            for nome in nomes:
+                if not nome.endswith(".parquet") or nome.startswith(("_", ".")):
+                    continue
+                relativo = os.path.relpath(os.path.join(raiz, nome), self.caminho)
+                estado = os.stat(os.path.join(raiz, nome))
+                entrada = anterior.get(relativo)
+                if entrada is None or (entrada["tamanho"], entrada["modificado"]) != (estado.st_size, estado.st_mtime_ns):
+                    entrada = self._indexar_arquivo(relativo, estado)
+                    reindexados += 1
+                arquivos[relativo] = entrada
+
+        with self._trava:
+            self._arquivos = arquivos
+            self._montar_estacoes()
+            self.cache.limpar()
+        if self.persistir_indice and (reindexados or set(arquivos) != set(anterior)):
+            try:
+                with open(caminho_indice + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump({"versao": VERSAO_INDICE, "arquivos": arquivos}, f)
+                os.replace(caminho_indice + ".tmp", caminho_indice)
+            except OSError as e:
+                logger.warning(f"Não foi possível gravar o índice '{caminho_indice}' ({e}). Ele será refeito na próxima abertura.")
+        logger.info(
+            f"Índice de '{self.caminho}': {len(arquivos)} arquivo(s), {len(self._estacoes)} estação(ões), "
+            f"{reindexados} arquivo(s) reindexado(s)"
+        )
+
+    def _montar_estacoes(self):
+        # Por estação: arrays ordenados pelo início de cada grupo, para busca binária
+        por_estacao = {}
+        for relativo, entrada in self._arquivos.items():
+            for grupo, inicio, fim, linhas, ordenado in entrada["grupos"]:
+                por_estacao.setdefault(entrada["estacao"], []).append((inicio, fim, relativo, grupo, ordenado))
+        self._estacoes = {}
+        for estacao, grupos in por_estacao.items():
+            grupos.sort()
+            self._estacoes[estacao] = {
+                "inicios": np.array([g[0] for g in grupos], dtype=np.int64),
+                # Maior fim até cada posição: permite cortar pela esquerda mesmo com grupos sobrepostos
+                "fins_acumulados": np.maximum.accumulate(np.array([g[1] for g in grupos], dtype=np.int64)),
+                "grupos": grupos,
+            }
+
+    @property
+    def estacoes(self):
+        return sorted(self._estacoes)
+
+    def intervalo(self, estacao):
+        """Primeiro e último instante disponíveis de uma estação."""
+        indice = self._estacoes[estacao]
+        return (
+            pd.Timestamp(np.datetime64(int(indice["inicios"][0]), "h")),
+            pd.Timestamp(np.datetime64(int(indice["fins_acumulados"][-1]), "h")),
+        )
+
+    def _grupos(self, estacao, inicio, fim):
+        indice = self._estacoes.get(estacao)
+        if indice is None:
+            return []
+        # Grupos com início < fim e algum instante >= inicio
+        ultimo = np.searchsorted(indice["inicios"], fim, side="left")
+        primeiro = np.searchsorted(indice["fins_acumulados"], inicio, side="left")
+        return [g for g in indice["grupos"][primeiro:ultimo] if g[1] >= inicio]
+
+    def _coluna(self, arquivos_abertos, relativo, grupo, coluna):
+        chave = (relativo, grupo, coluna)
+        valor = self.cache.obter(chave)
+        if valor is None:
+            import pyarrow.parquet as pq
+
+            if relativo not in arquivos_abertos:
+                arquivos_abertos[relativo] = pq.ParquetFile(os.path.join(self.caminho, relativo), memory_map=True)
+            tabela = arquivos_abertos[relativo].read_row_group(grupo, columns=[coluna])
+            valor = tabela.column(0).to_pandas().array
+            self.cache.guardar(chave, valor)
+        return valor
+
+    def consultar(self, estacoes=None, inicio=None, fim=None, colunas=None):
+        """
+        Lê as linhas de ``estacoes`` com instante em ``[inicio, fim)``.
+
+        Parâmetros
+        ----------
+        estacoes : list, opcional
+            Estações a consultar. Se None, todas.
+        inicio, fim : str ou datetime, opcional
+            Limites do intervalo; ``fim`` é exclusivo. Se None, o intervalo é aberto.
+        colunas : list, opcional
+            Colunas de medição desejadas. Se None, todas as presentes no dataset.
+
+        Retorna
+        -------
+        pandas.DataFrame
+            Indexado por um DatetimeIndex chamado ``datetime``, com as colunas pedidas e
+            ``station``, ordenado por estação e instante.
+        """
+        inicio = _horas(inicio) if inicio is not None else np.iinfo(np.int64).min
+        fim = _horas(fim) if fim is not None else np.iinfo(np.int64).max
+        estacoes = self.estacoes if estacoes is None else [str(e) for e in estacoes]
+        desconhecidas = set(estacoes) - set(self._estacoes)
+        if desconhecidas:
+            logger.warning(f"Estações sem dados no dataset: {sorted(desconhecidas)}")
+        if colunas is None:
+            presentes = {c for entrada in self._arquivos.values() for c in entrada["colunas"]}
+            colunas = [c for c in COLUNAS_PRSA if c in presentes and c not in COLUNAS_TEMPO + ["station"]]
+        colunas = list(colunas)
+
+        quadros, arquivos_abertos = [], {}
+        for estacao in estacoes:
+            for inicio_grupo, fim_grupo, relativo, grupo, ordenado in self._grupos(estacao, inicio, fim):
+                ano = self._arquivos[relativo]["ano"]
+                colunas_tempo = COLUNAS_GRUPO if ano is not None else COLUNAS_TEMPO
+                tempo = {c: np.asarray(self._coluna(arquivos_abertos, relativo, grupo, c)) for c in colunas_tempo}
+                horas = self._horas_grupo(ano, tempo)
+                if ordenado:
+                    # Grupo ordenado: o recorte é uma fatia contínua
+                    fatia = slice(np.searchsorted(horas, inicio, "left"), np.searchsorted(horas, fim, "left"))
+                else:
+                    fatia = np.flatnonzero((horas >= inicio) & (horas < fim))
+                dados = {c: self._coluna(arquivos_abertos, relativo, grupo, c)[fatia] for c in colunas}
+                indice = pd.DatetimeIndex(horas[fatia].astype("datetime64[h]").astype("datetime64[ns]"), name="datetime")
+                quadro = pd.DataFrame(dados, index=indice)
+                quadro["station"] = estacao
+                quadros.append(quadro)
+        if not quadros:
+            return pd.DataFrame(columns=colunas + ["station"], index=pd.DatetimeIndex([], name="datetime"))
+        resultado = pd.concat(quadros)
+        for coluna in resultado.columns:
+            if resultado[coluna].dtype == object or isinstance(resultado[coluna].dtype, pd.StringDtype):
+                resultado[coluna] = resultado[coluna].astype("category")
+        ordem = np.lexsort((resultado.index.to_numpy(), resultado["station"].cat.codes.to_numpy()))
+        return resultado.iloc[ordem]
@@ -0,0 +1,55 @@
+import importlib
+import threading
+
+
+class ModuloTardio:
+    """
+    Substituto de um módulo que só é importado no primeiro acesso a um atributo.
+
+    Permite declarar ``wandb = ModuloTardio("wandb")`` no topo de um módulo e usar
+    ``wandb.init(...)`` normalmente: o custo da importação só é pago nos caminhos que de
+    fato usam a dependência (``--help`` ou um cache hit não importam wandb, mlflow nem
+    requests). Atribuições são repassadas ao módulo real, de modo que
+    ``monkeypatch.setattr(run.wandb, "init", ...)`` continua funcionando.
+
+    Parâmetros
+    ----------
+    nome : str
+        Nome do módulo, como em ``import nome``.
+    """
+
+    def __init__(self, nome):
+        object.__setattr__(self, "_nome", nome)
+        object.__setattr__(self, "_modulo", None)
+        object.__setattr__(self, "_trava", threading.Lock())
+
+    def _carregar(self):
+        modulo = object.__getattribute__(self, "_modulo")
+        if modulo is None:
+            with object.__getattribute__(self, "_trava"):
+                modulo = object.__getattribute__(self, "_modulo")
+                if modulo is None:
+                    modulo = importlib.import_module(object.__getattribute__(self, "_nome"))
+                    object.__setattr__(self, "_modulo", modulo)
+        return modulo
+
+    @property
+    def carregado(self):
+        """True se o módulo real já foi importado."""
+        return object.__getattribute__(self, "_modulo") is not None
+
+    def __getattr__(self, atributo):
+        return getattr(self._carregar(), atributo)
+
+    def __setattr__(self, atributo, valor):
+        setattr(self._carregar(), atributo, valor)
+
+    def __delattr__(self, atributo):
+        delattr(self._carregar(), atributo)
+
+    def __dir__(self):
+        return dir(self._carregar())
+
+    def __repr__(self):
+        estado = "carregado" if self.carregado else "não carregado"
+        return f"<ModuloTardio '{object.__getattribute__(self, '_nome')}' ({estado})>"
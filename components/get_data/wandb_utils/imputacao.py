@@ -0,0 +1,223 @@
+import time
+import logging
+import tracemalloc
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from .prsa import COLUNAS_POLUENTES, COLUNAS_METEOROLOGICAS
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+DIRECAO_SEM_MODA = "calm"
+
+
+def _colunas_padrao(df):
+    return [c for c in COLUNAS_POLUENTES + COLUNAS_METEOROLOGICAS if c in df.columns]
+
+
+def _substituir_colunas(df, colunas, valores):
+    # Reconstrói as colunas preservando os tipos originais (ex.: float32)
+    resultado = df.copy()
+    for i, coluna in enumerate(colunas):
+        resultado[coluna] = valores[:, i].astype(df[coluna].dtype, copy=False)
+    return resultado
+
+
+def interpolar_por_estacao(df, colunas=None):
+    """
+    Interpola valores faltantes no tempo, estação por estação.
+
+    A interpolação usa o DatetimeIndex (``method="time"``), então lacunas com horas faltando
+    são ponderadas pela distância real entre as medições, e nunca mistura estações vizinhas
+    na ordem do DataFrame, como acontecia com a interpolação linear sobre o frame combinado.
+
+    Parâmetros
+    ----------
+    df : pandas.DataFrame
+        Dados indexados por datetime, com a coluna ``station``.
+    colunas : list, opcional
+        Colunas numéricas a imputar. Se None, usa poluentes e variáveis meteorológicas.
+
+    Retorna
+    -------
+    pandas.DataFrame
+        Uma cópia de ``df`` com as colunas imputadas.
+    """
+    colunas = colunas or _colunas_padrao(df)
+    valores = df[colunas].to_numpy(dtype="float64", copy=True)
+    for indices in df.groupby("station", observed=True, sort=False).indices.values():
+        bloco = df.iloc[indices][colunas]
+        ordem = np.argsort(bloco.index.to_numpy(), kind="stable")
+        preenchido = bloco.iloc[ordem].interpolate(method="time", limit_direction="both")
+        valores[indices[ordem]] = preenchido.to_numpy(dtype="float64")
+    return _substituir_colunas(df, colunas, valores)
+
+
+def knn_por_janela(df, colunas=None, n_vizinhos=5, janela="30D"):
+    """
+    Imputação KNN restrita a blocos de estação e janela de tempo.
+
+    O KNNImputer aplicado ao conjunto inteiro compara cada linha faltante com todas as
+    outras (custo quadrático no número de linhas). Aqui os vizinhos são procurados apenas
+    dentro da mesma estação e da mesma janela, o que mantém o custo linear no histórico e
+    ainda favorece vizinhos próximos no tempo. Valores que o KNN não consegue preencher
+    (colunas vazias no bloco) caem para a interpolação temporal.
+
+    Parâmetros
+    ----------
+    df : pandas.DataFrame
+        Dados indexados por datetime, com a coluna ``station``.
+    colunas : list, opcional
+        Colunas numéricas a imputar. Se None, usa poluentes e variáveis meteorológicas.
+    n_vizinhos : int, opcional
+        Número de vizinhos do KNNImputer.
+    janela : str, opcional
+        Frequência do pandas que define os blocos de tempo (ex.: ``"7D"``, ``"30D"``).
+
+    Retorna
+    -------
+    pandas.DataFrame
+        Uma cópia de ``df`` com as colunas imputadas.
+    """
+    from sklearn.impute import KNNImputer
+
+    colunas = colunas or _colunas_padrao(df)
+    valores = df[colunas].to_numpy(dtype="float64", copy=True)
+    blocos = df.groupby([df["station"], df.index.floor(janela)], observed=True, sort=False).indices
+    for indices in blocos.values():
+        bloco = valores[indices]
+        faltantes = np.isnan(bloco)
+        if not faltantes.any():
+            continue
+        vazias = faltantes.all(axis=0)
+        if vazias.all():
+            continue
+        # Padroniza para que colunas com escalas diferentes (PRES x CO) pesem igual na distância
+        media = np.zeros(bloco.shape[1])
+        desvio = np.ones(bloco.shape[1])
+        media[~vazias] = np.nanmean(bloco[:, ~vazias], axis=0)
+        desvio[~vazias] = np.nanstd(bloco[:, ~vazias], axis=0)
+        desvio[desvio == 0] = 1.0
+        imputador = KNNImputer(n_neighbors=n_vizinhos, keep_empty_features=True)
+        preenchido = imputador.fit_transform((bloco - media) / desvio) * desvio + media
+        preenchido[:, vazias] = np.nan
+        valores[indices] = preenchido
+    resultado = _substituir_colunas(df, colunas, valores)
+    if np.isnan(valores).any():
+        resultado = interpolar_por_estacao(resultado, colunas)
+    return resultado
+
+
+def preencher_wd_moda(df, coluna="wd"):
+    """
+    Preenche a direção do vento com a moda por estação e hora do dia.
+
+    Substitui o ``groupby(...).transform(lambda x: x.fillna(moda))`` do notebook: as modas de
+    todos os grupos são calculadas de uma vez com ``value_counts`` e aplicadas com um único
+    merge. Grupos sem nenhuma observação recebem ``"calm"``.
+    """
+    if coluna not in df.columns or not df[coluna].isna().any():
+        return df
+    resultado = df.copy()
+    hora = pd.Series(df.index.hour, index=df.index, name="hora")
+    chaves = pd.DataFrame({"station": df["station"].to_numpy(), "hora": hora.to_numpy(), coluna: df[coluna].to_numpy()})
+    contagens = chaves.dropna().value_counts(sort=True).reset_index(name="n")
+    modas = contagens.drop_duplicates(["station", "hora"]).drop(columns="n")
+    preenchido = chaves[["station", "hora"]].merge(modas, on=["station", "hora"], how="left")[coluna]
+    serie = resultado[coluna]
+    if isinstance(serie.dtype, pd.CategoricalDtype) and DIRECAO_SEM_MODA not in serie.cat.categories:
+        serie = serie.cat.add_categories([DIRECAO_SEM_MODA])
+    faltantes = serie.isna().to_numpy()
+    valores = preenchido.to_numpy(dtype=object)
+    valores = np.where(pd.isna(valores), DIRECAO_SEM_MODA, valores)
+    serie = serie.copy()
+    serie.iloc[np.flatnonzero(faltantes)] = valores[faltantes]
+    resultado[coluna] = serie
+    return resultado
+
+
+ESTRATEGIAS = {
+    "interpolacao": interpolar_por_estacao,
+    "knn_janela": knn_por_janela,
+}
+
+
+def _importar_dependencias(estrategia):
+    # Importa o scikit-learn antes de medir, para não contar o custo do import
+    if estrategia == "knn_janela":
+        import sklearn.impute  # noqa: F401
+
+
+def _imputar_bloco(estrategia, df, colunas, opcoes):
+    _importar_dependencias(estrategia)
+    tracemalloc.start()
+    try:
+        resultado = preencher_wd_moda(ESTRATEGIAS[estrategia](df, colunas, **opcoes))
+        return resultado, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def imputar(df, estrategia="interpolacao", colunas=None, processos=None, **opcoes):
+    """
+    Imputa valores faltantes com a estratégia escolhida e mede o desempenho.
+
+    Parâmetros
+    ----------
+    df : pandas.DataFrame
+        Dados indexados por datetime, com a coluna ``station``.
+    estrategia : str, opcional
+        Uma das chaves de ``ESTRATEGIAS``: ``"interpolacao"`` ou ``"knn_janela"``.
+    colunas : list, opcional
+        Colunas numéricas a imputar. Se None, usa poluentes e variáveis meteorológicas.
+    processos : int, opcional
+        Se maior que 1, as estações são imputadas de forma independente em um pool de
+        processos com esse número de workers.
+    **opcoes
+        Repassadas à função da estratégia (ex.: ``n_vizinhos``, ``janela``).
+
+    Retorna
+    -------
+    tuple
+        ``(df_imputado, metricas)``, onde ``metricas`` traz ``linhas``, ``segundos``,
+        ``linhas_por_segundo``, ``pico_memoria_bytes`` e ``faltantes_restantes``.
+    """
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estratégia de imputação desconhecida: {estrategia}. Opções: {sorted(ESTRATEGIAS)}")
+    colunas = colunas or _colunas_padrao(df)
+    _importar_dependencias(estrategia)
+
+    inicio = time.perf_counter()
+    if processos and processos > 1:
+        estacoes = [grupo for _, grupo in df.groupby("station", observed=True, sort=False)]
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            partes = list(executor.map(
+                _imputar_bloco,
+                [estrategia] * len(estacoes), estacoes, [colunas] * len(estacoes), [opcoes] * len(estacoes),
+            ))
+        resultado = pd.concat([p[0] for p in partes])
+        # Cada worker mede o próprio pico; os processos rodam em paralelo, então somamos
+        # os maiores picos que podem coexistir
+        picos = sorted((p[1] for p in partes), reverse=True)
+        pico = sum(picos[:processos])
+    else:
+        resultado, pico = _imputar_bloco(estrategia, df, colunas, opcoes)
+    segundos = time.perf_counter() - inicio
+
+    metricas = {
+        "estrategia": estrategia,
+        "processos": processos or 1,
+        "linhas": len(df),
+        "segundos": segundos,
+        "linhas_por_segundo": len(df) / segundos if segundos > 0 else float("inf"),
+        "pico_memoria_bytes": int(pico),
+        "faltantes_restantes": int(resultado[colunas].isna().to_numpy().sum()),
+    }
+    logger.info(
+        f"Imputação '{estrategia}' ({metricas['processos']} processo(s)): {metricas['linhas']} linhas em "
+        f"{segundos:.2f}s ({metricas['linhas_por_segundo']:.0f} linhas/s), pico de "
+        f"{pico / 2**20:.1f} MiB, {metricas['faltantes_restantes']} faltantes restantes"
+    )
+    return resultado, metricas
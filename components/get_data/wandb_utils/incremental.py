@@ -0,0 +1,130 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+
+from .importacao import ModuloTardio
+
+wandb = ModuloTardio("wandb")
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+CHAVE_MARCAS = "marcas_d_agua"
+
+
+def calcular_marcas(df):
+    """
+    Calcula a marca d'água de cada estação: o último instante (year/month/day/hour) presente.
+
+    Parâmetros
+    ----------
+    df : pandas.DataFrame
+        Dados indexados por datetime, com a coluna ``station``.
+
+    Retorna
+    -------
+    dict
+        ``{estacao: "AAAA-MM-DDTHH:00:00"}``.
+    """
+    if df.empty:
+        return {}
+    ultimos = pd.Series(df.index, index=df.index).groupby(df["station"].to_numpy()).max()
+    return {str(estacao): instante.isoformat() for estacao, instante in ultimos.items()}
+
+
+def recuar_marcas(marcas, horas):
+    """Desloca cada marca ``horas`` para trás, para incluir contexto antes das linhas novas."""
+    return {e: (pd.Timestamp(i) - pd.Timedelta(hours=horas)).isoformat() for e, i in (marcas or {}).items()}
+
+
+def mesclar_marcas(antigas, novas):
+    """Combina duas coleções de marcas mantendo, por estação, o instante mais recente."""
+    resultado = dict(antigas or {})
+    for estacao, instante in (novas or {}).items():
+        if estacao not in resultado or pd.Timestamp(instante) > pd.Timestamp(resultado[estacao]):
+            resultado[estacao] = instante
+    return resultado
+
+
+def filtrar_novas_linhas(df, marcas):
+    """
+    Mantém apenas as linhas posteriores à marca d'água da respectiva estação.
+
+    A comparação é vetorizada: a marca de cada linha é obtida mapeando a coluna ``station``
+    e comparada com o índice de uma só vez. Estações sem marca são mantidas por inteiro.
+    """
+    if not marcas or df.empty:
+        return df
+    limite = df["station"].astype(str).map({e: pd.Timestamp(i) for e, i in marcas.items()})
+    limite = limite.to_numpy(dtype="datetime64[ns]")
+    novas = np.isnat(limite) | (df.index.to_numpy() > limite)
+    logger.info(f"{int(novas.sum())} de {len(df)} linhas são posteriores às marcas d'água.")
+    return df[novas]
+
+
+def _linha_a_partir_de(arquivo, posicao, inicio):
+    # Primeira linha completa que começa em ``posicao`` ou depois dela
+    if posicao > inicio:
+        arquivo.seek(posicao - 1)
+        arquivo.readline()
+    else:
+        arquivo.seek(inicio)
+    return arquivo.tell(), arquivo.readline()
+
+
+def deslocamento_apos_marca(caminho, marca, instante_da_linha, inicio=0):
+    """
+    Encontra, por busca binária nos bytes, onde começam as linhas posteriores à marca d'água
+    em um CSV ordenado por tempo. Só as ~log2(tamanho) linhas visitadas são interpretadas; o
+    leitor pode então pular direto para esse ponto sem fazer o parse do histórico.
+
+    Parâmetros
+    ----------
+    caminho : str
+        O caminho do CSV.
+    marca : str ou pandas.Timestamp
+        A marca d'água da estação do arquivo.
+    instante_da_linha : callable
+        Recebe uma linha em bytes e retorna o seu instante, ou None se a linha não tiver dados
+        (ex.: linhas só com separadores no fim do arquivo).
+    inicio : int, opcional
+        Deslocamento da primeira linha de dados (logo após o cabeçalho).
+
+    Retorna
+    -------
+    int
+        O deslocamento da primeira linha posterior à marca, ou o tamanho do arquivo se não
+        houver nenhuma.
+    """
+    marca = pd.Timestamp(marca)
+    baixo, alto = inicio, os.path.getsize(caminho)
+    with open(caminho, "rb") as f:
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            _, linha = _linha_a_partir_de(f, meio, inicio)
+            instante = instante_da_linha(linha) if linha.strip() else None
+            if instante is None or instante > marca:
+                alto = meio
+            else:
+                baixo = meio + 1
+        return _linha_a_partir_de(f, baixo, inicio)[0]
+
+
+def obter_versao_anterior(execucao_wandb, nome_artefato):
+    """
+    Busca a última versão de um artefato e suas marcas d'água, sem baixar os arquivos.
+
+    Retorna
+    -------
+    tuple
+        ``(artefato, marcas)``. Se o artefato ainda não existir, ``(None, {})``.
+    """
+    try:
+        artefato = execucao_wandb.use_artifact(f"{nome_artefato}:latest")
+    except (wandb.errors.CommError, wandb.errors.Error) as e:
+        logger.info(f"Nenhuma versão anterior de '{nome_artefato}' encontrada ({e}). Processando todo o histórico.")
+        return None, {}
+    marcas = dict((artefato.metadata or {}).get(CHAVE_MARCAS) or {})
+    logger.info(f"Marcas d'água de '{nome_artefato}': {marcas}")
+    return artefato, marcas
@@ -0,0 +1,357 @@
+import os
+import sys
+import json
+import time
+import pstats
+import logging
+import cProfile
+import threading
+import contextlib
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+INTERVALO_AMOSTRAGEM_MEMORIA = 0.05  # segundos
+INTERVALO_AMOSTRAGEM_PERFIL = 0.01  # segundos
+MODOS_PERFIL = ("cprofile", "amostragem")
+CAMPOS = ("segundos", "cpu_segundos", "bytes_lidos", "bytes_escritos", "bytes_rede_recebidos",
+          "bytes_rede_enviados", "pico_memoria_mb")
+_TAMANHO_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _contadores_io():
+    """Bytes lidos e escritos pelo processo (``/proc/self/io``; inclui sockets e cache de página)."""
+    try:
+        with open("/proc/self/io", "r") as f:
+            valores = dict(linha.split(":", 1) for linha in f.read().splitlines() if ":" in linha)
+        return int(valores["rchar"]), int(valores["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _contadores_rede():
+    """
+    Bytes recebidos e enviados pelas interfaces de rede, exceto loopback (``/proc/self/net/dev``).
+    Os contadores são do namespace de rede, não só do processo: em um contêiner dedicado ao
+    pipeline os valores coincidem, em uma máquina compartilhada incluem o tráfego alheio.
+    """
+    try:
+        with open("/proc/self/net/dev", "r") as f:
+            linhas = f.read().splitlines()[2:]
+    except OSError:
+        return None, None
+    recebidos = enviados = 0
+    for linha in linhas:
+        interface, dados = linha.split(":", 1)
+        if interface.strip() == "lo":
+            continue
+        campos = dados.split()
+        recebidos += int(campos[0])
+        enviados += int(campos[8])
+    return recebidos, enviados
+
+
+def _memoria_atual_mb():
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * _TAMANHO_PAGINA / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _pico_memoria_processo_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é dado em KiB no Linux e em bytes no macOS
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def _uso_filhos():
+    """
+    Tempo de CPU (usuário + sistema) e pico de memória residente, em MiB, dos processos filhos
+    já encerrados e aguardados (``RUSAGE_CHILDREN``).
+    """
+    if resource is None:
+        return None, None
+    uso = resource.getrusage(resource.RUSAGE_CHILDREN)
+    pico = uso.ru_maxrss / (1024 * 1024) if sys.platform == "darwin" else uso.ru_maxrss / 1024
+    return uso.ru_utime + uso.ru_stime, pico
+
+
+def _diferenca(fim, inicio):
+    return fim - inicio if fim is not None and inicio is not None else None
+
+
+class _PerfilAmostrado:
+    """
+    Profiler por amostragem: a cada intervalo registra a pilha de todas as threads
+    (``sys._current_frames``). Ao contrário do cProfile, vê o trabalho feito nas threads de
+    download e extração, com custo praticamente nulo para o código medido.
+    """
+
+    def __init__(self, intervalo=INTERVALO_AMOSTRAGEM_PERFIL):
+        self.intervalo = intervalo
+        self.pilhas = {}
+        self.amostras = 0
+        self._parar = threading.Event()
+        self._thread = None
+
+    def enable(self):
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._amostrar, name="instrumentacao-perfil", daemon=True)
+        self._thread.start()
+
+    def disable(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _amostrar(self):
+        propria = threading.get_ident()
+        while not self._parar.wait(self.intervalo):
+            for ident, quadro in sys._current_frames().items():
+                if ident == propria:
+                    continue
+                pilha = []
+                while quadro is not None:
+                    codigo = quadro.f_code
+                    pilha.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+                    quadro = quadro.f_back
+                chave = ";".join(reversed(pilha))
+                self.pilhas[chave] = self.pilhas.get(chave, 0) + 1
+            self.amostras += 1
+
+    def salvar(self, caminho_pilhas, caminho_txt, linhas):
+        # Formato "folded" (uma pilha por linha), aceito por flamegraph.pl e speedscope
+        with open(caminho_pilhas, "w", encoding="utf-8") as f:
+            for pilha, contagem in sorted(self.pilhas.items(), key=lambda item: -item[1]):
+                f.write(f"{pilha} {contagem}\n")
+        proprio, inclusivo = {}, {}
+        for pilha, contagem in self.pilhas.items():
+            funcoes = pilha.split(";")
+            proprio[funcoes[-1]] = proprio.get(funcoes[-1], 0) + contagem
+            for funcao in set(funcoes):
+                inclusivo[funcao] = inclusivo.get(funcao, 0) + contagem
+        total = max(1, sum(self.pilhas.values()))
+        with open(caminho_txt, "w", encoding="utf-8") as f:
+            f.write(f"{self.amostras} amostras a cada {self.intervalo * 1000:.0f} ms, {total} pilhas de threads\n")
+            for titulo, contagens in (("Tempo próprio", proprio), ("Tempo inclusivo", inclusivo)):
+                f.write(f"\n{titulo}:\n")
+                for funcao, contagem in sorted(contagens.items(), key=lambda item: -item[1])[:linhas]:
+                    f.write(f"{contagem / total:7.1%} {contagem:8d}  {funcao}\n")
+
+
+class Instrumentacao:
+    """
+    Mede as fases de uma execução: tempo de parede, tempo de CPU, bytes lidos e escritos,
+    bytes de rede e pico de memória residente.
+
+    Use :meth:`fase` como gerenciador de contexto em volta de cada passo ou subfase
+    (download, extração, envio). Fases podem ser aninhadas e abertas em threads diferentes;
+    o tempo de CPU e os contadores de I/O e rede são do processo inteiro, então fases
+    simultâneas contabilizam o trabalho umas das outras. No Linux os contadores vêm de ``/proc``;
+    em outras plataformas os campos indisponíveis ficam como None. Fases cujo trabalho roda em
+    processos filhos (``fase(nome, processos_filhos=True)``) medem CPU e memória dos filhos.
+
+    Parâmetros
+    ----------
+    nome : str
+        Nome da execução (ex.: ``"pipeline"`` ou ``"get_data"``), usado no trace e no perfil.
+    perfil : str, opcional
+        Profiler ativo entre :meth:`iniciar` e :meth:`finalizar`: ``"cprofile"`` (determinístico,
+        apenas a thread que chamou :meth:`iniciar`) ou ``"amostragem"`` (pilhas de todas as
+        threads a cada 10 ms). Se None ou False, nenhum profiler é usado.
+    """
+
+    def __init__(self, nome, perfil=None):
+        self.nome = nome
+        self.fases = []
+        self._ativas = {}
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._amostrador = None
+        if perfil and perfil not in MODOS_PERFIL:
+            raise ValueError(f"Profiler desconhecido: {perfil}. Use um de {MODOS_PERFIL}.")
+        self.modo_perfil = perfil or None
+        self._perfilador = {"cprofile": cProfile.Profile, "amostragem": _PerfilAmostrado}[perfil]() if perfil else None
+        self.inicio = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.finalizar()
+
+    def iniciar(self):
+        """Inicia a amostragem de memória e, se pedido, o profiler."""
+        if self._amostrador is None and _memoria_atual_mb() is not None:
+            self._amostrador = threading.Thread(target=self._amostrar_memoria, name="instrumentacao-memoria", daemon=True)
+            self._amostrador.start()
+        if self._perfilador is not None:
+            self._perfilador.enable()
+        return self
+
+    def finalizar(self):
+        """Para a amostragem de memória e o profiler."""
+        if self._perfilador is not None:
+            self._perfilador.disable()
+        self._parar.set()
+        if self._amostrador is not None:
+            self._amostrador.join()
+            self._amostrador = None
+
+    def _amostrar_memoria(self):
+        while not self._parar.wait(INTERVALO_AMOSTRAGEM_MEMORIA):
+            self._atualizar_picos()
+
+    def _atualizar_picos(self):
+        atual = _memoria_atual_mb()
+        if atual is None:
+            return
+        with self._trava:
+            for registro in self._ativas.values():
+                registro["pico_memoria_mb"] = max(registro["pico_memoria_mb"] or 0.0, atual)
+
+    @contextlib.contextmanager
+    def fase(self, nome, processos_filhos=False):
+        """
+        Mede o bloco como a fase ``nome``. O registro entregue pelo ``with`` aceita campos
+        extras (ex.: ``registro["bytes_baixados"] = ...``), que também vão para o trace.
+
+        Com ``processos_filhos=True`` (o trabalho roda em subprocessos, como os passos do
+        ``mlflow.run``), o tempo de CPU é a diferença de ``RUSAGE_CHILDREN`` e o pico de memória
+        é o ``ru_maxrss`` dos filhos, informado apenas quando um filho encerrado durante a fase
+        superou o maior pico anterior. Os bytes lidos e escritos ficam None, pois
+        ``/proc/self/io`` não inclui os filhos; os bytes de rede são do namespace e continuam
+        valendo. Fases simultâneas desse tipo somam a CPU dos filhos umas das outras.
+        """
+        lidos, escritos = _contadores_io()
+        recebidos, enviados = _contadores_rede()
+        chave = object()
+        if processos_filhos:
+            registro = {"fase": nome, "pico_memoria_mb": None}
+            cpu_filhos, pico_filhos = _uso_filhos()
+        else:
+            registro = {"fase": nome, "pico_memoria_mb": _memoria_atual_mb()}
+            with self._trava:
+                self._ativas[chave] = registro
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield registro
+            registro["sucesso"] = True
+        except BaseException:
+            registro["sucesso"] = False
+            raise
+        finally:
+            registro["segundos"] = time.perf_counter() - inicio
+            fim_recebidos, fim_enviados = _contadores_rede()
+            registro["bytes_rede_recebidos"] = _diferenca(fim_recebidos, recebidos)
+            registro["bytes_rede_enviados"] = _diferenca(fim_enviados, enviados)
+            if processos_filhos:
+                fim_cpu_filhos, fim_pico_filhos = _uso_filhos()
+                registro["cpu_segundos"] = _diferenca(fim_cpu_filhos, cpu_filhos)
+                registro["bytes_lidos"] = registro["bytes_escritos"] = None
+                if fim_pico_filhos is not None and fim_pico_filhos > pico_filhos:
+                    registro["pico_memoria_mb"] = fim_pico_filhos
+                with self._trava:
+                    self.fases.append(registro)
+            else:
+                registro["cpu_segundos"] = time.process_time() - inicio_cpu
+                fim_lidos, fim_escritos = _contadores_io()
+                registro["bytes_lidos"] = _diferenca(fim_lidos, lidos)
+                registro["bytes_escritos"] = _diferenca(fim_escritos, escritos)
+                self._atualizar_picos()
+                with self._trava:
+                    del self._ativas[chave]
+                    if registro["pico_memoria_mb"] is None:
+                        registro["pico_memoria_mb"] = _pico_memoria_processo_mb()
+                    self.fases.append(registro)
+            logger.info(
+                f"[{self.nome}] {nome}: {registro['segundos']:.2f}s, CPU {registro['cpu_segundos'] or 0:.2f}s, "
+                f"pico {registro['pico_memoria_mb'] or 0:.0f} MiB"
+            )
+
+    def metricas(self, prefixo="instrumentacao"):
+        """
+        Métricas planas no formato ``<prefixo>/<fase>/<campo>``, prontas para o W&B.
+        Fases repetidas com o mesmo nome são somadas (o pico de memória é o maior).
+        """
+        metricas = {}
+        with self._trava:
+            fases = list(self.fases)
+        for registro in fases:
+            for campo in CAMPOS:
+                valor = registro.get(campo)
+                if valor is None:
+                    continue
+                chave = f"{prefixo}/{registro['fase']}/{campo}"
+                if campo == "pico_memoria_mb":
+                    metricas[chave] = max(metricas.get(chave, 0.0), valor)
+                else:
+                    metricas[chave] = metricas.get(chave, 0) + valor
+        return metricas
+
+    def registrar_wandb(self, execucao_wandb, prefixo="instrumentacao"):
+        """Grava as métricas no resumo da execução do W&B (se ela tiver um)."""
+        resumo = getattr(execucao_wandb, "summary", None)
+        if resumo is None:
+            return
+        resumo.update(self.metricas(prefixo))
+
+    def salvar_trace(self, diretorio):
+        """
+        Grava o trace JSON da execução em ``<diretorio>/<nome>_<AAAAMMDDTHHMMSS>.json``.
+
+        Retorna
+        -------
+        str
+            O caminho do arquivo.
+        """
+        os.makedirs(diretorio, exist_ok=True)
+        carimbo = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        caminho = os.path.join(diretorio, f"{self.nome}_{carimbo}.json")
+        with self._trava:
+            trace = {
+                "nome": self.nome,
+                "inicio": self.inicio,
+                "pid": os.getpid(),
+                "pico_memoria_processo_mb": _pico_memoria_processo_mb(),
+                "fases": list(self.fases),
+            }
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(trace, f, indent=2)
+        logger.info(f"Trace de instrumentação gravado em '{caminho}'")
+        return caminho
+
+    def salvar_perfil(self, diretorio, linhas=40):
+        """
+        Grava o perfil e um resumo em texto com as funções de maior tempo acumulado. Com o
+        cProfile, o perfil é um ``.prof`` (legível com ``pstats`` ou snakeviz); com a amostragem,
+        um ``.folded`` com as pilhas (flamegraph.pl ou speedscope).
+
+        Retorna
+        -------
+        list
+            Os caminhos gravados, ou lista vazia se nenhum profiler foi ativado.
+        """
+        if self._perfilador is None:
+            return []
+        os.makedirs(diretorio, exist_ok=True)
+        caminho_txt = os.path.join(diretorio, f"perfil_{self.nome}.txt")
+        if self.modo_perfil == "amostragem":
+            caminho_perfil = os.path.join(diretorio, f"perfil_{self.nome}.folded")
+            self._perfilador.salvar(caminho_perfil, caminho_txt, linhas)
+        else:
+            caminho_perfil = os.path.join(diretorio, f"perfil_{self.nome}.prof")
+            self._perfilador.dump_stats(caminho_perfil)
+            with open(caminho_txt, "w", encoding="utf-8") as f:
+                pstats.Stats(caminho_perfil, stream=f).sort_stats("cumulative").print_stats(linhas)
+        return [caminho_perfil, caminho_txt]
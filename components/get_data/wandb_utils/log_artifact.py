@@ -1,11 +1,88 @@
-import wandb
-import mlflow
+import os
+import hashlib
+import threading
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .utils import _hash_arquivo, obter_metadados_artefato
+from .importacao import ModuloTardio
+
+wandb = ModuloTardio("wandb")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
 logger = logging.getLogger(__name__)
 
-def log_artifact(nome_artefato, tipo_artefato, descricao_artefato, nome_arquivo, execucao_wandb):
+# Chave de metadados com o digest do conteúdo local, usada para evitar reenvios
+CHAVE_DIGEST = "sha256_conteudo"
+
+_executor_uploads = None
+_uploads_pendentes = []
+_trava_uploads = threading.Lock()
+
+
+def calcular_digest(caminho, max_workers=8):
+    """
+    Calcula o digest sha256 do conteúdo de um arquivo, de um diretório ou de uma lista de arquivos.
+
+    Para diretórios, os arquivos são hasheados em paralelo e o digest final combina os
+    caminhos relativos e os hashes em ordem, de modo que não depende da ordem de leitura.
+    Em uma lista, cada arquivo é identificado pelo nome, como em :func:`log_artifact`.
+
+    Retorna
+    -------
+    str
+    """
+    if isinstance(caminho, (list, tuple)):
+        caminhos = {os.path.basename(c): c for c in caminho}
+    elif os.path.isdir(caminho):
+        caminhos = {
+            os.path.relpath(os.path.join(raiz, nome), caminho): os.path.join(raiz, nome)
+            for raiz, _, nomes in os.walk(caminho) for nome in nomes
+        }
+    else:
+        return _hash_arquivo(caminho, "sha256")
+    arquivos = sorted(caminhos)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        hashes = executor.map(lambda rel: _hash_arquivo(caminhos[rel], "sha256"), arquivos)
+        combinado = hashlib.sha256()
+        for rel, digest in zip(arquivos, hashes):
+            combinado.update(f"{rel.replace(os.sep, '/')}:{digest}\n".encode("utf-8"))
+    return combinado.hexdigest()
+
+
+def _registrar(nome_artefato, tipo_artefato, descricao_artefato, nome_arquivo, execucao_wandb, metadados, artefato_base,
+               substituir):
+    if artefato_base is not None:
+        artefato = artefato_base.new_draft()
+        artefato.description = descricao_artefato
+        for caminho in substituir:
+            try:
+                artefato.remove(caminho)
+            except FileNotFoundError:
+                pass
+    else:
+        artefato = wandb.Artifact(
+            nome_artefato,
+            type=tipo_artefato,
+            description=descricao_artefato,
+        )
+    if metadados:
+        artefato.metadata.update(metadados)
+    if isinstance(nome_arquivo, (list, tuple)):
+        for caminho in nome_arquivo:
+            artefato.add_file(caminho, name=os.path.basename(caminho))
+    elif os.path.isdir(nome_arquivo):
+        artefato.add_dir(nome_arquivo)
+    else:
+        artefato.add_file(nome_arquivo)
+    execucao_wandb.log_artifact(artefato)
+    #artefato.wait() # Mantido comentado, pois estava comentado no original
+    logger.info(f"Artefato {nome_artefato} registrado no W&B.")
+    return artefato
+
+
+def log_artifact(nome_artefato, tipo_artefato, descricao_artefato, nome_arquivo, execucao_wandb, metadados=None,
+                 artefato_base=None, assincrono=False, deduplicar=False, projeto=None, substituir=()):
     """
     Registra um artefato no Weights & Biases.
 
@@ -17,22 +94,76 @@ def log_artifact(nome_artefato, tipo_artefato, descricao_artefato, nome_arquivo,
         O tipo do artefato.
     descricao_artefato : str
         Uma breve descrição do artefato.
-    nome_arquivo : str
-        O caminho para o arquivo a ser carregado como um artefato.
+    nome_arquivo : str ou list
+        O caminho para o arquivo a ser carregado como um artefato. Se for um diretório,
+        todo o seu conteúdo é adicionado ao artefato; se for uma lista, cada arquivo é
+        adicionado pelo nome.
     execucao_wandb : wandb.Run
         A execução do Weights & Biases para registrar o artefato.
+    metadados : dict, opcional
+        Metadados gravados na nova versão do artefato.
+    artefato_base : wandb.Artifact, opcional
+        Versão anterior do mesmo artefato. Se informada, a nova versão é criada a partir dela
+        (``new_draft``), mantendo os arquivos anteriores e enviando apenas os novos. O W&B não
+        aceita adicionar um caminho que o rascunho já contém.
+    assincrono : bool, opcional
+        Se True, a montagem e o registro do artefato rodam em uma thread de fundo e a função
+        retorna imediatamente um ``Future``. Use :func:`aguardar_uploads` antes de encerrar a
+        execução do W&B.
+    deduplicar : bool, opcional
+        Se True, calcula o digest do conteúdo local e não registra nada quando ele é igual ao
+        da última versão do artefato no W&B.
+    projeto : str, opcional
+        Projeto usado na deduplicação. O padrão é o projeto da execução ou ``WANDB_PROJECT``.
+    substituir : iterable, opcional
+        Caminhos, relativos ao artefato, que a nova versão reescreve: são removidos do rascunho
+        de ``artefato_base`` antes de os arquivos locais serem adicionados.
 
     Retorna
     -------
-    Nada
+    wandb.Artifact, Future ou None
+        O artefato registrado, um ``Future`` com ele quando ``assincrono=True``, ou None se o
+        envio foi evitado pela deduplicação.
     """
-    
-    artefato = wandb.Artifact(
-        nome_artefato,
-        type=tipo_artefato,
-        description=descricao_artefato,
-    )
-    artefato.add_file(nome_arquivo)
-    execucao_wandb.log_artifact(artefato)
-    #artefato.wait() # Mantido comentado, pois estava comentado no original
-    logger.info(f"Artefato {nome_artefato} registrado no W&B.")
+    metadados = dict(metadados or {})
+    if deduplicar:
+        digest = calcular_digest(nome_arquivo)
+        metadados[CHAVE_DIGEST] = digest
+        projeto = projeto or getattr(execucao_wandb, "project", None) or os.environ.get("WANDB_PROJECT")
+        anterior = obter_metadados_artefato(projeto, f"{nome_artefato}:latest", ttl=0) if projeto else None
+        if anterior is not None and anterior["metadados"].get(CHAVE_DIGEST) == digest:
+            logger.info(f"Conteúdo de {nome_artefato} idêntico à versão {anterior['versao']}. Envio ignorado.")
+            if assincrono:
+                futuro = Future()
+                futuro.set_result(None)
+                return futuro
+            return None
+
+    argumentos = (nome_artefato, tipo_artefato, descricao_artefato, nome_arquivo, execucao_wandb, metadados, artefato_base,
+                  tuple(substituir))
+    if not assincrono:
+        return _registrar(*argumentos)
+
+    global _executor_uploads
+    with _trava_uploads:
+        if _executor_uploads is None:
+            _executor_uploads = ThreadPoolExecutor(max_workers=2, thread_name_prefix="wandb-upload")
+        futuro = _executor_uploads.submit(_registrar, *argumentos)
+        _uploads_pendentes.append(futuro)
+    logger.info(f"Registro do artefato {nome_artefato} iniciado em segundo plano.")
+    return futuro
+
+
+def aguardar_uploads(timeout=None):
+    """
+    Espera todos os registros assíncronos iniciados por :func:`log_artifact`.
+
+    Retorna
+    -------
+    list
+        Os artefatos registrados. A primeira exceção de um registro que falhou é relançada.
+    """
+    with _trava_uploads:
+        pendentes = list(_uploads_pendentes)
+        _uploads_pendentes.clear()
+    return [futuro.result(timeout=timeout) for futuro in pendentes]
@@ -0,0 +1,304 @@
+import os
+import csv
+import shutil
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from pandas.api.types import union_categoricals
+
+from .incremental import deslocamento_apos_marca
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+# Colunas do conjunto Beijing Multi-Site Air Quality (PRSA2017)
+COLUNAS_TEMPO = ["year", "month", "day", "hour"]
+COLUNAS_POLUENTES = ["PM2.5", "PM10", "SO2", "NO2", "CO", "O3"]
+COLUNAS_METEOROLOGICAS = ["TEMP", "PRES", "DEWP", "RAIN", "WSPM"]
+COLUNAS_PRSA = ["No"] + COLUNAS_TEMPO + COLUNAS_POLUENTES + COLUNAS_METEOROLOGICAS + ["wd", "station"]
+
+DIRECOES_VENTO = [
+    "N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+    "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW",
+]
+
+# Tipos compactos: float32 é suficiente para a precisão das medições (1 casa decimal)
+# e os campos de data cabem em inteiros pequenos.
+DTYPES_PRSA = {
+    "No": "int32",
+    "year": "int16",
+    "month": "int8",
+    "day": "int8",
+    "hour": "int8",
+    **{coluna: "float32" for coluna in COLUNAS_POLUENTES + COLUNAS_METEOROLOGICAS},
+    "wd": pd.CategoricalDtype(DIRECOES_VENTO),
+    "station": "category",
+}
+
+
+def eh_csv_prsa(caminho):
+    """Verifica pelo cabeçalho se o CSV segue o formato PRSA."""
+    with open(caminho, "r", encoding="utf-8") as f:
+        cabecalho = f.readline().strip().replace('"', "").split(",")
+    return set(COLUNAS_TEMPO + ["station"]).issubset(cabecalho)
+
+
+def ler_csv_prsa(caminho):
+    """
+    Lê um CSV de estação PRSA aplicando o esquema de tipos compactos.
+
+    Parâmetros
+    ----------
+    caminho : str ou arquivo
+        O caminho (ou objeto de arquivo) do CSV.
+
+    Retorna
+    -------
+    pandas.DataFrame
+    """
+    logger.info(f"Lendo {caminho}")
+    return pd.read_csv(caminho, dtype=DTYPES_PRSA, engine="c")
+
+
+def montar_datetime(year, month, day, hour):
+    """
+    Monta timestamps a partir das colunas de data com aritmética de ``datetime64``.
+
+    Equivalente a ``pd.to_datetime(df[["year", "month", "day", "hour"]])``, mas sem
+    montar strings nem validar campo a campo, o que o torna muito mais rápido.
+
+    Retorna
+    -------
+    numpy.ndarray
+        Array ``datetime64[ns]``.
+    """
+    meses = (np.asarray(year, dtype="int64") - 1970) * 12 + (np.asarray(month, dtype="int64") - 1)
+    dias = meses.astype("datetime64[M]").astype("datetime64[D]") + (np.asarray(day, dtype="int64") - 1).astype("timedelta64[D]")
+    horas = dias.astype("datetime64[h]") + np.asarray(hour, dtype="int64").astype("timedelta64[h]")
+    return horas.astype("datetime64[ns]")
+
+
+def _campos(linha):
+    return next(csv.reader([linha.decode("utf-8-sig", errors="replace")]), [])
+
+
+def _inicio_linhas_novas(caminho, marcas):
+    """
+    Retorna ``(cabecalho, deslocamento)`` da primeira linha posterior à marca d'água da
+    estação do arquivo. ``deslocamento`` é None se o arquivo deve ser lido do início e igual
+    ao tamanho do arquivo se não houver linhas novas.
+    """
+    with open(caminho, "rb") as f:
+        cabecalho = _campos(f.readline())
+        inicio = f.tell()
+        primeira = _campos(f.readline())
+    if "station" not in cabecalho or len(primeira) != len(cabecalho):
+        return cabecalho, None
+    marca = marcas.get(primeira[cabecalho.index("station")])
+    if marca is None:
+        return cabecalho, None
+    posicoes = [cabecalho.index(c) for c in COLUNAS_TEMPO]
+
+    def instante(linha):
+        campos = _campos(linha)
+        try:
+            return pd.Timestamp(*(int(campos[i]) for i in posicoes))
+        except (ValueError, IndexError):
+            return None
+
+    deslocamento = deslocamento_apos_marca(caminho, marca, instante, inicio)
+    return cabecalho, (None if deslocamento == inicio else deslocamento)
+
+
+def _ler_estacao(caminho, colunas, indice_datetime, marcas=None):
+    colunas_lidas = None
+    if colunas is not None:
+        necessarias = list(colunas) + ["station"] + (COLUNAS_TEMPO if indice_datetime else [])
+        colunas_lidas = [c for c in COLUNAS_PRSA if c in necessarias]
+    opcoes = {
+        "usecols": colunas_lidas,
+        "dtype": {c: t for c, t in DTYPES_PRSA.items() if colunas_lidas is None or c in colunas_lidas},
+        "engine": "c",
+    }
+    cabecalho, deslocamento = _inicio_linhas_novas(caminho, marcas) if marcas else (None, None)
+    if deslocamento is None:
+        df = pd.read_csv(caminho, **opcoes)
+    elif deslocamento >= os.path.getsize(caminho):
+        logger.info(f"{caminho}: nenhuma linha após a marca d'água. Arquivo ignorado.")
+        return None
+    else:
+        # O histórico já convertido nem passa pelo parser
+        logger.info(f"{caminho}: lendo a partir do byte {deslocamento} (linhas após a marca d'água)")
+        with open(caminho, "rb") as f:
+            f.seek(deslocamento)
+            df = pd.read_csv(f, header=None, names=cabecalho, **opcoes)
+    if indice_datetime:
+        df.index = pd.DatetimeIndex(montar_datetime(df["year"], df["month"], df["day"], df["hour"]), name="datetime")
+        if colunas is not None:
+            df = df.drop(columns=[c for c in COLUNAS_TEMPO if c not in colunas])
+    return df
+
+
+def carregar_prsa(caminhos, colunas=None, max_workers=None, indice_datetime=True, marcas=None):
+    """
+    Carrega e combina os CSVs das estações PRSA com tipos compactos.
+
+    Cada estação é lida em uma thread, já com o esquema de ``DTYPES_PRSA`` (poluentes em
+    float32, ``station`` e ``wd`` categóricos) e, opcionalmente, com o índice de datetime
+    montado durante a leitura. As categorias de ``station`` são unidas sem passar por object.
+
+    Parâmetros
+    ----------
+    caminhos : list
+        Caminhos dos CSVs das estações.
+    colunas : list, opcional
+        Colunas desejadas. Somente elas (mais ``station``) são lidas do disco.
+        Se None, lê todas as colunas.
+    max_workers : int, opcional
+        Número de estações lidas em paralelo. Se None, usa o padrão do ThreadPoolExecutor.
+    indice_datetime : bool, opcional
+        Se True, o resultado é indexado por um DatetimeIndex chamado ``datetime``.
+    marcas : dict, opcional
+        Marcas d'água por estação. Como cada CSV está em ordem cronológica, a primeira linha
+        posterior à marca é localizada por busca binária nos bytes e o parse começa nela;
+        arquivos sem linhas novas nem são lidos. Use :func:`incremental.filtrar_novas_linhas`
+        no resultado se os arquivos puderem estar fora de ordem.
+
+    Retorna
+    -------
+    pandas.DataFrame
+    """
+    caminhos = list(caminhos)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(lambda c: _ler_estacao(c, colunas, indice_datetime, marcas), caminhos))
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return pd.DataFrame(columns=colunas or COLUNAS_PRSA)
+
+    estacoes = union_categoricals([f["station"] for f in frames]).categories
+    for frame in frames:
+        frame["station"] = frame["station"].cat.set_categories(estacoes)
+    df = pd.concat(frames, ignore_index=not indice_datetime)
+    logger.info(f"{len(frames)} estações carregadas: {len(df)} linhas, {df.memory_usage(deep=True).sum() / 2**20:.1f} MiB")
+    return df
+
+
+def carregar_parquet_prsa(caminho, colunas=None, estacoes=None, indice_datetime=True, ano_minimo=None):
+    """
+    Lê o dataset Parquet gerado pelo passo ``convert_to_parquet`` restaurando o esquema compacto.
+
+    As colunas de partição (``station`` e ``year``) voltam como categóricas do pyarrow e são
+    convertidas para os tipos de ``DTYPES_PRSA``. O filtro de estações é aplicado às
+    partições, de modo que apenas os diretórios necessários são lidos.
+
+    Parâmetros
+    ----------
+    caminho : str
+        Diretório do dataset Parquet.
+    colunas : list, opcional
+        Colunas desejadas. Se None, lê todas.
+    estacoes : list, opcional
+        Estações a carregar. Se None, carrega todas.
+    indice_datetime : bool, opcional
+        Se True, o resultado é indexado por um DatetimeIndex chamado ``datetime``.
+    ano_minimo : int, opcional
+        Se informado, as partições de anos anteriores não são lidas.
+
+    Retorna
+    -------
+    pandas.DataFrame
+    """
+    colunas_lidas = None
+    if colunas is not None:
+        necessarias = list(colunas) + ["station"] + (COLUNAS_TEMPO if indice_datetime else [])
+        colunas_lidas = [c for c in COLUNAS_PRSA if c in necessarias]
+    filtros = []
+    if estacoes:
+        filtros.append(("station", "in", list(estacoes)))
+    if ano_minimo is not None:
+        filtros.append(("year", ">=", int(ano_minimo)))
+    df = pd.read_parquet(caminho, engine="pyarrow", columns=colunas_lidas, filters=filtros or None)
+    if "year" in df.columns:
+        df["year"] = np.asarray(df["year"], dtype="int16")
+    df["station"] = df["station"].astype(str).astype("category")
+    if indice_datetime:
+        df.index = pd.DatetimeIndex(montar_datetime(df["year"], df["month"], df["day"], df["hour"]), name="datetime")
+        if colunas is not None:
+            df = df.drop(columns=[c for c in COLUNAS_TEMPO if c not in colunas])
+    return df[[c for c in COLUNAS_PRSA if c in df.columns]]
+
+
+COLUNAS_PARTICAO = ["station", "year"]
+# Cerca de um mês de leituras horárias por grupo de linhas: as estatísticas e o índice de
+# consulta (consulta.py) conseguem pular meses inteiros sem descomprimir o ano todo
+LINHAS_POR_GRUPO = 24 * 31
+
+
+def gravar_parquet_prsa(df, caminho, acrescentar=False, parte=None):
+    """
+    Grava um DataFrame PRSA como dataset Parquet particionado por estação e ano.
+
+    O índice de datetime não é gravado, pois é remontado a partir das colunas de data por
+    :func:`carregar_parquet_prsa`. Cada arquivo é dividido em grupos de linhas de
+    ``LINHAS_POR_GRUPO`` linhas. O diretório de destino é recriado, a menos que
+    ``acrescentar`` seja True: nesse caso os arquivos se somam aos existentes, o que permite
+    gravar o resultado bloco a bloco.
+
+    Sem ``acrescentar`` os arquivos se chamam ``part-<i>.parquet``: nomes determinísticos, de
+    modo que a mesma reescrita completa gera o mesmo digest em
+    :func:`log_artifact.calcular_digest` e a deduplicação de envios funciona. Esses nomes se
+    repetem entre versões, então só servem para artefatos novos (``artefato_base=None``). O que
+    é acrescentado a um rascunho de uma versão anterior precisa de ``parte``, um rótulo próprio
+    da versão (ex.: a primeira hora nova), e é gravado como ``parte-<parte>-<i>.parquet``;
+    acrescentar sem ``parte`` levanta ``ValueError``.
+    """
+    if acrescentar:
+        if parte is None:
+            raise ValueError("Informe 'parte' ao acrescentar arquivos: os nomes não podem repetir os de versões anteriores.")
+        opcoes = {"basename_template": f"parte-{parte}-{{i}}.parquet", "existing_data_behavior": "overwrite_or_ignore"}
+    else:
+        if os.path.isdir(caminho):
+            shutil.rmtree(caminho)
+        opcoes = {"basename_template": "part-{i}.parquet"}
+    df.to_parquet(
+        caminho, engine="pyarrow", partition_cols=COLUNAS_PARTICAO, compression="zstd", index=False,
+        row_group_size=LINHAS_POR_GRUPO, **opcoes,
+    )
+    logger.info(f"{len(df)} linhas gravadas em '{caminho}' particionadas por {COLUNAS_PARTICAO}")
+
+
+def relatorio_memoria(df):
+    """
+    Compara a memória do DataFrame compacto com a que ele ocuparia nos tipos padrão do
+    pandas (int64, float64 e object), como em um ``pd.read_csv`` sem ``dtype``.
+
+    Retorna
+    -------
+    dict
+        ``{"antes_bytes", "depois_bytes", "reducao"}`` e o detalhamento por coluna em ``"colunas"``.
+    """
+    colunas = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        depois = int(serie.memory_usage(index=False, deep=True))
+        if isinstance(serie.dtype, pd.CategoricalDtype) or serie.dtype == object:
+            antes = int(serie.astype(object).memory_usage(index=False, deep=True))
+        elif pd.api.types.is_numeric_dtype(serie.dtype):
+            antes = len(serie) * 8
+        else:
+            antes = depois
+        colunas[coluna] = {"antes_bytes": antes, "depois_bytes": depois}
+    antes_total = sum(c["antes_bytes"] for c in colunas.values())
+    depois_total = sum(c["depois_bytes"] for c in colunas.values())
+    relatorio = {
+        "antes_bytes": antes_total,
+        "depois_bytes": depois_total,
+        "reducao": 1 - depois_total / antes_total if antes_total else 0.0,
+        "colunas": colunas,
+    }
+    logger.info(
+        f"Memória: {antes_total / 2**20:.1f} MiB nos tipos padrão -> {depois_total / 2**20:.1f} MiB "
+        f"compacto ({100 * relatorio['reducao']:.0f}% menor)"
+    )
+    return relatorio
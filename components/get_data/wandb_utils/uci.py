@@ -0,0 +1,203 @@
+import io
+import os
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from .prsa import COLUNAS_PRSA, DTYPES_PRSA, montar_datetime
+from .incremental import deslocamento_apos_marca
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+# Conjunto UCI Air Quality (AirQuality.csv): separador ";", vírgula decimal, Date/Time
+# separados (dd/mm/aaaa; HH.MM.SS), duas colunas vazias no fim e -200 como valor ausente
+SEPARADOR_UCI = ";"
+SENTINELA_UCI = -200
+COLUNAS_DATA_UCI = ["Date", "Time"]
+# coluna do CSV -> (coluna na saída, fator de conversão para as unidades do PRSA)
+COLUNAS_UCI = {
+    "CO(GT)": ("CO", 1000.0),  # mg/m³ -> µg/m³
+    "PT08.S1(CO)": ("PT08_S1_CO", 1.0),
+    "NMHC(GT)": ("NMHC", 1.0),
+    "C6H6(GT)": ("C6H6", 1.0),
+    "PT08.S2(NMHC)": ("PT08_S2_NMHC", 1.0),
+    "NOx(GT)": ("NOx", 1.0),
+    "PT08.S3(NOx)": ("PT08_S3_NOx", 1.0),
+    "NO2(GT)": ("NO2", 1.0),
+    "PT08.S4(NO2)": ("PT08_S4_NO2", 1.0),
+    "PT08.S5(O3)": ("PT08_S5_O3", 1.0),
+    "T": ("TEMP", 1.0),
+    "RH": ("RH", 1.0),
+    "AH": ("AH", 1.0),
+}
+# Acima disso o arquivo é dividido em blocos de bytes lidos em paralelo
+TAMANHO_BLOCO_BYTES = 16 * 2**20
+
+
+def _ler_cabecalho(caminho):
+    with open(caminho, "r", encoding="utf-8-sig", errors="replace") as f:
+        return [c.strip().strip('"') for c in f.readline().rstrip("\r\n").split(SEPARADOR_UCI)]
+
+
+def eh_csv_uci(caminho):
+    """Verifica pelo cabeçalho se o CSV segue o formato UCI Air Quality (``Date;Time;...``)."""
+    return _ler_cabecalho(caminho)[:2] == COLUNAS_DATA_UCI
+
+
+def _inicio_dados(caminho):
+    with open(caminho, "rb") as f:
+        f.readline()
+        return f.tell()
+
+
+def _instante_uci(linha):
+    campos = linha.decode("utf-8", errors="replace").split(SEPARADOR_UCI)
+    try:
+        return datetime.strptime(f"{campos[0].strip()} {campos[1].strip()}", "%d/%m/%Y %H.%M.%S")
+    except (ValueError, IndexError):
+        return None
+
+
+def _limites_blocos(caminho, tamanho_bloco, inicio):
+    # Fronteiras em bytes alinhadas a quebras de linha, a partir de ``inicio``
+    tamanho = os.path.getsize(caminho)
+    with open(caminho, "rb") as f:
+        limites = [inicio]
+        while limites[-1] < tamanho:
+            f.seek(min(limites[-1] + tamanho_bloco, tamanho))
+            f.readline()
+            limites.append(min(f.tell(), tamanho))
+    return list(zip(limites[:-1], limites[1:]))
+
+
+def _datetimes(datas, horas):
+    # Campos de largura fixa ("dd/mm/aaaa", "HH.MM.SS") viram dígitos por aritmética de bytes,
+    # sem montar nem interpretar strings linha a linha
+    try:
+        d = datas.to_numpy(dtype="S10")
+        h = horas.to_numpy(dtype="S8")
+    except UnicodeEncodeError:
+        d = h = None
+    if d is not None and (np.char.str_len(d) == 10).all() and (np.char.str_len(h) == 8).all():
+        d = d.view(np.uint8).reshape(-1, 10).astype(np.int64) - ord("0")
+        h = h.view(np.uint8).reshape(-1, 8).astype(np.int64) - ord("0")
+        dia, mes = d[:, 0] * 10 + d[:, 1], d[:, 3] * 10 + d[:, 4]
+        ano = d[:, 6] * 1000 + d[:, 7] * 100 + d[:, 8] * 10 + d[:, 9]
+        hora = h[:, 0] * 10 + h[:, 1]
+        if ((dia >= 1) & (dia <= 31) & (mes >= 1) & (mes <= 12) & (hora >= 0) & (hora <= 23)).all():
+            return montar_datetime(ano, mes, dia, hora)
+    logger.info("Datas fora da largura fixa dd/mm/aaaa HH.MM.SS. Usando pd.to_datetime.")
+    texto = datas.astype(str) + " " + horas.astype(str).str.replace(".", ":", regex=False)
+    return pd.to_datetime(texto, dayfirst=True, format="mixed").to_numpy(dtype="datetime64[ns]")
+
+
+def _ler_bloco(caminho, cabecalho, inicio, fim):
+    with open(caminho, "rb") as f:
+        f.seek(inicio)
+        conteudo = f.read(fim - inicio)
+    medidas = [c for c in cabecalho if c in COLUNAS_UCI]
+    df = pd.read_csv(
+        io.BytesIO(conteudo),
+        sep=SEPARADOR_UCI,
+        decimal=",",
+        header=None,
+        # As colunas vazias do fim não têm nome; nomes únicos evitam o erro de nomes duplicados
+        names=[c or f"_vazia_{i}" for i, c in enumerate(cabecalho)],
+        usecols=COLUNAS_DATA_UCI + medidas,
+        dtype={**dict.fromkeys(COLUNAS_DATA_UCI, object), **dict.fromkeys(medidas, "float32")},
+        engine="c",
+    )
+    # Linhas só com separadores (";;;;") no fim do arquivo
+    df = df[df["Date"].notna()]
+    valores = df[medidas].to_numpy(dtype="float32")
+    valores[valores == SENTINELA_UCI] = np.nan
+    return pd.DatetimeIndex(_datetimes(df["Date"], df["Time"]), name="datetime"), valores, medidas
+
+
+def ler_csv_uci(caminho, estacao=None, max_workers=None, tamanho_bloco=TAMANHO_BLOCO_BYTES, marca=None):
+    """
+    Lê o AirQuality.csv do conjunto UCI Air Quality no mesmo formato de :func:`prsa.carregar_prsa`.
+
+    O arquivo é dividido em blocos de ``tamanho_bloco`` bytes, alinhados a quebras de linha,
+    lidos em paralelo por threads com o parser C do pandas já com vírgula decimal e float32.
+    As colunas vazias do fim são descartadas, o sentinela -200 vira NaN e o índice de datetime é
+    montado a partir dos campos de largura fixa de Date/Time.
+
+    O resultado tem as colunas de ``COLUNAS_PRSA`` com os tipos de ``DTYPES_PRSA``: CO é
+    convertido de mg/m³ para µg/m³, T vira ``TEMP``, ``DEWP`` é calculado de T e RH (fórmula
+    de Magnus) e as colunas sem equivalente no UCI ficam NaN. As demais medições do UCI
+    (sensores PT08, NMHC, C6H6, NOx, RH e AH) vêm depois, em float32.
+
+    Parâmetros
+    ----------
+    caminho : str
+        O caminho do CSV.
+    estacao : str, opcional
+        Valor da coluna ``station``. O padrão é o nome do arquivo sem extensão.
+    max_workers : int, opcional
+        Número de blocos lidos em paralelo. Se None, usa o padrão do ThreadPoolExecutor.
+    tamanho_bloco : int, opcional
+        Tamanho aproximado, em bytes, de cada bloco.
+    marca : str, opcional
+        Marca d'água da estação. A primeira linha posterior a ela é localizada por busca
+        binária nos bytes (o arquivo está em ordem cronológica) e só a partir dela o arquivo
+        é lido; ``No`` continua contando as linhas desde o início do arquivo.
+
+    Retorna
+    -------
+    pandas.DataFrame
+    """
+    logger.info(f"Lendo {caminho}")
+    cabecalho = _ler_cabecalho(caminho)
+    inicio = primeira_linha = _inicio_dados(caminho)
+    if marca is not None:
+        inicio = deslocamento_apos_marca(caminho, marca, _instante_uci, primeira_linha)
+        if inicio > primeira_linha:
+            logger.info(f"{caminho}: lendo a partir do byte {inicio} (linhas após a marca d'água {marca})")
+    blocos = _limites_blocos(caminho, tamanho_bloco, inicio)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        partes = list(executor.map(lambda b: _ler_bloco(caminho, cabecalho, *b), blocos))
+    medidas = [c for c in cabecalho if c in COLUNAS_UCI]
+    indice = pd.DatetimeIndex(np.concatenate([p[0].to_numpy() for p in partes] or [np.array([], dtype="datetime64[ns]")]), name="datetime")
+    valores = np.concatenate([p[1] for p in partes]) if partes else np.empty((0, len(medidas)), dtype="float32")
+
+    n = len(indice)
+    anteriores = 0
+    if inicio > primeira_linha:
+        with open(caminho, "rb") as f:
+            f.seek(primeira_linha)
+            anteriores = f.read(inicio - primeira_linha).count(b"\n")
+    colunas = {
+        "No": np.arange(anteriores + 1, anteriores + n + 1, dtype="int32"),
+        "year": indice.year.to_numpy().astype("int16"),
+        "month": indice.month.to_numpy().astype("int8"),
+        "day": indice.day.to_numpy().astype("int8"),
+        "hour": indice.hour.to_numpy().astype("int8"),
+    }
+    extras = {}
+    for i, coluna in enumerate(medidas):
+        nome, fator = COLUNAS_UCI[coluna]
+        (colunas if nome in COLUNAS_PRSA else extras)[nome] = valores[:, i] * np.float32(fator)
+    if "TEMP" in colunas and "RH" in extras:
+        # Ponto de orvalho pela fórmula de Magnus (a = 17,62; b = 243,12 °C)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            gama = np.log(extras["RH"] / 100) + 17.62 * colunas["TEMP"] / (243.12 + colunas["TEMP"])
+            colunas["DEWP"] = (243.12 * gama / (17.62 - gama)).astype("float32")
+    estacao = estacao or os.path.splitext(os.path.basename(caminho))[0]
+    dados = {}
+    for coluna in COLUNAS_PRSA:
+        if coluna == "wd":
+            dados[coluna] = pd.Categorical.from_codes(np.full(n, -1, dtype="int8"), dtype=DTYPES_PRSA["wd"])
+        elif coluna == "station":
+            dados[coluna] = pd.Categorical.from_codes(np.zeros(n, dtype="int8"), categories=[estacao])
+        elif coluna in colunas:
+            dados[coluna] = colunas[coluna]
+        else:
+            dados[coluna] = np.full(n, np.nan, dtype=DTYPES_PRSA[coluna])
+    # As colunas já são arrays novos: copy=False evita uma segunda cópia de todo o resultado
+    df = pd.DataFrame({**dados, **extras}, index=indice, copy=False)
+    logger.info(f"{caminho}: {n} linhas em {len(blocos)} bloco(s), {df.memory_usage(deep=True).sum() / 2**20:.1f} MiB")
+    return df
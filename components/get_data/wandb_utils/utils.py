@@ -1,37 +1,532 @@
+import io
 import os
+import json
+import time
+import random
+import fnmatch
+import hashlib
 import logging
-import requests
+import tempfile
+import threading
 import zipfile
-import wandb
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+from .importacao import ModuloTardio
+
+# Importados no primeiro uso: extrair um zip ou consultar o cache não paga o custo de carregá-los
+requests = ModuloTardio("requests")
+wandb = ModuloTardio("wandb")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
 logger = logging.getLogger(__name__)
 
-def download_file(url, caminho_saida):
+TAMANHO_CHUNK_PADRAO = 1024 * 1024  # 1 MiB
+INTERVALO_LOG_PROGRESSO = 5.0  # segundos entre logs de progresso
+TIMEOUT_PADRAO = (10, 60)  # (conexão, leitura) em segundos
+TTL_CACHE_ARTEFATOS = 300.0  # segundos
+
+# Cliente do W&B e cache de metadados de artefatos compartilhados pelo processo
+_api = None
+_trava_api = threading.Lock()
+_cache_artefatos = {}
+_trava_cache = threading.Lock()
+
+@dataclass
+class ResultadoDownload:
+    """
+    Resultado de um download. É avaliado como verdadeiro apenas em caso de sucesso,
+    de modo que ``if not download_file(...)`` continua funcionando como antes.
+    """
+    sucesso: bool
+    caminho: str = None
+    bytes_baixados: int = 0
+    segundos: float = 0.0
+    hash: str = None
+    algoritmo_hash: str = None
+    etag: str = None
+    last_modified: str = None
+
+    def __bool__(self):
+        return self.sucesso
+
+    @property
+    def throughput(self):
+        """Taxa média do download em bytes por segundo."""
+        return self.bytes_baixados / self.segundos if self.segundos > 0 else 0.0
+
+
+def _formatar_bytes(n):
+    for unidade in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024 or unidade == "GiB":
+            return f"{n:.1f} {unidade}"
+        n /= 1024
+
+
+def _gravar_stream(resposta, caminho_saida, tamanho_chunk=TAMANHO_CHUNK_PADRAO, algoritmo_hash="sha256",
+                   progresso=None, intervalo_log=INTERVALO_LOG_PROGRESSO):
+    """
+    Grava o corpo de uma resposta ``requests`` (aberta com ``stream=True``) em disco, chunk a chunk.
+
+    O conteúdo é escrito em um arquivo temporário no mesmo diretório de ``caminho_saida`` e
+    renomeado atomicamente ao final, de modo que um download interrompido nunca deixa um arquivo
+    parcial no caminho final. O hash é calculado durante a gravação, sem reler o arquivo.
+
+    Retorna
+    -------
+    ResultadoDownload
+    """
+    diretorio = os.path.dirname(caminho_saida) or "."
+    os.makedirs(diretorio, exist_ok=True)
+    total = int(resposta.headers.get("Content-Length") or 0) if hasattr(resposta, "headers") else 0
+    hasher = hashlib.new(algoritmo_hash) if algoritmo_hash else None
+
+    baixados = 0
+    inicio = time.perf_counter()
+    proximo_log = inicio + intervalo_log
+    descritor, caminho_temp = tempfile.mkstemp(dir=diretorio, prefix=".", suffix=".part")
+    try:
+        with os.fdopen(descritor, "wb") as f:
+            for chunk in resposta.iter_content(chunk_size=tamanho_chunk):
+                if not chunk:
+                    continue
+                f.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+                baixados += len(chunk)
+                if progresso is not None:
+                    progresso(baixados, total)
+                agora = time.perf_counter()
+                if agora >= proximo_log:
+                    taxa = baixados / (agora - inicio)
+                    percentual = f" ({100 * baixados / total:.1f}%)" if total else ""
+                    logger.info(f"{_formatar_bytes(baixados)} baixados{percentual} a {_formatar_bytes(taxa)}/s")
+                    proximo_log = agora + intervalo_log
+        os.replace(caminho_temp, caminho_saida)
+    except BaseException:
+        if os.path.exists(caminho_temp):
+            os.remove(caminho_temp)
+        raise
+
+    cabecalhos = getattr(resposta, "headers", {}) or {}
+    resultado = ResultadoDownload(
+        sucesso=True,
+        caminho=caminho_saida,
+        bytes_baixados=baixados,
+        segundos=time.perf_counter() - inicio,
+        hash=hasher.hexdigest() if hasher is not None else None,
+        algoritmo_hash=algoritmo_hash,
+        etag=cabecalhos.get("ETag"),
+        last_modified=cabecalhos.get("Last-Modified"),
+    )
+    logger.info(
+        f"Download concluído: {_formatar_bytes(baixados)} em {resultado.segundos:.2f}s "
+        f"({_formatar_bytes(resultado.throughput)}/s), {algoritmo_hash}={resultado.hash}"
+    )
+    return resultado
+
+
+def download_file(url, caminho_saida, tamanho_chunk=TAMANHO_CHUNK_PADRAO, algoritmo_hash="sha256",
+                  progresso=None, timeout=TIMEOUT_PADRAO):
     """
     Baixa um arquivo de uma URL para um caminho de saída especificado.
 
+    O corpo da resposta é lido em streaming e gravado em disco em chunks de ``tamanho_chunk``
+    bytes, portanto o uso de memória não depende do tamanho do arquivo.
+
     Parâmetros
     ----------
     url : str
         A URL do arquivo a ser baixado.
     caminho_saida : str
         O caminho local onde o arquivo será salvo.
+    tamanho_chunk : int, opcional
+        Tamanho, em bytes, de cada bloco lido da rede. O padrão é 1 MiB.
+    algoritmo_hash : str, opcional
+        Algoritmo de ``hashlib`` calculado durante o download. Use None para desativar.
+    progresso : callable, opcional
+        Função chamada como ``progresso(bytes_baixados, bytes_totais)`` a cada chunk.
+        ``bytes_totais`` é 0 quando o servidor não informa o Content-Length.
+    timeout : float ou tuple, opcional
+        Timeout repassado ao ``requests``.
+
+    Retorna
+    -------
+    ResultadoDownload
+        Verdadeiro em caso de sucesso, com o hash, o número de bytes e a taxa do download.
     """
     logger.info(f"Baixando arquivo de {url} para {caminho_saida}")
     try:
-        resposta = requests.get(url)
-        resposta.raise_for_status()  # Levanta um erro para respostas HTTP ruins (4xx ou 5xx)
-        os.makedirs(os.path.dirname(caminho_saida), exist_ok=True)
-        with open(caminho_saida, "wb") as f:
-            f.write(resposta.content)
-        logger.info("Download concluído.")
-        return True # Retorna True em caso de sucesso
+        with requests.get(url, stream=True, timeout=timeout) as resposta:
+            resposta.raise_for_status()  # Levanta um erro para respostas HTTP ruins (4xx ou 5xx)
+            return _gravar_stream(resposta, caminho_saida, tamanho_chunk, algoritmo_hash, progresso)
     except requests.exceptions.RequestException as e:
         logger.error(f"Erro ao baixar o arquivo de {url}: {e}")
-        return False # Retorna False em caso de erro
+        return ResultadoDownload(sucesso=False, caminho=caminho_saida)
+
+class _RangeNaoSuportado(Exception):
+    """O servidor deixou de responder com 206 a uma requisição com Range."""
+
+
+def criar_sessao(max_conexoes=4):
+    """
+    Cria uma ``requests.Session`` com um pool de conexões dimensionado para ``max_conexoes``
+    requisições simultâneas ao mesmo host.
+    """
+    sessao = requests.Session()
+    adaptador = requests.adapters.HTTPAdapter(pool_connections=max_conexoes, pool_maxsize=max_conexoes)
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+    return sessao
+
+
+def _sondar_suporte_range(sessao, url, timeout):
+    """
+    Verifica se o servidor aceita requisições com Range pedindo apenas o primeiro byte.
+
+    Retorna
+    -------
+    dict ou None
+        ``{"tamanho", "etag", "last_modified"}`` se o servidor responder 206 com um
+        Content-Range completo, ou None caso contrário.
+    """
+    try:
+        with sessao.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=timeout) as resposta:
+            resposta.raise_for_status()
+            content_range = resposta.headers.get("Content-Range", "")
+            if resposta.status_code != 206 or "/" not in content_range:
+                return None
+            total = content_range.rsplit("/", 1)[1]
+            if not total.isdigit():
+                return None
+            return {
+                "tamanho": int(total),
+                "etag": resposta.headers.get("ETag"),
+                "last_modified": resposta.headers.get("Last-Modified"),
+            }
+    except requests.exceptions.RequestException as e:
+        logger.info(f"Não foi possível verificar suporte a Range em {url}: {e}")
+        return None
+
+
+def _carregar_estado(caminho_estado, caminho_temp, url, info):
+    """Carrega o estado de um download anterior, se ele corresponder ao mesmo recurso remoto."""
+    if not (os.path.exists(caminho_estado) and os.path.exists(caminho_temp)):
+        return None
+    try:
+        with open(caminho_estado, "r", encoding="utf-8") as f:
+            estado = json.load(f)
+    except (OSError, ValueError):
+        return None
+    mesmo_recurso = (
+        estado.get("url") == url
+        and estado.get("tamanho") == info["tamanho"]
+        and estado.get("etag") == info["etag"]
+        and estado.get("last_modified") == info["last_modified"]
+    )
+    if not mesmo_recurso or os.path.getsize(caminho_temp) != info["tamanho"]:
+        logger.info("Estado de download anterior não corresponde ao recurso remoto. Recomeçando do zero.")
+        return None
+    return estado
+
+
+def _salvar_estado(caminho_estado, estado):
+    temporario = caminho_estado + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+    os.replace(temporario, caminho_estado)
+
+
+def _hash_arquivo(caminho, algoritmo_hash, tamanho_chunk=TAMANHO_CHUNK_PADRAO):
+    hasher = hashlib.new(algoritmo_hash)
+    with open(caminho, "rb") as f:
+        for chunk in iter(lambda: f.read(tamanho_chunk), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _remover_parciais(*caminhos):
+    for caminho in caminhos:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+
+def download_file_paralelo(url, caminho_saida, num_partes=4, tamanho_parte_minimo=8 * 1024 * 1024,
+                           tamanho_chunk=TAMANHO_CHUNK_PADRAO, algoritmo_hash="sha256", tentativas=3,
+                           sessao=None, timeout=TIMEOUT_PADRAO, intervalo_estado=1.0, manter_parcial=True):
+    """
+    Baixa um arquivo grande em partes paralelas usando requisições HTTP com Range.
+
+    O arquivo é pré-alocado em ``caminho_saida + ".part"`` e cada parte é escrita na sua
+    posição por uma thread própria, todas compartilhando o pool de conexões da mesma sessão.
+    O progresso de cada parte é persistido em ``caminho_saida + ".estado.json"``; se o download
+    for interrompido, a próxima chamada retoma apenas os bytes que faltam. Quando o servidor
+    não aceita Range, não informa o tamanho ou o arquivo é pequeno demais para ser dividido,
+    cai para o download em stream único de :func:`download_file`, removendo os arquivos
+    ``.part`` e ``.estado.json`` que houver.
+
+    Parâmetros
+    ----------
+    url : str
+        A URL do arquivo a ser baixado.
+    caminho_saida : str
+        O caminho local onde o arquivo será salvo.
+    num_partes : int, opcional
+        Número máximo de partes (e de conexões) simultâneas.
+    tamanho_parte_minimo : int, opcional
+        Tamanho mínimo, em bytes, de cada parte. Arquivos menores que o dobro deste valor
+        são baixados em stream único.
+    tamanho_chunk : int, opcional
+        Tamanho, em bytes, de cada bloco lido da rede.
+    algoritmo_hash : str, opcional
+        Algoritmo de ``hashlib`` calculado sobre o arquivo final. Use None para desativar.
+    tentativas : int, opcional
+        Número de tentativas por parte antes de desistir. Os bytes já gravados são mantidos.
+    sessao : requests.Session, opcional
+        Sessão a reutilizar. Se None, uma sessão com pool de ``num_partes`` conexões é criada.
+    timeout : float ou tuple, opcional
+        Timeout repassado ao ``requests``.
+    intervalo_estado : float, opcional
+        Intervalo mínimo, em segundos, entre gravações do arquivo de estado.
+    manter_parcial : bool, opcional
+        Se True, uma falha de rede ou de escrita em disco mantém o ``.part`` e o ``.estado.json``
+        para que a próxima chamada retome o download. Use False na última tentativa para não
+        deixar restos no diretório.
+
+    Retorna
+    -------
+    ResultadoDownload
+        Verdadeiro em caso de sucesso.
+    """
+    caminho_temp = caminho_saida + ".part"
+    caminho_estado = caminho_saida + ".estado.json"
+    sessao_propria = sessao is None
+    sessao = sessao or criar_sessao(num_partes)
+    try:
+        info = _sondar_suporte_range(sessao, url, timeout)
+        if info is None or info["tamanho"] < 2 * tamanho_parte_minimo:
+            logger.info("Download em partes não disponível para este recurso. Usando stream único.")
+            _remover_parciais(caminho_temp, caminho_estado)
+            return download_file(url, caminho_saida, tamanho_chunk, algoritmo_hash, timeout=timeout)
+
+        os.makedirs(os.path.dirname(caminho_saida) or ".", exist_ok=True)
+
+        estado = _carregar_estado(caminho_estado, caminho_temp, url, info)
+        if estado is None:
+            tamanho = info["tamanho"]
+            n = max(1, min(num_partes, tamanho // tamanho_parte_minimo))
+            limites = [tamanho * i // n for i in range(n + 1)]
+            estado = dict(info, url=url, partes=[
+                {"inicio": limites[i], "fim": limites[i + 1] - 1, "baixados": 0} for i in range(n)
+            ])
+            try:
+                with open(caminho_temp, "wb") as f:
+                    f.truncate(tamanho)
+                _salvar_estado(caminho_estado, estado)
+            except OSError as e:
+                _remover_parciais(caminho_temp, caminho_estado)
+                logger.error(f"Erro ao preparar o arquivo parcial de {url}: {e}")
+                return ResultadoDownload(sucesso=False, caminho=caminho_saida)
+        else:
+            ja_baixados = sum(p["baixados"] for p in estado["partes"])
+            logger.info(f"Retomando download de {url}: {_formatar_bytes(ja_baixados)} já presentes em disco.")
 
-def extract_csv_from_zip(caminho_zip, diretorio_extracao=None, delete_zip_after_extraction=True):
+        trava = threading.Lock()
+        ultimo_salvamento = [time.perf_counter()]
+        bytes_nesta_execucao = [0]
+
+        def registrar_progresso(parte, n_bytes):
+            with trava:
+                parte["baixados"] += n_bytes
+                bytes_nesta_execucao[0] += n_bytes
+                agora = time.perf_counter()
+                if agora - ultimo_salvamento[0] >= intervalo_estado:
+                    _salvar_estado(caminho_estado, estado)
+                    ultimo_salvamento[0] = agora
+
+        def baixar_parte(parte):
+            for tentativa in range(1, tentativas + 1):
+                inicio = parte["inicio"] + parte["baixados"]
+                if inicio > parte["fim"]:
+                    return
+                cabecalhos = {"Range": f"bytes={inicio}-{parte['fim']}"}
+                if estado.get("etag"):
+                    cabecalhos["If-Range"] = estado["etag"]
+                try:
+                    with sessao.get(url, headers=cabecalhos, stream=True, timeout=timeout) as resposta:
+                        resposta.raise_for_status()
+                        if resposta.status_code != 206:
+                            raise _RangeNaoSuportado(f"status {resposta.status_code} para {cabecalhos['Range']}")
+                        # Sem buffer: cada chunk vai direto ao SO antes de ser contado no estado.
+                        with open(caminho_temp, "r+b", buffering=0) as f:
+                            f.seek(inicio)
+                            for chunk in resposta.iter_content(chunk_size=tamanho_chunk):
+                                if chunk:
+                                    f.write(chunk)
+                                    registrar_progresso(parte, len(chunk))
+                    if parte["inicio"] + parte["baixados"] > parte["fim"]:
+                        return
+                except requests.exceptions.RequestException as e:
+                    logger.warning(f"Falha na parte {parte['inicio']}-{parte['fim']} "
+                                   f"(tentativa {tentativa}/{tentativas}): {e}")
+            raise requests.exceptions.RetryError(f"Parte {parte['inicio']}-{parte['fim']} não concluída.")
+
+        inicio_execucao = time.perf_counter()
+        pendentes = [p for p in estado["partes"] if p["inicio"] + p["baixados"] <= p["fim"]]
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, len(pendentes))) as executor:
+                for futuro in [executor.submit(baixar_parte, p) for p in pendentes]:
+                    futuro.result()
+        except _RangeNaoSuportado as e:
+            logger.warning(f"Servidor deixou de aceitar Range ({e}). Usando stream único.")
+            _remover_parciais(caminho_temp, caminho_estado)
+            return download_file(url, caminho_saida, tamanho_chunk, algoritmo_hash, timeout=timeout)
+        except OSError as e:
+            # Erros de rede (RequestException herda de OSError) e de escrita das partes em disco
+            if manter_parcial:
+                try:
+                    _salvar_estado(caminho_estado, estado)
+                except OSError:
+                    pass  # O último estado salvo continua válido: só conta bytes já gravados
+                logger.error(f"Erro ao baixar o arquivo de {url}: {e}. O download pode ser retomado.")
+            else:
+                _remover_parciais(caminho_temp, caminho_estado)
+                logger.error(f"Erro ao baixar o arquivo de {url}: {e}. Arquivos parciais removidos.")
+            return ResultadoDownload(sucesso=False, caminho=caminho_saida)
+
+        os.replace(caminho_temp, caminho_saida)
+        os.remove(caminho_estado)
+        segundos = time.perf_counter() - inicio_execucao
+        resultado = ResultadoDownload(
+            sucesso=True,
+            caminho=caminho_saida,
+            bytes_baixados=bytes_nesta_execucao[0],
+            segundos=segundos,
+            hash=_hash_arquivo(caminho_saida, algoritmo_hash) if algoritmo_hash else None,
+            algoritmo_hash=algoritmo_hash,
+            etag=estado.get("etag"),
+            last_modified=estado.get("last_modified"),
+        )
+        logger.info(
+            f"Download em {len(estado['partes'])} partes concluído: {_formatar_bytes(resultado.bytes_baixados)} "
+            f"em {segundos:.2f}s ({_formatar_bytes(resultado.throughput)}/s), {algoritmo_hash}={resultado.hash}"
+        )
+        return resultado
+    finally:
+        if sessao_propria:
+            sessao.close()
+
+class LimitadorPorHost:
+    """
+    Limita o número de downloads simultâneos para um mesmo host.
+
+    Chamado com uma URL, retorna o semáforo do host, a ser usado como gerenciador de contexto::
+
+        with limitador(url):
+            download_file(url, caminho)
+
+    Parâmetros
+    ----------
+    max_por_host : int, opcional
+        Número máximo de conexões simultâneas por host.
+    """
+
+    def __init__(self, max_por_host=2):
+        self.max_por_host = max(1, int(max_por_host))
+        self._semaforos = {}
+        self._trava = threading.Lock()
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._trava:
+            semaforo = self._semaforos.get(host)
+            if semaforo is None:
+                semaforo = self._semaforos[host] = threading.BoundedSemaphore(self.max_por_host)
+        return semaforo
+
+
+def espera_backoff(tentativa, espera_base=1.0, espera_maxima=30.0):
+    """
+    Tempo de espera antes da próxima tentativa: backoff exponencial com jitter.
+
+    Parâmetros
+    ----------
+    tentativa : int
+        Número da tentativa que falhou, a partir de 1.
+    """
+    return min(espera_maxima, espera_base * 2 ** (tentativa - 1)) * random.uniform(0.5, 1.0)
+
+
+def _membro_corresponde(nome, filtro):
+    """
+    Verifica se um membro do zip atende ao filtro. ``filtro`` pode ser um padrão glob
+    (comparado com o caminho completo e com o nome base), uma expressão regular compilada
+    ou uma lista combinando ambos.
+    """
+    if filtro is None:
+        return True
+    if isinstance(filtro, (list, tuple, set)):
+        return any(_membro_corresponde(nome, f) for f in filtro)
+    if hasattr(filtro, "search"):
+        return filtro.search(nome) is not None
+    return fnmatch.fnmatch(nome, filtro) or fnmatch.fnmatch(os.path.basename(nome), filtro)
+
+
+def _listar_membros_csv(ref_zip, filtro=None):
+    return [
+        nome for nome in ref_zip.namelist()
+        if nome.endswith('.csv') and _membro_corresponde(nome, filtro)
+    ]
+
+
+def _extrair_membro(caminho_zip, nome, diretorio_extracao):
+    # Cada worker abre o próprio handle: ZipFile não é seguro para leituras concorrentes.
+    # O diretório pai é criado antes: o ZipFile.extract testa e cria sem exist_ok, o que
+    # falha quando dois workers extraem membros da mesma pasta ao mesmo tempo.
+    os.makedirs(os.path.dirname(os.path.join(diretorio_extracao, nome)), exist_ok=True)
+    with zipfile.ZipFile(caminho_zip, 'r') as ref_zip:
+        ref_zip.extract(nome, diretorio_extracao)
+    return os.path.join(diretorio_extracao, nome)
+
+
+def iter_csv_from_zip(caminho_zip, filtro=None, encoding=None):
+    """
+    Percorre os arquivos CSV de um .zip sem extraí-los para o disco.
+
+    Cada membro é entregue como um objeto de arquivo aberto diretamente sobre o zip, que pode
+    ser passado a ``pandas.read_csv`` ou ``csv.reader``. O stream só é válido até a próxima
+    iteração, e o zip é fechado quando o gerador termina.
+
+    Parâmetros
+    ----------
+    caminho_zip : str
+        O caminho para o arquivo .zip.
+    filtro : str, re.Pattern ou list, opcional
+        Padrão glob (ex.: ``"PRSA_Data_*.csv"``), expressão regular compilada ou lista de
+        padrões que os membros devem atender. Se None, todos os CSVs são entregues.
+    encoding : str, opcional
+        Se informado, os streams são entregues em modo texto com essa codificação.
+        Caso contrário, são binários.
+
+    Retorna
+    -------
+    generator
+        Tuplas ``(nome_do_membro, arquivo)``.
+    """
+    with zipfile.ZipFile(caminho_zip, 'r') as ref_zip:
+        for nome in _listar_membros_csv(ref_zip, filtro):
+            with ref_zip.open(nome) as stream:
+                if encoding is None:
+                    yield nome, stream
+                else:
+                    with io.TextIOWrapper(stream, encoding=encoding, newline="") as texto:
+                        yield nome, texto
+
+
+def extract_csv_from_zip(caminho_zip, diretorio_extracao=None, delete_zip_after_extraction=True, filtro=None, max_workers=1):
     """
     Extrai arquivos CSV de um arquivo .zip para o diretório especificado.
     Se diretorio_extracao não for informado, extrai para um subdiretório com o mesmo nome do arquivo .zip
@@ -47,6 +542,12 @@ def extract_csv_from_zip(caminho_zip, diretorio_extracao=None, delete_zip_after_
         Se None, o padrão é um subdiretório nomeado após o arquivo zip no mesmo diretório do zip.
     delete_zip_after_extraction : bool, opcional
         Se True, deleta o arquivo zip após a extração. O padrão é True.
+    filtro : str, re.Pattern ou list, opcional
+        Padrão glob (ex.: ``"PRSA_Data_*.csv"``), expressão regular compilada ou lista de
+        padrões que os membros devem atender para serem extraídos. Se None, extrai todos os CSVs.
+    max_workers : int, opcional
+        Número de threads usadas na extração. Com mais de um worker, cada membro é
+        descompactado em paralelo por um handle próprio do zip. O padrão é 1 (sequencial).
 
     Retorna
     -------
@@ -77,15 +578,20 @@ def extract_csv_from_zip(caminho_zip, diretorio_extracao=None, delete_zip_after_
     arquivos_csv = []
     try:
         with zipfile.ZipFile(caminho_zip, 'r') as ref_zip:
-            for arquivo in ref_zip.namelist():
-                if arquivo.endswith('.csv'):
-                    # Assegurar que arquivos dentro de pastas no zip sejam extraídos corretamente
-                    # e que o caminho final seja construído corretamente.
+            membros = _listar_membros_csv(ref_zip, filtro)
+            paralelo = max_workers is not None and max_workers > 1 and len(membros) > 1
+            if not paralelo:
+                for arquivo in membros:
                     # O método extract já lida com a estrutura de pastas internas.
                     ref_zip.extract(arquivo, diretorio_extracao)
                     # O caminho do arquivo extraído será relativo a diretorio_extracao
                     caminho_completo_arquivo_extraido = os.path.join(diretorio_extracao, arquivo)
                     arquivos_csv.append(caminho_completo_arquivo_extraido)
+        if paralelo:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(membros))) as executor:
+                arquivos_csv = list(executor.map(
+                    lambda nome: _extrair_membro(caminho_zip, nome, diretorio_extracao), membros
+                ))
         
         if not arquivos_csv:
             logger.warning(f"Nenhum arquivo .csv encontrado no arquivo zip: {caminho_zip}")
@@ -110,7 +616,103 @@ def extract_csv_from_zip(caminho_zip, diretorio_extracao=None, delete_zip_after_
         
     return arquivos_csv
 
-def artifact_exists(projeto, nome_artefato):
+def obter_api():
+    """
+    Retorna o cliente ``wandb.Api`` compartilhado pelo processo, criando-o na primeira chamada.
+
+    Criar o cliente autentica e abre uma sessão HTTP; reaproveitá-lo evita esse custo a cada
+    consulta de artefato.
+    """
+    global _api
+    with _trava_api:
+        if _api is None:
+            _api = wandb.Api()
+        return _api
+
+
+def limpar_cache_artefatos(projeto=None, nome_artefato=None, descartar_api=False):
+    """
+    Invalida o cache de metadados de artefatos.
+
+    Sem argumentos, esvazia o cache todo. Com ``projeto`` e ``nome_artefato``, invalida apenas
+    essa entrada (útil logo após registrar uma nova versão). Com ``descartar_api=True``, o
+    cliente compartilhado também é recriado na próxima consulta.
+    """
+    global _api
+    with _trava_cache:
+        if projeto is not None and nome_artefato is not None:
+            _cache_artefatos.pop((projeto, nome_artefato), None)
+        else:
+            _cache_artefatos.clear()
+    if descartar_api:
+        with _trava_api:
+            _api = None
+
+
+def _artefato_inexistente(erro):
+    # O wandb.Api embrulha tudo em CommError: "não encontrado" vem de um ValueError interno,
+    # falhas de rede e de HTTP vêm das exceções do requests
+    return isinstance(getattr(erro, "exc", None), ValueError) or "not found" in str(erro).lower()
+
+
+def _consultar_artefato(api, projeto, nome_artefato):
+    """Retorna ``(metadados ou None, definitivo)``; respostas não definitivas não vão para o cache."""
+    try:
+        artefato = api.artifact(f"{projeto}/{nome_artefato}")
+    except wandb.errors.CommError as e:
+        if _artefato_inexistente(e):
+            logger.info(f"Artefato '{nome_artefato}' não encontrado no projeto '{projeto}'.")
+            return None, True
+        logger.warning(f"Não foi possível consultar o artefato '{nome_artefato}' no projeto '{projeto}' (erro de comunicação: {e}).")
+        return None, False
+    except wandb.errors.Error: # Captura genérica para outros erros do wandb
+        logger.info(f"Artefato '{nome_artefato}' não encontrado no projeto '{projeto}'.")
+        return None, True
+    metadados = {
+        "nome": getattr(artefato, "name", nome_artefato),
+        "versao": getattr(artefato, "version", None),
+        "digest": getattr(artefato, "digest", None),
+        "metadados": dict(getattr(artefato, "metadata", None) or {}),
+    }
+    logger.info(f"Artefato '{nome_artefato}' encontrado no projeto '{projeto}': {metadados['nome']} ({metadados['versao']})")
+    return metadados, True
+
+
+def obter_metadados_artefato(projeto, nome_artefato, ttl=TTL_CACHE_ARTEFATOS):
+    """
+    Consulta nome, versão, digest e metadados de um artefato, com cache de ``ttl`` segundos.
+
+    Parâmetros
+    ----------
+    projeto : str
+        O nome do projeto no W&B.
+    nome_artefato : str
+        O nome do artefato, opcionalmente com versão ou alias (ex.: ``"dados:latest"``).
+    ttl : float, opcional
+        Validade, em segundos, de uma resposta em cache (inclusive de "não encontrado").
+        Falhas de comunicação não são guardadas e serão consultadas de novo.
+        Use 0 para forçar a consulta.
+
+    Retorna
+    -------
+    dict ou None
+        ``{"nome", "versao", "digest", "metadados"}``, ou None se o artefato não existir ou
+        não pôde ser consultado.
+    """
+    chave = (projeto, nome_artefato)
+    agora = time.monotonic()
+    with _trava_cache:
+        em_cache = _cache_artefatos.get(chave)
+    if em_cache is not None and em_cache[0] > agora:
+        return em_cache[1]
+    metadados, definitivo = _consultar_artefato(obter_api(), projeto, nome_artefato)
+    if definitivo:
+        with _trava_cache:
+            _cache_artefatos[chave] = (agora + ttl, metadados)
+    return metadados
+
+
+def artifact_exists(projeto, nome_artefato, ttl=TTL_CACHE_ARTEFATOS):
     """
     Verifica se um artefato existe no W&B.
 
@@ -120,20 +722,33 @@ def artifact_exists(projeto, nome_artefato):
         O nome do projeto no W&B.
     nome_artefato : str
         O nome do artefato.
+    ttl : float, opcional
+        Validade, em segundos, da resposta em cache. Use 0 para forçar a consulta.
 
     Retorna
     -------
     bool
         True se o artefato existir, False caso contrário.
     """
-    api = wandb.Api()
-    try:
-        artefato_status = api.artifact(f"{projeto}/{nome_artefato}")
-        logger.info(f"Artefato '{nome_artefato}' encontrado no projeto '{projeto}': {artefato_status}")
-        return True
-    except wandb.errors.CommError:
-        logger.info(f"Artefato '{nome_artefato}' não encontrado no projeto '{projeto}' devido a erro de comunicação.")
-        return False
-    except wandb.errors.Error: # Captura genérica para outros erros do wandb
-        logger.info(f"Artefato '{nome_artefato}' não encontrado no projeto '{projeto}'.")
-        return False
\ No newline at end of file
+    return obter_metadados_artefato(projeto, nome_artefato, ttl) is not None
+
+
+def obter_metadados_artefatos(projeto, nomes_artefatos, ttl=TTL_CACHE_ARTEFATOS, max_workers=8):
+    """
+    Consulta os metadados de vários artefatos.
+
+    O W&B não oferece consulta em lote: os nomes já presentes no cache são respondidos sem
+    rede e os demais viram consultas individuais feitas em paralelo com o mesmo cliente
+    ``wandb.Api``.
+
+    Retorna
+    -------
+    dict
+        ``{nome_artefato: metadados ou None}``, no formato de :func:`obter_metadados_artefato`.
+    """
+    nomes = list(dict.fromkeys(nomes_artefatos))
+    if not nomes:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(nomes))) as executor:
+        resultados = executor.map(lambda nome: obter_metadados_artefato(projeto, nome, ttl), nomes)
+        return dict(zip(nomes, resultados))
@@ -0,0 +1,381 @@
+import os
+import time
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .prsa import COLUNAS_PRSA, COLUNAS_POLUENTES, COLUNAS_METEOROLOGICAS, COLUNAS_TEMPO, montar_datetime
+from .uci import COLUNAS_DATA_UCI, COLUNAS_UCI, SENTINELA_UCI, SEPARADOR_UCI
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+TAMANHO_BLOCO_PADRAO = 100_000
+
+# Esquema declarado dos CSVs PRSA. "identificacao" são as colunas que reconhecem o formato
+# pelo cabeçalho; as faixas são folgadas em relação aos extremos do PRSA2017 e servem para
+# pegar unidades trocadas e colunas deslocadas, não outliers legítimos.
+ESQUEMA_PRSA = {
+    "nome": "prsa",
+    "identificacao": COLUNAS_TEMPO + ["station"],
+    "colunas": {
+        "No": "inteiro",
+        **{coluna: "inteiro" for coluna in COLUNAS_TEMPO},
+        **{coluna: "real" for coluna in COLUNAS_POLUENTES + COLUNAS_METEOROLOGICAS},
+        "wd": "texto",
+        "station": "texto",
+    },
+    "obrigatorias": COLUNAS_PRSA,
+    "faixas": {
+        "month": (1, 12),
+        "day": (1, 31),
+        "hour": (0, 23),
+        "PM2.5": (0, 1500),
+        "PM10": (0, 2000),
+        "SO2": (0, 1000),
+        "NO2": (0, 1000),
+        "CO": (0, 20000),
+        "O3": (0, 1500),
+        "TEMP": (-50, 50),
+        "PRES": (850, 1100),
+    },
+    "tempo": COLUNAS_TEMPO,
+    "estacao": "station",
+}
+
+
+
+def _campos_tempo_uci(bloco, caminho):
+    # Linhas só com separadores (";;;;") no fim do arquivo não são dados
+    bloco = bloco.dropna(how="all")
+    data = bloco["Date"].astype("string").str.strip().str.split("/", n=2, expand=True).reindex(columns=range(3))
+    hora = bloco["Time"].astype("string").str.strip().str.split(".", n=1, expand=True).reindex(columns=range(1))
+    # Como em uci.ler_csv_uci, o nome do arquivo identifica a estação
+    estacao = os.path.splitext(os.path.basename(caminho))[0]
+    return bloco.assign(year=data[2], month=data[1], day=data[0], hour=hora[0], station=estacao)
+
+
+# Esquema do AirQuality.csv do UCI, com o separador, a vírgula decimal e o sentinela de
+# uci.py. As colunas de tempo e a estação são derivadas de Date/Time e do nome do arquivo
+# antes da contagem, e as faixas estão nas unidades do CSV (CO em mg/m³).
+ESQUEMA_UCI = {
+    "nome": "uci",
+    "identificacao": COLUNAS_DATA_UCI,
+    "separador": SEPARADOR_UCI,
+    "decimal": ",",
+    "ausentes": [SENTINELA_UCI],
+    "preparar": _campos_tempo_uci,
+    "colunas": {
+        **{coluna: "texto" for coluna in COLUNAS_DATA_UCI},
+        **{coluna: "real" for coluna in COLUNAS_UCI},
+        **{coluna: "inteiro" for coluna in COLUNAS_TEMPO},
+        "station": "texto",
+    },
+    "obrigatorias": COLUNAS_DATA_UCI + list(COLUNAS_UCI),
+    # O NMHC(GT) só foi medido nas primeiras semanas da campanha
+    "max_razao_nulos": {"NMHC(GT)": 1.0},
+    "faixas": {
+        "month": (1, 12),
+        "day": (1, 31),
+        "hour": (0, 23),
+        "CO(GT)": (0, 50),
+        "NMHC(GT)": (0, 2000),
+        "C6H6(GT)": (0, 100),
+        "NOx(GT)": (0, 2000),
+        "NO2(GT)": (0, 1000),
+        **{coluna: (0, 5000) for coluna in COLUNAS_UCI if coluna.startswith("PT08.")},
+        "T": (-50, 50),
+        "RH": (0, 100),
+        "AH": (0, 10),
+    },
+    "tempo": COLUNAS_TEMPO,
+    "estacao": "station",
+}
+
+ESQUEMAS = {"prsa": ESQUEMA_PRSA, "uci": ESQUEMA_UCI}
+
+LIMITES_PADRAO = {
+    "max_razao_nulos": 0.25,
+    "max_razao_invalidos": 0.0,
+    "max_razao_fora_da_faixa": 0.001,
+    "max_razao_lacunas": 0.05,
+    "max_duplicadas": 0,
+    "permitir_esquema_desconhecido": False,
+}
+
+
+class ErroValidacao(ValueError):
+    """Arquivos fora dos limites de qualidade. O relatório completo fica em ``relatorio``."""
+
+    def __init__(self, mensagem, relatorio):
+        super().__init__(mensagem)
+        self.relatorio = relatorio
+
+
+def identificar_esquema(caminho, esquemas=None):
+    """
+    Retorna o esquema cujo conjunto de colunas de identificação está no cabeçalho, lido com o
+    separador do próprio esquema, e o cabeçalho. Sem esquema correspondente, retorna None e o
+    cabeçalho separado por vírgulas.
+    """
+    with open(caminho, "r", encoding="utf-8-sig", errors="replace") as f:
+        linha = f.readline().strip()
+    for esquema in (esquemas or ESQUEMAS).values():
+        cabecalho = [c.strip().strip('"') for c in linha.split(esquema.get("separador", ","))]
+        if set(esquema["identificacao"]).issubset(cabecalho):
+            return esquema, cabecalho
+    return None, [c.strip().strip('"') for c in linha.split(",")]
+
+
+class _Contadores:
+    # Estado de um arquivo entre blocos: contagens por coluna e as horas vistas por estação
+    def __init__(self, colunas):
+        self.linhas = 0
+        self.nulos = dict.fromkeys(colunas, 0)
+        self.invalidos = dict.fromkeys(colunas, 0)
+        self.fora_da_faixa = dict.fromkeys(colunas, 0)
+        self.datas_invalidas = 0
+        self.horas = {}
+
+    def atualizar(self, bloco, esquema):
+        self.linhas += len(bloco)
+        numericas = {}
+        for coluna, tipo in esquema["colunas"].items():
+            if coluna not in bloco.columns:
+                continue
+            serie = bloco[coluna]
+            nulos = serie.isna().to_numpy()
+            self.nulos[coluna] += int(nulos.sum())
+            if tipo == "texto":
+                continue
+            if not pd.api.types.is_numeric_dtype(serie.dtype):
+                # Texto em coluna numérica (ex.: colunas deslocadas): conta o que não converte
+                if esquema.get("decimal", ".") != ".":
+                    serie = serie.astype("string").str.replace(esquema["decimal"], ".", regex=False)
+                serie = pd.to_numeric(serie, errors="coerce")
+            valores = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+            invalidos = np.isnan(valores) & ~nulos
+            if tipo == "inteiro":
+                invalidos |= np.isfinite(valores) & (valores != np.floor(valores))
+            self.invalidos[coluna] += int(invalidos.sum())
+            if coluna in esquema["faixas"]:
+                minimo, maximo = esquema["faixas"][coluna]
+                self.fora_da_faixa[coluna] += int(((valores < minimo) | (valores > maximo)).sum())
+            numericas[coluna] = valores
+        self._acumular_horas(bloco, esquema, numericas)
+
+    def _acumular_horas(self, bloco, esquema, numericas):
+        tempo, estacao = esquema["tempo"], esquema["estacao"]
+        if not all(c in numericas for c in tempo) or estacao not in bloco.columns:
+            return
+        campos = np.column_stack([numericas[c] for c in tempo])
+        validas = np.isfinite(campos).all(axis=1) & (campos[:, 0] >= 1970)
+        for coluna in tempo[1:]:
+            minimo, maximo = esquema["faixas"].get(coluna, (-np.inf, np.inf))
+            validas &= (numericas[coluna] >= minimo) & (numericas[coluna] <= maximo)
+        campos = campos[validas].astype(np.int64)
+        datetimes = montar_datetime(*campos.T)
+        # Datas como 30/02 são deslocadas por montar_datetime para o mês seguinte
+        existentes = datetimes.astype("datetime64[M]").astype(np.int64) == (campos[:, 0] - 1970) * 12 + campos[:, 1] - 1
+        self.datas_invalidas += int(len(campos) - existentes.sum())
+        horas = datetimes[existentes].astype("datetime64[h]").astype(np.int64).astype(np.int32)
+        estacoes = bloco[estacao].astype("category")
+        codigos = estacoes.cat.codes.to_numpy()[validas][existentes]
+        for codigo in np.unique(codigos[codigos >= 0]):
+            self.horas.setdefault(str(estacoes.cat.categories[codigo]), []).append(horas[codigos == codigo])
+
+    def continuidade(self):
+        resultado = {}
+        for nome, partes in self.horas.items():
+            horas = np.concatenate(partes)
+            unicas = np.unique(horas)
+            esperadas = int(unicas[-1] - unicas[0]) + 1
+            saltos = np.diff(unicas)
+            resultado[nome] = {
+                "inicio": str(np.datetime64(int(unicas[0]), "h")),
+                "fim": str(np.datetime64(int(unicas[-1]), "h")),
+                "horas_esperadas": esperadas,
+                "lacunas": esperadas - len(unicas),
+                "maior_lacuna_horas": int(saltos.max()) - 1 if len(saltos) else 0,
+                "duplicadas": int(len(horas) - len(unicas)),
+            }
+        return resultado
+
+
+def _violacoes(relatorio, limites, esquema):
+    violacoes = []
+    linhas = relatorio["linhas"]
+    if relatorio["colunas_faltantes"]:
+        violacoes.append(f"colunas obrigatórias ausentes: {relatorio['colunas_faltantes']}")
+    if not linhas:
+        violacoes.append("arquivo sem linhas")
+        return violacoes
+    for coluna, contagens in relatorio["colunas"].items():
+        razao_nulos = contagens.get("nulos", 0) / linhas
+        max_nulos = esquema.get("max_razao_nulos", {}).get(coluna, limites["max_razao_nulos"])
+        if razao_nulos > max_nulos:
+            violacoes.append(f"{coluna}: {razao_nulos:.1%} nulos (máximo {max_nulos:.1%})")
+        razao_invalidos = contagens.get("invalidos", 0) / linhas
+        if razao_invalidos > limites["max_razao_invalidos"]:
+            violacoes.append(f"{coluna}: {contagens['invalidos']} valores fora do tipo declarado")
+        razao_fora = contagens.get("fora_da_faixa", 0) / linhas
+        if razao_fora > limites["max_razao_fora_da_faixa"]:
+            violacoes.append(f"{coluna}: {razao_fora:.2%} valores fora da faixa")
+    if relatorio["datas_invalidas"] / linhas > limites["max_razao_invalidos"]:
+        violacoes.append(f"{relatorio['datas_invalidas']} datas inexistentes")
+    for estacao, continuidade in relatorio["estacoes"].items():
+        if continuidade["duplicadas"] > limites["max_duplicadas"]:
+            violacoes.append(f"{estacao}: {continuidade['duplicadas']} horários duplicados")
+        razao_lacunas = continuidade["lacunas"] / continuidade["horas_esperadas"]
+        if razao_lacunas > limites["max_razao_lacunas"]:
+            violacoes.append(
+                f"{estacao}: {razao_lacunas:.1%} das horas ausentes (maior lacuna: {continuidade['maior_lacuna_horas']}h)"
+            )
+    return violacoes
+
+
+def validar_arquivo(caminho, esquemas=None, limites=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Valida um CSV contra o esquema declarado, lendo-o em blocos.
+
+    Verifica o conjunto de colunas, os tipos (valores que não convertem para número ou
+    inteiros com casas decimais), as faixas de valores, datas inexistentes, a continuidade
+    horária e horários duplicados por estação e a razão de nulos por coluna. Colunas
+    obrigatórias ausentes interrompem a leitura do arquivo. Um CSV que não corresponde a
+    nenhum esquema é reprovado, a menos que ``permitir_esquema_desconhecido`` esteja nos
+    limites: nesse caso ele passa com um aviso.
+
+    Parâmetros
+    ----------
+    caminho : str
+        O CSV a validar.
+    esquemas : dict, opcional
+        Esquemas conhecidos, por nome. O padrão é ``ESQUEMAS``.
+    limites : dict, opcional
+        Limites que transformam as contagens em violações. Chaves ausentes usam
+        ``LIMITES_PADRAO``.
+    tamanho_bloco : int, opcional
+        Linhas lidas por vez.
+
+    Retorna
+    -------
+    dict
+        Relatório do arquivo, com as contagens, a continuidade por estação, ``violacoes``
+        e ``aprovado``.
+    """
+    limites = {**LIMITES_PADRAO, **(limites or {})}
+    esquema, cabecalho = identificar_esquema(caminho, esquemas)
+    relatorio = {"arquivo": caminho, "esquema": esquema["nome"] if esquema else None}
+    if esquema is None:
+        mensagem = f"cabeçalho não corresponde a nenhum esquema conhecido: {cabecalho}"
+        relatorio["violacoes"] = [] if limites["permitir_esquema_desconhecido"] else [mensagem]
+        relatorio["avisos"] = [mensagem] if limites["permitir_esquema_desconhecido"] else []
+        relatorio["aprovado"] = not relatorio["violacoes"]
+        return relatorio
+
+    faltantes = [c for c in esquema["obrigatorias"] if c not in cabecalho]
+    relatorio["colunas_faltantes"] = faltantes
+    relatorio["colunas_extras"] = [c for c in cabecalho if c and c not in esquema["colunas"]]
+    contadores = _Contadores(esquema["colunas"])
+    if not faltantes:
+        textos = {c: "category" for c, tipo in esquema["colunas"].items() if tipo == "texto" and c in cabecalho}
+        blocos = pd.read_csv(
+            caminho, sep=esquema.get("separador", ","), decimal=esquema.get("decimal", "."),
+            na_values=esquema.get("ausentes"), dtype=textos, chunksize=tamanho_bloco, engine="c",
+        )
+        for bloco in blocos:
+            if "preparar" in esquema:
+                bloco = esquema["preparar"](bloco, caminho)
+            contadores.atualizar(bloco, esquema)
+
+    relatorio["linhas"] = contadores.linhas
+    relatorio["datas_invalidas"] = contadores.datas_invalidas
+    # Relatório compacto: só as contagens diferentes de zero
+    relatorio["colunas"] = {}
+    for coluna in esquema["colunas"]:
+        contagens = {
+            chave: getattr(contadores, chave)[coluna]
+            for chave in ("nulos", "invalidos", "fora_da_faixa")
+            if getattr(contadores, chave)[coluna]
+        }
+        if contagens:
+            relatorio["colunas"][coluna] = contagens
+    relatorio["estacoes"] = contadores.continuidade()
+    relatorio["violacoes"] = _violacoes(relatorio, limites, esquema)
+    relatorio["aprovado"] = not relatorio["violacoes"]
+    return relatorio
+
+
+def _registrar(relatorio):
+    if relatorio["aprovado"]:
+        for aviso in relatorio.get("avisos", []):
+            logger.warning(f"'{relatorio['arquivo']}': {aviso}")
+        logger.info(f"'{relatorio['arquivo']}' aprovado ({relatorio.get('linhas', 0)} linhas)")
+    else:
+        logger.error(f"'{relatorio['arquivo']}' reprovado: {'; '.join(relatorio['violacoes'])}")
+
+
+def validar(caminhos, esquemas=None, limites=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO, processos=None,
+            parar_na_primeira_falha=True):
+    """
+    Valida vários CSVs, em paralelo entre arquivos.
+
+    Parâmetros
+    ----------
+    caminhos : list
+        Os CSVs a validar.
+    esquemas, limites, tamanho_bloco
+        Repassados a :func:`validar_arquivo`.
+    processos : int, opcional
+        Se maior que 1, os arquivos são validados em um pool de processos.
+    parar_na_primeira_falha : bool, opcional
+        Se True, os arquivos ainda não iniciados são cancelados assim que um arquivo é
+        reprovado, e o relatório é marcado como ``interrompido``.
+
+    Retorna
+    -------
+    dict
+        ``{"aprovado", "interrompido", "arquivos", "violacoes", "linhas", "segundos",
+        "linhas_por_segundo", "limites"}``.
+    """
+    limites = {**LIMITES_PADRAO, **(limites or {})}
+    inicio = time.perf_counter()
+    arquivos, interrompido = [], False
+    if processos and processos > 1 and len(caminhos) > 1:
+        with ProcessPoolExecutor(max_workers=min(processos, len(caminhos))) as executor:
+            futuros = [executor.submit(validar_arquivo, c, esquemas, limites, tamanho_bloco) for c in caminhos]
+            for futuro in as_completed(futuros):
+                if futuro.cancelled():
+                    continue
+                arquivos.append(futuro.result())
+                _registrar(arquivos[-1])
+                if not arquivos[-1]["aprovado"] and parar_na_primeira_falha:
+                    interrompido = any([f.cancel() for f in futuros])
+                    break
+    else:
+        for i, caminho in enumerate(caminhos):
+            arquivos.append(validar_arquivo(caminho, esquemas, limites, tamanho_bloco))
+            _registrar(arquivos[-1])
+            if not arquivos[-1]["aprovado"] and parar_na_primeira_falha:
+                interrompido = i < len(caminhos) - 1
+                break
+    segundos = time.perf_counter() - inicio
+
+    arquivos.sort(key=lambda r: r["arquivo"])
+    linhas = sum(r.get("linhas", 0) for r in arquivos)
+    relatorio = {
+        "aprovado": all(r["aprovado"] for r in arquivos),
+        "interrompido": interrompido,
+        "arquivos": arquivos,
+        "violacoes": [f"{r['arquivo']}: {v}" for r in arquivos for v in r["violacoes"]],
+        "linhas": linhas,
+        "segundos": segundos,
+        "linhas_por_segundo": linhas / segundos if segundos > 0 else float("inf"),
+        "limites": limites,
+    }
+    logger.info(
+        f"Validação: {len(arquivos)} de {len(caminhos)} arquivo(s), {linhas} linhas em {segundos:.2f}s "
+        f"({relatorio['linhas_por_segundo']:.0f} linhas/s), {len(relatorio['violacoes'])} violação(ões)"
+    )
+    return relatorio
@@ -0,0 +1 @@
+# This file makes Python treat the 'impute' directory as a sub-package.
\ No newline at end of file
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+import argparse
+import os
+import shutil
+import logging
+import wandb
+import pandas as pd
+from wandb_utils.prsa import carregar_parquet_prsa, gravar_parquet_prsa
+from wandb_utils.imputacao import imputar
+from wandb_utils.incremental import (
+    CHAVE_MARCAS, calcular_marcas, filtrar_novas_linhas, mesclar_marcas, obter_versao_anterior,
+    recuar_marcas,
+)
+from wandb_utils.log_artifact import log_artifact, aguardar_uploads
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def run_strategy(df, strategy, args):
+    options = {"processos": args.processes}
+    if strategy == "knn_janela":
+        options.update(n_vizinhos=args.knn_neighbors, janela=args.knn_window)
+    return imputar(df, strategy, **options)
+
+
+def go(args):
+    run = wandb.init(job_type="impute")
+    run.config.update(vars(args))
+
+    logger.info(f"Baixando artefato {args.input_artifact}")
+    artifact = run.use_artifact(args.input_artifact)
+    artifact_dir = artifact.download(os.path.join(args.local_data_dir, "parquet"))
+
+    previous_artifact, watermarks = None, {}
+    if getattr(args, "incremental", False):
+        previous_artifact, watermarks = obter_versao_anterior(run, args.artifact_name)
+    # Linhas já imputadas dentro da janela de contexto entram na interpolação das novas
+    context_marks = recuar_marcas(watermarks, getattr(args, "context_hours", 48))
+    min_year = min(pd.Timestamp(t).year for t in context_marks.values()) if context_marks else None
+    df = filtrar_novas_linhas(carregar_parquet_prsa(artifact_dir, ano_minimo=min_year), context_marks)
+    if df.empty:
+        logger.error(f"O artefato {args.input_artifact} não contém dados novos.")
+        run.finish()
+        return
+
+    df_imputed, metrics = run_strategy(df, args.strategy, args)
+
+    df_imputed = filtrar_novas_linhas(df_imputed, watermarks)
+    if df_imputed.empty:
+        logger.info("Nenhuma linha nova após as marcas d'água. Nada será enviado ao W&B.")
+        run.finish()
+        return
+    new_watermarks = mesclar_marcas(watermarks, calcular_marcas(df_imputed))
+
+    output_dir = os.path.join(args.local_data_dir, args.artifact_name)
+    if previous_artifact is None:
+        gravar_parquet_prsa(df_imputed, output_dir)
+    else:
+        # Só as linhas novas vão para o rascunho da versão anterior, rotuladas pela primeira hora
+        # nova para não repetir caminhos; as marcas d'água ficam apenas nos metadados
+        if os.path.isdir(output_dir):
+            shutil.rmtree(output_dir)
+        gravar_parquet_prsa(df_imputed, output_dir, acrescentar=True, parte=f"{df_imputed.index.min():%Y%m%d%H}")
+
+    # O envio roda em segundo plano enquanto as estratégias de comparação são medidas
+    logger.info(f"Enviando {args.artifact_name} para o Weights & Biases")
+    log_artifact(
+        args.artifact_name,
+        args.artifact_type,
+        args.artifact_description,
+        output_dir,
+        run,
+        metadados={CHAVE_MARCAS: new_watermarks, "linhas_adicionadas": len(df_imputed)},
+        artefato_base=previous_artifact,
+        assincrono=True,
+        deduplicar=previous_artifact is None,
+    )
+
+    all_metrics = [metrics]
+    # Estratégias extras rodam apenas para comparação de desempenho
+    for strategy in [s for s in args.compare_strategies.split(",") if s.strip()]:
+        if strategy.strip() != args.strategy:
+            all_metrics.append(run_strategy(df, strategy.strip(), args)[1])
+
+    for m in all_metrics:
+        for key in ("linhas_por_segundo", "segundos", "pico_memoria_bytes", "faltantes_restantes"):
+            run.summary[f"imputacao/{m['estrategia']}/{key}"] = m[key]
+
+    aguardar_uploads()
+    run.finish()
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Imputa valores faltantes do dataset Parquet e envia o resultado para o W&B")
+    parser.add_argument("--input_artifact", type=str, help="Artefato do W&B com o dataset Parquet")
+    parser.add_argument("--artifact_name", type=str, help="Nome do artefato imputado no W&B")
+    parser.add_argument("--artifact_type", type=str, help="Tipo do artefato (ex.: imputed_data)")
+    parser.add_argument("--artifact_description", type=str, help="Descrição do artefato")
+    parser.add_argument("--strategy", type=str, default="interpolacao", help="Estratégia usada na saída: interpolacao ou knn_janela (padrão: interpolacao)")
+    parser.add_argument("--compare_strategies", type=str, default="", help="Estratégias extras, separadas por vírgula, medidas para comparação (padrão: nenhuma)")
+    parser.add_argument("--processes", type=int, default=1, help="Processos para imputar estações em paralelo (padrão: 1)")
+    parser.add_argument("--knn_neighbors", type=int, default=5, help="Vizinhos da estratégia knn_janela (padrão: 5)")
+    parser.add_argument("--knn_window", type=str, default="30D", help="Janela de tempo da estratégia knn_janela (padrão: 30D)")
+    parser.add_argument(
+        "--local_data_dir",
+        type=str,
+        default="data",
+        help="Diretório local para baixar o artefato e gravar o resultado (padrão: data)"
+    )
+    parser.add_argument(
+        "--incremental",
+        type=lambda v: str(v).lower() in ("1", "true", "yes", "sim"),
+        default=False,
+        help="Imputa apenas as linhas posteriores às marcas d'água da última versão do artefato (padrão: false)"
+    )
+    parser.add_argument(
+        "--context_hours",
+        type=int,
+        default=48,
+        help="Horas anteriores às marcas d'água usadas como contexto na imputação incremental (padrão: 48)"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    go(args)
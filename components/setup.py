@@ -6,12 +6,16 @@ setup(
     description="Utilities for interacting with Weights and Biases and mlflow",
     zip_safe=False,  
     packages=["wandb_utils"],
+    package_dir={"wandb_utils": "get_data/wandb_utils"},
     classifiers=[
         "Programming Language :: Python :: 3",
         "Development Status :: 4 - Beta",
     ],
     install_requires=[
         "mlflow",
-        "wandb"
+        "wandb",
+        "requests",
+        "pandas",
+        "pyarrow"
     ]
 )
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+import argparse
+import os
+import json
+import glob
+import shutil
+import logging
+import wandb
+from wandb_utils.validacao import ErroValidacao, validar
+from wandb_utils.log_artifact import log_artifact
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+REPORT_FILE = "relatorio_validacao.json"
+
+
+def thresholds(args):
+    return {
+        "max_razao_nulos": args.max_null_ratio,
+        "max_razao_invalidos": args.max_invalid_ratio,
+        "max_razao_fora_da_faixa": args.max_out_of_range_ratio,
+        "max_razao_lacunas": args.max_gap_ratio,
+        "max_duplicadas": args.max_duplicates,
+        "permitir_esquema_desconhecido": args.allow_unknown_files,
+    }
+
+
+def go(args):
+    run = wandb.init(job_type="validate_data")
+    run.config.update(vars(args))
+
+    logger.info(f"Baixando artefato {args.input_artifact}")
+    artifact = run.use_artifact(args.input_artifact)
+    artifact_dir = artifact.download(os.path.join(args.local_data_dir, "validate_input"))
+    csv_files = sorted(glob.glob(os.path.join(artifact_dir, "**", "*.csv"), recursive=True))
+    if not csv_files:
+        run.finish()
+        raise ErroValidacao(f"Nenhum arquivo CSV encontrado no artefato {args.input_artifact}.", {"aprovado": False})
+
+    report = validar(
+        csv_files,
+        limites=thresholds(args),
+        tamanho_bloco=args.chunk_size,
+        processos=args.processes,
+        parar_na_primeira_falha=args.fail_fast,
+    )
+    # Caminhos relativos ao artefato, para o relatório não depender do diretório local
+    for file_report in report["arquivos"]:
+        file_report["arquivo"] = os.path.relpath(file_report["arquivo"], artifact_dir)
+    report["violacoes"] = [f"{r['arquivo']}: {v}" for r in report["arquivos"] for v in r["violacoes"]]
+
+    output_dir = os.path.join(args.local_data_dir, args.artifact_name)
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    with open(os.path.join(output_dir, REPORT_FILE), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    run.summary["validacao/aprovado"] = report["aprovado"]
+    run.summary["validacao/violacoes"] = len(report["violacoes"])
+    run.summary["validacao/linhas_por_segundo"] = report["linhas_por_segundo"]
+
+    # O relatório é enviado mesmo em caso de reprovação, para investigar o que falhou
+    logger.info(f"Enviando {args.artifact_name} para o Weights & Biases")
+    log_artifact(
+        args.artifact_name,
+        args.artifact_type,
+        args.artifact_description,
+        output_dir,
+        run,
+        metadados={"aprovado": report["aprovado"], "violacoes": len(report["violacoes"]), "linhas": report["linhas"]},
+    )
+    run.finish()
+    if not report["aprovado"]:
+        raise ErroValidacao(
+            f"Validação de {args.input_artifact} reprovada: {'; '.join(report['violacoes'][:5])}", report
+        )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Valida os CSVs extraídos contra o esquema declarado e envia o relatório para o W&B")
+    parser.add_argument("--input_artifact", type=str, help="Artefato do W&B com os CSVs extraídos")
+    parser.add_argument("--artifact_name", type=str, help="Nome do artefato com o relatório de validação no W&B")
+    parser.add_argument("--artifact_type", type=str, help="Tipo do artefato (ex.: validation_report)")
+    parser.add_argument("--artifact_description", type=str, help="Descrição do artefato")
+    parser.add_argument("--chunk_size", type=int, default=100000, help="Linhas lidas por vez de cada arquivo (padrão: 100000)")
+    parser.add_argument("--processes", type=int, default=1, help="Processos que validam arquivos em paralelo (padrão: 1)")
+    parser.add_argument("--max_null_ratio", type=float, default=0.25, help="Razão máxima de nulos por coluna (padrão: 0.25)")
+    parser.add_argument("--max_invalid_ratio", type=float, default=0.0, help="Razão máxima de valores fora do tipo declarado ou datas inexistentes (padrão: 0)")
+    parser.add_argument("--max_out_of_range_ratio", type=float, default=0.001, help="Razão máxima de valores fora da faixa por coluna (padrão: 0.001)")
+    parser.add_argument("--max_gap_ratio", type=float, default=0.05, help="Razão máxima de horas ausentes por estação (padrão: 0.05)")
+    parser.add_argument("--max_duplicates", type=int, default=0, help="Número máximo de horários duplicados por estação (padrão: 0)")
+    parser.add_argument(
+        "--allow_unknown_files",
+        type=lambda v: str(v).lower() in ("1", "true", "yes", "sim"),
+        default=False,
+        help="Aceita, com aviso, CSVs cujo cabeçalho não corresponde a nenhum esquema conhecido (padrão: false)"
+    )
+    parser.add_argument(
+        "--fail_fast",
+        type=lambda v: str(v).lower() in ("1", "true", "yes", "sim"),
+        default=True,
+        help="Cancela os arquivos restantes assim que um arquivo é reprovado (padrão: true)"
+    )
+    parser.add_argument(
+        "--local_data_dir",
+        type=str,
+        default="data",
+        help="Diretório local para baixar os CSVs e gravar o relatório (padrão: data)"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    go(args)
@@ -1,20 +1,166 @@
 import os
-import wandb
+import sys
+import time
 import tempfile
-import hydra
-import mlflow
 import logging
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
 from dotenv import load_dotenv
+from pipeline.executor import executar_em_processo
+from pipeline.dag import Passo, executar_grafo
+from pipeline.cache import CachePassos, NOME_ARQUIVO_CACHE
+from wandb_utils.importacao import ModuloTardio
+from wandb_utils.instrumentacao import Instrumentacao
+
+# wandb e mlflow só são importados quando usados; o hydra apenas ao rodar como script
+wandb = ModuloTardio("wandb")
+mlflow = ModuloTardio("mlflow")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
 logger = logging.getLogger()
 
-_steps = [
-    "download"
-]
+_root_dir = os.path.dirname(os.path.abspath(__file__))
+_components_dir = os.path.join(_root_dir, "components")
+# Código compartilhado pelos componentes; entra na versão de código de todos os passos
+_wandb_utils_dir = os.path.join(_components_dir, "get_data", "wandb_utils")
+# Declara o grafo de passos (pipeline.steps)
+_config_file = os.path.join(_root_dir, "config.yaml")
+
+
+def _run_component(config, component, parameters):
+    """
+    Executa um componente do pipeline.
+
+    No modo padrão (``main.execution_mode: mlflow``) cada passo roda via ``mlflow.run`` a
+    partir do repositório de componentes. No modo ``in_process`` o ``go(args)`` do componente
+    local é chamado diretamente neste processo, sem novo interpretador nem reimportação de
+    wandb/mlflow; caminhos relativos passam a ser resolvidos a partir do diretório atual.
+    """
+    principal_config = config.get("principal", config["main"])
+    mode = principal_config.get("execution_mode", "mlflow")
+    start = time.perf_counter()
+    if mode == "in_process":
+        executar_em_processo(os.path.join(_components_dir, component), parameters)
+    elif mode == "mlflow":
+        mlflow.run(
+            principal_config.get("repositorio_componentes", config['main']['components_repository']) + "/" + component,
+            "main",
+            parameters=parameters,
+            env_manager="local",
+        )
+    else:
+        raise ValueError(f"Modo de execução desconhecido: {mode}. Use 'mlflow' ou 'in_process'.")
+    logger.info(f"Componente {component} concluído em {time.perf_counter() - start:.2f}s (modo {mode})")
+
+def _pipeline_steps(config):
+    """
+    Monta a lista de passos a partir de ``pipeline.steps``. Cada passo declarado tem
+    ``component``, ``parameters``, ``inputs`` e ``outputs``; as dependências são derivadas
+    dos artefatos de entrada e saída.
+
+    O config.yaml do repositório é a única definição do grafo: se o config recebido não
+    declarar ``pipeline.steps``, os passos vêm dele, com as interpolações (``${etl.sample}``
+    etc.) resolvidas contra o config recebido.
+    """
+    declarados = config.get("pipeline", {}).get("steps")
+    if not declarados:
+        config = OmegaConf.merge(OmegaConf.load(_config_file), config)
+        declarados = config.pipeline.steps
+    declarados = OmegaConf.to_container(declarados, resolve=True)
+    return [
+        Passo(
+            nome=nome,
+            componente=passo.get("component", nome),
+            parametros=passo.get("parameters") or {},
+            entradas=list(passo.get("inputs") or []),
+            saidas=list(passo.get("outputs") or []),
+        )
+        for nome, passo in declarados.items()
+    ]
+
+def _forced_steps(principal_config, passos):
+    """Interpreta ``main.force``: true/false ou uma lista de passos separados por vírgula."""
+    force = principal_config.get("force", False)
+    if isinstance(force, bool):
+        return {passo.nome for passo in passos} if force else set()
+    force = str(force).strip().lower()
+    if force in ("true", "all"):
+        return {passo.nome for passo in passos}
+    if force in ("", "false", "none"):
+        return set()
+    return {nome.strip() for nome in force.split(",")}
+
+
+def _step_cache(config, principal_config):
+    """Cria o cache de passos, se ``main.step_cache`` estiver habilitado."""
+    if not principal_config.get("step_cache", False):
+        return None
+    from wandb_utils.utils import obter_metadados_artefato
+
+    project = os.environ["WANDB_PROJECT"]
+
+    def digest(artifact):
+        # ttl=0: os passos anteriores podem ter acabado de publicar uma nova versão
+        metadados = obter_metadados_artefato(project, artifact, ttl=0)
+        return metadados["digest"] if metadados else None
+
+    path = principal_config.get("step_cache_file", NOME_ARQUIVO_CACHE)
+    return CachePassos(os.path.join(_root_dir, path), digest)
+
+
+def _run_step(config, passo, cache=None, force=False, report=None, instrumentation=None):
+    """
+    Executa um passo, pulando-o quando o cache indica que o resultado anterior é válido.
+    Os motivos de invalidação de cada passo são guardados em ``report``. Com
+    ``instrumentation``, o passo é medido como a fase ``passo:<nome>``; fora do modo
+    ``in_process`` o componente roda em um subprocesso e a fase mede a CPU e a memória dele.
+    """
+    if instrumentation is not None:
+        principal_config = config.get("principal", config["main"])
+        child = principal_config.get("execution_mode", "mlflow") != "in_process"
+        with instrumentation.fase(f"passo:{passo.nome}", processos_filhos=child) as record:
+            record["componente"] = passo.componente
+            _run_step(config, passo, cache, force, report)
+            record["reaproveitado"] = report is not None and report.get(passo.nome) == []
+        return
+    if cache is None:
+        _run_component(config, passo.componente, passo.parametros)
+        return
+    partes = cache.componentes_chave(passo, [os.path.join(_components_dir, passo.componente), _wandb_utils_dir])
+    motivos = ["execução forçada (main.force)"] if force else cache.verificar(passo, partes)
+    if report is not None:
+        report[passo.nome] = motivos
+    if not motivos:
+        logger.info(f"Passo '{passo.nome}' sem alterações (chave {partes['chave'][:12]}). Reaproveitando as saídas registradas.")
+        return
+    logger.info(f"Passo '{passo.nome}' será executado: {'; '.join(motivos)}")
+    _run_component(config, passo.componente, passo.parametros)
+    cache.registrar(passo, partes)
+
+
+def _publish_instrumentation(instrumentation, settings, publish_wandb=True):
+    """
+    Grava o trace local e, se ``main.instrumentation.wandb`` estiver habilitado e
+    ``publish_wandb`` for True, envia as métricas e o perfil (quando houver) para uma execução
+    ``pipeline`` no W&B. Roda no ``finally`` de :func:`go`: uma falha aqui só gera um aviso,
+    para nunca substituir o erro de um passo.
+    """
+    try:
+        trace_dir = os.path.join(_root_dir, settings.get("trace_dir") or "traces")
+        if settings.get("trace_dir"):
+            instrumentation.salvar_trace(trace_dir)
+        profile_files = instrumentation.salvar_perfil(os.path.join(trace_dir, "profile"))
+        if not (publish_wandb and settings.get("wandb", False)):
+            return
+        run = wandb.init(job_type="pipeline")
+        instrumentation.registrar_wandb(run)
+        if profile_files:
+            from wandb_utils.log_artifact import log_artifact
+            log_artifact("perfil_pipeline", "profile", "Profile_of_the_pipeline_run", profile_files, run)
+        run.finish()
+    except Exception as e:
+        logger.warning(f"Falha ao publicar a instrumentação do pipeline: {e}")
+
 
-@hydra.main(config_name="config", config_path=".", version_base="1.1")
 def go(config: DictConfig):
     # Carrega as variáveis do arquivo .env
     load_dotenv()
@@ -22,8 +168,6 @@ def go(config: DictConfig):
     # Configura o experimento wandb. Todas as execuções serão agrupadas sob este nome
     # Tenta usar chaves traduzidas, com fallback para as originais.
     principal_config = config.get("principal", config["main"])
-    etl_config = config.get("etl", config["etl"])
-    paths_config = config.get("paths", {})
 
     os.environ["WANDB_PROJECT"] = principal_config.get("nome_projeto", config["main"]["project_name"])
     os.environ["WANDB_RUN_GROUP"] = principal_config.get("nome_experimento", config["main"]["experiment_name"])
@@ -35,37 +179,53 @@ def go(config: DictConfig):
     else:
         logging.info("Falha ao realizar login no Weights & Biases.")
 
+    passos = _pipeline_steps(config)
+    max_workers = int(config.get("pipeline", {}).get("max_workers", 1))
+    if principal_config.get("execution_mode", "mlflow") == "in_process" and max_workers > 1:
+        # wandb.init não pode ser chamado por várias threads do mesmo processo
+        logger.warning("Modo in_process executa um passo por vez; ignorando pipeline.max_workers.")
+        max_workers = 1
+
     # Passos a executar
     steps_par = principal_config.get("passos", config["main"]["steps"])
-    active_steps = steps_par.split(",") if steps_par != "all" else _steps
+    active_steps = steps_par.split(",") if steps_par != "all" else [passo.nome for passo in passos]
+
+    # Cache de resultados por passo; "--force" ou main.force=<passos> ignora o cache
+    cache = _step_cache(config, principal_config)
+    forced = _forced_steps(principal_config, passos)
+    report = {}
+
+    # Métricas por passo (tempo, CPU, I/O, rede, memória) e profiler opcional
+    instrumentation_settings = principal_config.get("instrumentation", {})
+    instrumentation = Instrumentacao("pipeline", perfil=instrumentation_settings.get("profile") or None).iniciar()
 
     # Move para um diretório temporário
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        if "download" in active_steps:
-            # Parâmetros para o componente get_data
-            # Tenta obter de chaves novas/traduzidas, com fallback para os valores antigos ou hardcoded.
-            sample_url = etl_config.get("url_amostra", config["etl"]["sample"])
-            # O artifact_name aqui é o que o main.py espera que o get_data produza.
-            expected_artifact_name = etl_config.get("nome_artefato_gerado_pelo_get_data", "AirQuality.csv")
-            expected_artifact_type = etl_config.get("tipo_artefato_gerado_pelo_get_data", "raw_data")
-            # A descrição do artefato que get_data irá criar.
-            artifact_description_for_get_data = etl_config.get("descricao_artefato_gerado_pelo_get_data", config["etl"]["artifact_description"])
-            # Diretório local que get_data deve usar.
-            local_data_dir_for_get_data = paths_config.get("diretorio_dados_local", "data")
-
-            # Baixa o arquivo
-            _ = mlflow.run(
-                principal_config.get("repositorio_componentes", config['main']['components_repository']) + "/get_data",
-                "main",
-                parameters={
-                    "sample": sample_url,
-                    "artifact_name": expected_artifact_name, # Este é o nome do artefato que get_data irá criar
-                    "artifact_type": expected_artifact_type,
-                    "artifact_description": artifact_description_for_get_data,
-                    "local_data_dir": local_data_dir_for_get_data # Novo parâmetro
-                },
-                env_manager="local",
+    succeeded = False
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            status = executar_grafo(
+                passos,
+                lambda passo: _run_step(config, passo, cache, passo.nome in forced, report, instrumentation),
+                max_workers=max_workers,
+                selecionados=active_steps,
             )
+            logger.info(f"Pipeline concluído: {status}")
+        succeeded = True
+    finally:
+        instrumentation.finalizar()
+        # Se um passo falhou, só o trace local é gravado: nada de abrir uma execução no W&B
+        _publish_instrumentation(instrumentation, instrumentation_settings, publish_wandb=succeeded)
+    if cache is not None:
+        reused = sorted(nome for nome, motivos in report.items() if not motivos)
+        logger.info(f"Passos reaproveitados do cache: {reused}")
+        for nome, motivos in sorted(report.items()):
+            if motivos:
+                logger.info(f"Passo '{nome}' invalidado: {'; '.join(motivos)}")
 
 if __name__ == "__main__":
-    go()
\ No newline at end of file
+    # "--force" reexecuta todos os passos ignorando o cache (equivale a main.force=true)
+    if "--force" in sys.argv:
+        sys.argv.remove("--force")
+        sys.argv.append("main.force=true")
+    import hydra
+    hydra.main(config_name="config", config_path=".", version_base="1.1")(go)()
\ No newline at end of file
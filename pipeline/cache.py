@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+NOME_ARQUIVO_CACHE = ".pipeline_cache.json"
+_IGNORADOS = {"__pycache__", ".pytest_cache", ".mypy_cache"}
+
+
+def versao_codigo(*diretorios):
+    """
+    Hash do código dos diretórios: caminhos relativos e conteúdo de cada arquivo, em ordem.
+    ``__pycache__`` e arquivos ``.pyc`` são ignorados.
+    """
+    h = hashlib.sha256()
+    for diretorio in diretorios:
+        for raiz, subdiretorios, arquivos in os.walk(diretorio):
+            subdiretorios[:] = sorted(d for d in subdiretorios if d not in _IGNORADOS and not d.endswith(".egg-info"))
+            for nome in sorted(arquivos):
+                if nome.endswith((".pyc", ".pyo")):
+                    continue
+                caminho = os.path.join(raiz, nome)
+                h.update(os.path.relpath(caminho, diretorio).replace(os.sep, "/").encode("utf-8"))
+                with open(caminho, "rb") as f:
+                    h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+def _hash_parametros(parametros):
+    texto = json.dumps({k: str(v) for k, v in parametros.items()}, sort_keys=True)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def _com_versao(artefato):
+    return artefato if ":" in str(artefato) else f"{artefato}:latest"
+
+
+class CachePassos:
+    """
+    Cache de resultados dos passos do pipeline.
+
+    A chave de um passo combina o hash dos seus parâmetros, a versão do código do componente
+    e os digests dos artefatos de entrada. Quando a chave coincide com a da última execução
+    bem-sucedida e os artefatos de saída registrados ainda estão no W&B com o mesmo digest,
+    o passo pode ser pulado. Passos sem artefatos de entrada (ex.: o download, que lê uma
+    fonte externa) nunca são pulados: nada na chave mudaria quando a fonte muda.
+
+    Parâmetros
+    ----------
+    caminho : str
+        Arquivo JSON onde as execuções bem-sucedidas são registradas.
+    consultar_digest : callable
+        Função ``consultar_digest(nome_artefato)`` que retorna o digest atual de um artefato
+        (ex.: ``"dados:latest"``) ou None se ele não existir.
+    """
+
+    def __init__(self, caminho, consultar_digest):
+        self.caminho = caminho
+        self.consultar_digest = consultar_digest
+        self._trava = threading.Lock()
+        self.registros = self._carregar()
+
+    def _carregar(self):
+        if not os.path.exists(self.caminho):
+            return {}
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache de passos '{self.caminho}' ilegível ({e}). Recomeçando com cache vazio.")
+            return {}
+
+    def _salvar(self):
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.registros, f, indent=2, sort_keys=True)
+        os.replace(temporario, self.caminho)
+
+    def componentes_chave(self, passo, diretorios_codigo):
+        """
+        Calcula as partes da chave do passo.
+
+        Retorna
+        -------
+        dict
+            ``{"chave", "parametros", "codigo", "entradas": {artefato: digest}}``.
+        """
+        partes = {
+            "parametros": _hash_parametros(passo.parametros),
+            "codigo": versao_codigo(*diretorios_codigo),
+            "entradas": {e: self.consultar_digest(_com_versao(e)) for e in passo.entradas},
+        }
+        partes["chave"] = hashlib.sha256(json.dumps(partes, sort_keys=True).encode("utf-8")).hexdigest()
+        return partes
+
+    def verificar(self, passo, partes):
+        """
+        Compara as partes da chave com a última execução registrada do passo.
+
+        Retorna
+        -------
+        list
+            Motivos de invalidação. Lista vazia significa que o resultado anterior pode ser
+            reaproveitado.
+        """
+        if not passo.entradas:
+            return ["sem artefatos de entrada (fonte externa)"]
+        faltando = sorted(e for e, digest in partes["entradas"].items() if digest is None)
+        if faltando:
+            return [f"entradas sem digest no W&B: {faltando}"]
+        with self._trava:
+            registro = self.registros.get(passo.nome)
+        if registro is None:
+            return ["sem execução anterior registrada"]
+        if registro["chave"] == partes["chave"]:
+            motivos = []
+        else:
+            motivos = [campo for campo in ("parametros", "codigo") if registro.get(campo) != partes[campo]]
+            motivos = [f"{campo} alterado" for campo in motivos]
+            anteriores = registro.get("entradas", {})
+            for entrada, digest in partes["entradas"].items():
+                if anteriores.get(entrada) != digest:
+                    motivos.append(f"entrada '{entrada}' alterada ({anteriores.get(entrada)} -> {digest})")
+            motivos = motivos or ["chave alterada"]
+        for saida, digest in registro.get("saidas", {}).items():
+            atual = self.consultar_digest(_com_versao(saida))
+            if atual != digest:
+                motivos.append(f"saída '{saida}' alterada ou ausente ({digest} -> {atual})")
+        return motivos
+
+    def registrar(self, passo, partes):
+        """Registra uma execução bem-sucedida com os digests atuais das saídas."""
+        if not passo.entradas:
+            return
+        saidas = {s: self.consultar_digest(_com_versao(s)) for s in passo.saidas}
+        if any(digest is None for digest in partes["entradas"].values()) or any(d is None for d in saidas.values()):
+            logger.info(f"Passo '{passo.nome}' não registrado no cache: artefatos sem digest no W&B.")
+            return
+        with self._trava:
+            self.registros[passo.nome] = {**partes, "saidas": saidas, "registrado_em": time.time()}
+            self._salvar()
+
+    def invalidar(self, nome=None):
+        """Remove o registro de um passo, ou de todos se ``nome`` for None."""
+        with self._trava:
+            if nome is None:
+                self.registros.clear()
+            else:
+                self.registros.pop(nome, None)
+            self._salvar()
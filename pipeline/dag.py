@@ -0,0 +1,152 @@
+import time
+import logging
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+FALHOU = "falhou"
+CANCELADO = "cancelado"
+IGNORADO = "ignorado"
+
+
+@dataclass
+class Passo:
+    """Um passo do pipeline: o componente executado, seus parâmetros e os artefatos que lê e produz."""
+    nome: str
+    componente: str
+    parametros: dict = field(default_factory=dict)
+    entradas: list = field(default_factory=list)
+    saidas: list = field(default_factory=list)
+
+
+class ErroPipeline(RuntimeError):
+    """Um ou mais passos falharam. ``status`` traz o resultado de cada passo."""
+
+    def __init__(self, mensagem, status):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _sem_versao(artefato):
+    # "dados:latest" e "dados:v3" dependem de quem produz "dados"
+    return str(artefato).split(":", 1)[0]
+
+
+def montar_dependencias(passos):
+    """
+    Deriva as dependências entre passos a partir de entradas e saídas.
+
+    Um passo depende de outro quando consome (em ``entradas``) um artefato que o outro produz
+    (em ``saidas``). Entradas que nenhum passo produz são consideradas externas.
+
+    Retorna
+    -------
+    dict
+        ``{nome_do_passo: set(nomes_dos_passos_dos_quais_depende)}``.
+
+    Levanta
+    -------
+    ValueError
+        Se dois passos produzirem o mesmo artefato ou se houver um ciclo.
+    """
+    produtores = {}
+    for passo in passos:
+        for saida in passo.saidas:
+            chave = _sem_versao(saida)
+            if chave in produtores:
+                raise ValueError(f"Artefato '{chave}' produzido por '{produtores[chave]}' e '{passo.nome}'.")
+            produtores[chave] = passo.nome
+    dependencias = {
+        passo.nome: {produtores[_sem_versao(e)] for e in passo.entradas if _sem_versao(e) in produtores} - {passo.nome}
+        for passo in passos
+    }
+
+    # Detecção de ciclos por ordenação topológica (Kahn)
+    pendentes = {nome: set(deps) for nome, deps in dependencias.items()}
+    while pendentes:
+        prontos = [nome for nome, deps in pendentes.items() if not deps]
+        if not prontos:
+            raise ValueError(f"Ciclo entre os passos: {sorted(pendentes)}")
+        for nome in prontos:
+            del pendentes[nome]
+        for deps in pendentes.values():
+            deps.difference_update(prontos)
+    return dependencias
+
+
+def executar_grafo(passos, executar, max_workers=1, selecionados=None):
+    """
+    Executa os passos respeitando as dependências, em paralelo quando são independentes.
+
+    Passos fora de ``selecionados`` não são executados e não bloqueiam os que dependem
+    deles (seus artefatos são considerados já existentes). Quando um passo falha, nenhum
+    passo novo é iniciado; os que já estão em execução terminam e os demais são cancelados.
+
+    Parâmetros
+    ----------
+    passos : list
+        Lista de :class:`Passo`.
+    executar : callable
+        Função chamada como ``executar(passo)`` para rodar um passo.
+    max_workers : int, opcional
+        Número máximo de passos simultâneos.
+    selecionados : iterable, opcional
+        Nomes dos passos a executar. Se None, executa todos.
+
+    Retorna
+    -------
+    dict
+        ``{nome_do_passo: status}``, com status ``"ok"`` ou ``"ignorado"``.
+
+    Levanta
+    -------
+    ErroPipeline
+        Se algum passo falhar.
+    """
+    dependencias = montar_dependencias(passos)
+    por_nome = {passo.nome: passo for passo in passos}
+    selecionados = set(por_nome) if selecionados is None else set(selecionados) & set(por_nome)
+    status = {nome: IGNORADO for nome in por_nome if nome not in selecionados}
+    restantes = {nome: dependencias[nome] & selecionados for nome in por_nome if nome in selecionados}
+    erros = {}
+
+    def rodar(passo):
+        inicio = time.perf_counter()
+        logger.info(f"Iniciando passo '{passo.nome}' ({passo.componente})")
+        executar(passo)
+        logger.info(f"Passo '{passo.nome}' concluído em {time.perf_counter() - inicio:.2f}s")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="passo") as executor:
+        em_execucao = {}
+        while restantes or em_execucao:
+            if not erros:
+                prontos = [nome for nome, deps in restantes.items() if not deps]
+                for nome in sorted(prontos):
+                    del restantes[nome]
+                    em_execucao[executor.submit(rodar, por_nome[nome])] = nome
+            if not em_execucao:
+                break
+            concluidos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                nome = em_execucao.pop(futuro)
+                erro = futuro.exception()
+                if erro is None:
+                    status[nome] = OK
+                    for deps in restantes.values():
+                        deps.discard(nome)
+                else:
+                    status[nome] = FALHOU
+                    erros[nome] = erro
+                    logger.error(f"Passo '{nome}' falhou: {erro}")
+
+    for nome in restantes:
+        status[nome] = CANCELADO
+    if erros:
+        cancelados = sorted(n for n, s in status.items() if s == CANCELADO)
+        raise ErroPipeline(
+            f"Passos com falha: {sorted(erros)}. Cancelados: {cancelados}.", status
+        ) from next(iter(erros.values()))
+    return status
@@ -0,0 +1,95 @@
+import os
+import time
+import shlex
+import logging
+import threading
+import importlib.util
+import yaml
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+logger = logging.getLogger(__name__)
+
+# Módulos run.py já importados, por caminho. Mantê-los carregados é o que torna os passos
+# seguintes "quentes": wandb, mlflow e pandas já estão em sys.modules.
+_modulos_componentes = {}
+_trava_modulos = threading.Lock()
+
+
+def _ler_mlproject(diretorio_componente, entry_point="main"):
+    with open(os.path.join(diretorio_componente, "MLproject"), "r", encoding="utf-8") as f:
+        projeto = yaml.safe_load(f)
+    return projeto["entry_points"][entry_point]
+
+
+def montar_argv(diretorio_componente, parametros, entry_point="main"):
+    """
+    Monta a linha de argumentos do componente exatamente como o ``mlflow.run`` faria.
+
+    O comando do MLproject é formatado com os parâmetros (completados pelos valores padrão
+    declarados) e o prefixo ``python run.py`` é removido.
+
+    Retorna
+    -------
+    list
+        Argumentos para o ``argparse`` do componente.
+    """
+    entrada = _ler_mlproject(diretorio_componente, entry_point)
+    valores = {
+        nome: spec.get("default")
+        for nome, spec in (entrada.get("parameters") or {}).items()
+        if isinstance(spec, dict) and "default" in spec
+    }
+    valores.update(parametros)
+    faltando = [nome for nome in entrada.get("parameters") or {} if valores.get(nome) is None]
+    if faltando:
+        raise ValueError(f"Parâmetros obrigatórios sem valor para {diretorio_componente}: {faltando}")
+    comando = entrada["command"].format(**{k: shlex.quote(str(v)) for k, v in valores.items()})
+    argv = shlex.split(comando)
+    if len(argv) < 2 or argv[0] != "python":
+        raise ValueError(f"Comando do MLproject não suportado em processo: {entrada['command']}")
+    return argv[2:]
+
+
+def carregar_componente(diretorio_componente):
+    """Importa (uma única vez) o ``run.py`` do componente e retorna o módulo."""
+    caminho = os.path.abspath(os.path.join(diretorio_componente, "run.py"))
+    with _trava_modulos:
+        modulo = _modulos_componentes.get(caminho)
+        if modulo is None:
+            inicio = time.perf_counter()
+            nome = f"componente_{os.path.basename(os.path.dirname(caminho))}"
+            spec = importlib.util.spec_from_file_location(nome, caminho)
+            modulo = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(modulo)
+            _modulos_componentes[caminho] = modulo
+            logger.info(f"Componente {nome} importado em {time.perf_counter() - inicio:.2f}s")
+    return modulo
+
+
+def executar_em_processo(diretorio_componente, parametros, entry_point="main"):
+    """
+    Executa um componente chamando o seu ``go(args)`` no processo atual.
+
+    Evita, a cada passo, a resolução do repositório de componentes, o novo interpretador e a
+    reimportação de wandb/mlflow feitos pelo ``mlflow.run``. Os argumentos passam pelo mesmo
+    ``build_parser()`` usado na linha de comando, portanto tipos e valores padrão são idênticos.
+
+    Parâmetros
+    ----------
+    diretorio_componente : str
+        Diretório local do componente (com ``MLproject`` e ``run.py``).
+    parametros : dict
+        Os mesmos parâmetros passados ao ``mlflow.run``.
+    entry_point : str, opcional
+        Entry point do MLproject.
+
+    Retorna
+    -------
+    float
+        Duração do passo, em segundos.
+    """
+    inicio = time.perf_counter()
+    modulo = carregar_componente(diretorio_componente)
+    args = modulo.build_parser().parse_args(montar_argv(diretorio_componente, parametros, entry_point))
+    modulo.go(args)
+    return time.perf_counter() - inicio
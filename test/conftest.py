@@ -0,0 +1,65 @@
+import os
+import types
+import pytest
+
+
+class DummyWandbRun:
+    """
+    Execução falsa do W&B usada pelos testes dos componentes. ``use_artifact`` devolve um
+    artefato cujo ``download`` aponta para ``artifact_dir``, exceto os nomes presentes em
+    ``previous`` (ex.: ``{"aqi:latest": artefato}``), que são devolvidos como estão.
+    """
+    def __init__(self, artifact_dir=None, previous=None):
+        self.artifact_dir = artifact_dir
+        self.previous = previous or {}
+        self.logged_artifacts = []
+        self.config = types.SimpleNamespace(update=lambda d: None)
+        self.summary = {}
+        self.finished = False
+    def use_artifact(self, name):
+        if name in self.previous:
+            return self.previous[name]
+        return types.SimpleNamespace(download=lambda root=None: self.artifact_dir)
+    def log_artifact(self, artifact):
+        self.logged_artifacts.append(artifact)
+    def finish(self):
+        self.finished = True
+
+
+class StrictArtifact:
+    """
+    Artefato falso que, como o cliente do W&B, recusa adicionar o mesmo caminho duas vezes,
+    inclusive os herdados da versão anterior por ``new_draft``.
+    """
+    def __init__(self, metadata=None, paths=()):
+        self.metadata = dict(metadata or {})
+        self.paths = set(paths)
+        self.description = None
+    def new_draft(self):
+        return StrictArtifact(self.metadata, self.paths)
+    def add_file(self, local_path, name=None):
+        name = name or os.path.basename(local_path)
+        if name in self.paths:
+            raise ValueError(f"Cannot add the same path twice: '{name}'")
+        self.paths.add(name)
+    def remove(self, name):
+        if name not in self.paths:
+            raise FileNotFoundError(f"No such file or directory: {name}")
+        self.paths.remove(name)
+    def add_dir(self, local_path):
+        for root, _, names in os.walk(local_path):
+            for file_name in names:
+                path = os.path.join(root, file_name)
+                self.add_file(path, name=os.path.relpath(path, local_path).replace(os.sep, "/"))
+
+
+@pytest.fixture
+def make_wandb_run():
+    """Fábrica de :class:`DummyWandbRun`."""
+    return DummyWandbRun
+
+
+@pytest.fixture
+def make_artifact():
+    """Fábrica de :class:`StrictArtifact`."""
+    return StrictArtifact
@@ -0,0 +1,44 @@
+import os
+import types
+import numpy as np
+import pandas as pd
+
+import components.aggregate.run as run
+from components.get_data.wandb_utils.agregacao import COLUNAS_AGREGADAS
+from components.get_data.wandb_utils.prsa import gravar_parquet_prsa
+
+def make_parquet(path):
+    n = 48
+    idx = pd.date_range("2013-03-01", periods=n, freq="h")
+    df = pd.DataFrame({
+        "year": idx.year.astype("int16"), "month": idx.month.astype("int8"),
+        "day": idx.day.astype("int8"), "hour": idx.hour.astype("int8"),
+        **{column: np.ones(n, dtype="float32") for column in COLUNAS_AGREGADAS},
+        "wd": pd.Categorical(["N"] * n), "station": pd.Categorical(["Dongsi"] * n),
+    })
+    df["PM2.5"] = np.arange(n, dtype="float32")
+    df.loc[[3, 4], "PM2.5"] = np.nan
+    gravar_parquet_prsa(df, str(path))
+
+def test_go_writes_aggregates_and_logs_artifact(tmp_path, monkeypatch, make_wandb_run):
+    make_parquet(tmp_path / "in")
+    dummy_run = make_wandb_run(str(tmp_path / "in"))
+    logged = []
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: dummy_run)
+    monkeypatch.setattr(run, "log_artifact", lambda name, type, desc, path, wandb_run, **kw: logged.append((path, kw)))
+    args = types.SimpleNamespace(input_artifact="air_quality_parquet:latest", artifact_name="aggregates",
+                                 artifact_type="aggregates", artifact_description="desc", chunk_size=10,
+                                 processes=1, quantiles="0.5", relative_accuracy=0.01,
+                                 local_data_dir=str(tmp_path / "data"))
+    run.go(args)
+    output_dir = os.path.join(args.local_data_dir, "aggregates")
+    assert logged[0][0] == output_dir
+    assert logged[0][1]["metadados"]["estacoes"] == ["Dongsi"]
+    assert sorted(os.listdir(output_dir)) == ["correlacao.csv", "covariancia.csv", "resumo.csv",
+                                              "rollup_dia.parquet", "rollup_hora.parquet", "rollup_mes.parquet"]
+    summary = pd.read_csv(os.path.join(output_dir, "resumo.csv"), index_col=[0, 1])
+    assert summary.loc[("Dongsi", "PM2.5"), "missing"] == 2
+    assert summary.loc[("Dongsi", "PM2.5"), "count"] == 46
+    assert dummy_run.summary["agregacao/PM2.5/faltantes"] == 2
+    daily = pd.read_parquet(os.path.join(output_dir, "rollup_dia.parquet"))
+    assert len(daily[daily["station"] == "Dongsi"]) == 2
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.get_data.wandb_utils.agregacao import GLOBAL, Agregado, agregar
+from components.get_data.wandb_utils.prsa import gravar_parquet_prsa
+
+COLUMNS = ["PM2.5", "TEMP"]
+
+@pytest.fixture
+def prsa_df():
+    rng = np.random.default_rng(0)
+    frames = []
+    for station, offset in [("Aotizhongxin", 0.0), ("Changping", 50.0)]:
+        idx = pd.date_range("2013-03-01", periods=24 * 40, freq="h")
+        frames.append(pd.DataFrame({
+            "year": idx.year.astype("int16"), "month": idx.month.astype("int8"),
+            "day": idx.day.astype("int8"), "hour": idx.hour.astype("int8"),
+            "PM2.5": rng.gamma(2.0, 40.0, len(idx)) + offset,
+            "TEMP": rng.normal(10.0, 8.0, len(idx)),
+            "wd": pd.Categorical(["N"] * len(idx)),
+            "station": station,
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    df["station"] = df["station"].astype("category")
+    df.loc[rng.choice(len(df), 100, replace=False), "PM2.5"] = np.nan
+    df.loc[rng.choice(len(df), 30, replace=False), "TEMP"] = np.nan
+    return df
+
+def test_summary_matches_pandas(prsa_df):
+    aggregate = Agregado(COLUMNS).atualizar(prsa_df)
+    summary = aggregate.resumo(quantis=(0.5, 0.95))
+    expected = prsa_df[COLUMNS].describe(percentiles=[0.5, 0.95]).T
+    glob = summary.loc[GLOBAL]
+    np.testing.assert_allclose(glob["count"], expected["count"])
+    np.testing.assert_allclose(glob["mean"], expected["mean"])
+    np.testing.assert_allclose(glob["std"], expected["std"])
+    np.testing.assert_allclose(glob["min"], expected["min"])
+    np.testing.assert_allclose(glob["max"], expected["max"])
+    # Quantis aproximados com erro relativo de até 1%
+    np.testing.assert_allclose(glob["50%"], expected["50%"], rtol=0.02)
+    np.testing.assert_allclose(glob["95%"], expected["95%"], rtol=0.02)
+    assert list(glob["missing"]) == list(prsa_df[COLUMNS].isna().sum())
+    station = prsa_df[prsa_df["station"] == "Changping"]
+    assert summary.loc[("Changping", "PM2.5"), "mean"] == pytest.approx(station["PM2.5"].mean())
+    pd.testing.assert_frame_equal(aggregate.correlacao(), prsa_df[COLUMNS].corr(), check_names=False)
+
+def test_merge_of_chunks_equals_single_pass(prsa_df):
+    whole = Agregado(COLUMNS).atualizar(prsa_df)
+    merged = Agregado(COLUMNS)
+    for start in range(0, len(prsa_df), 333):
+        merged.mesclar(Agregado(COLUMNS).atualizar(prsa_df.iloc[start:start + 333]))
+    pd.testing.assert_frame_equal(merged.resumo(), whole.resumo(), rtol=1e-9)
+    pd.testing.assert_frame_equal(merged.rollup("dia"), whole.rollup("dia"), rtol=1e-9)
+
+def test_rollups_are_means_by_station_and_key(prsa_df):
+    aggregate = Agregado(COLUMNS).atualizar(prsa_df)
+    hourly = aggregate.rollup("hora")
+    expected = prsa_df.groupby(["station", "hour"], observed=True)["PM2.5"].mean()
+    assert hourly.loc[("Aotizhongxin", 5), "PM2.5"] == pytest.approx(expected[("Aotizhongxin", 5)])
+    assert hourly.loc[(GLOBAL, 5), "PM2.5"] == pytest.approx(prsa_df.loc[prsa_df["hour"] == 5, "PM2.5"].mean())
+    monthly = aggregate.rollup("mes")
+    assert len(monthly.loc[GLOBAL]) == 2
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_agregar_streams_partitioned_parquet(prsa_df, tmp_path, processes):
+    gravar_parquet_prsa(prsa_df, str(tmp_path / "parquet"))
+    aggregate = agregar(str(tmp_path / "parquet"), COLUMNS, tamanho_bloco=100, processos=processes)
+    assert set(aggregate.estacoes) == {"Aotizhongxin", "Changping"}
+    expected = Agregado(COLUMNS).atualizar(prsa_df).resumo()
+    pd.testing.assert_frame_equal(aggregate.resumo(), expected, rtol=1e-6)
+
+def test_agregar_reads_prsa_csv_in_chunks(prsa_df, tmp_path):
+    path = tmp_path / "PRSA_Data_Aotizhongxin.csv"
+    prsa_df[prsa_df["station"] == "Aotizhongxin"].to_csv(path, index=False)
+    aggregate = agregar(str(path), COLUMNS, tamanho_bloco=50)
+    assert aggregate.estacoes["Aotizhongxin"].linhas == 24 * 40
@@ -0,0 +1,135 @@
+import os
+import json
+import types
+import numpy as np
+import pandas as pd
+import pytest
+
+import components.aqi.run as run
+from components.get_data.wandb_utils.aqi import (
+    INDICADORES, POLUENTES_AQI, CalculadoraAQI, ler_particoes, medias_moveis, subindice,
+)
+from components.get_data.wandb_utils.prsa import gravar_parquet_prsa
+
+
+def make_df(n, station="Dongsi", start="2013-03-01", seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(start, periods=n, freq="h", name="datetime")
+    df = pd.DataFrame({c: rng.gamma(2.0, 40.0, n).astype("float32") for c in POLUENTES_AQI}, index=idx)
+    df["CO"] *= 20
+    df["station"] = station
+    return df
+
+
+def test_subindice_interpolates_between_breakpoints():
+    pontos = INDICADORES["PM2.5_24h"][2]
+    result = subindice([0, 35, 55, 75, 500, 900, -1, np.nan], pontos)
+    np.testing.assert_array_equal(result[:6], [0, 50, 75, 100, 500, 500])
+    assert np.isnan(result[6:]).all()
+    # Acima de 800 µg/m³ a média de 8h do O3 não tem índice
+    assert np.isnan(subindice([801], INDICADORES["O3_8h"][2])[0])
+
+
+def test_medias_moveis_require_minimum_valid_hours():
+    grade = np.arange(30, dtype="float64")
+    grade[5] = np.nan
+    medias = medias_moveis(grade, 8, 6)
+    assert np.isnan(medias[4])
+    assert medias[7] == pytest.approx(np.mean([0, 1, 2, 3, 4, 6, 7]))
+    assert medias[20] == pytest.approx(np.mean(np.arange(13, 21)))
+
+
+def test_streaming_blocks_match_single_pass():
+    df = pd.concat([make_df(500), make_df(400, station="Tiantan", seed=1)])
+    df = df.drop(df.index[[50, 51, 52, 300]])
+    full = CalculadoraAQI(limiar=80)
+    expected = full.processar(df)
+
+    streaming = CalculadoraAQI(limiar=80)
+    parts = []
+    for start in range(0, len(df), 97):
+        streaming = CalculadoraAQI.de_estado(json.loads(json.dumps(streaming.estado())))
+        parts.append(streaming.processar(df.iloc[start:start + 97]))
+    result = pd.concat(parts).astype({"station": str}).sort_values(["station", "datetime"])
+    expected = expected.astype({"station": str}).sort_values(["station", "datetime"])
+    pd.testing.assert_frame_equal(result, expected)
+    pd.testing.assert_frame_equal(streaming.resumo_episodios(), full.resumo_episodios())
+
+
+def test_episodes_continue_across_blocks():
+    df = make_df(60)
+    df[POLUENTES_AQI] = 0.0
+    df.iloc[10:15, df.columns.get_loc("O3")] = 500.0
+    df.iloc[30:40, df.columns.get_loc("O3")] = 500.0
+    calculadora = CalculadoraAQI()
+    calculadora.processar(df.iloc[:35])
+    result = calculadora.processar(df.iloc[30:])
+    # Horas já processadas não são repetidas
+    assert result.index[0] == df.index[35]
+    episodes = calculadora.resumo_episodios().loc[("Dongsi", "O3_1h")]
+    assert episodes["episodios"] == 2
+    assert episodes["horas_excedidas"] == 15
+    assert episodes["maior_episodio_horas"] == 10
+    assert episodes["em_andamento_horas"] == 0
+    # O3: 500 µg/m³ na hora (IAQI 225) e 437,5 µg/m³ na média de 8h (IAQI 233)
+    assert result.loc[df.index[36], "IAQI_O3_1h"] == 225
+    assert result.loc[df.index[36], "AQI"] == 233
+    assert result.loc[df.index[36], "nivel"] == 5
+    assert result.loc[df.index[36], "poluente_principal"] == "O3"
+
+
+def test_ler_particoes_skips_years_before_watermark(tmp_path):
+    df = make_df(24 * 400, start="2013-12-01")
+    for column, value in (("year", df.index.year), ("month", df.index.month), ("day", df.index.day), ("hour", df.index.hour)):
+        df[column] = value
+    gravar_parquet_prsa(df.reset_index(drop=True), str(tmp_path / "in"))
+    blocks = list(ler_particoes(str(tmp_path / "in")))
+    assert [b.index.year[0] for b in blocks] == [2013, 2014, 2015]
+    assert sum(len(b) for b in blocks) == len(df)
+    blocks = list(ler_particoes(str(tmp_path / "in"), {"Dongsi": "2014-06-01T00:00:00"}))
+    assert [b.index.year[0] for b in blocks] == [2014, 2015]
+
+
+def write_input(df, path):
+    df = df.copy()
+    df["year"] = df.index.year.astype("int16")
+    df["month"] = df.index.month.astype("int8")
+    df["day"] = df.index.day.astype("int8")
+    df["hour"] = df.index.hour.astype("int8")
+    gravar_parquet_prsa(df.reset_index(drop=True), str(path))
+
+
+def test_go_writes_aqi_and_resumes_incrementally(tmp_path, monkeypatch, make_wandb_run, make_artifact):
+    df = make_df(72)
+    write_input(df.iloc[:48], tmp_path / "in")
+    logged = []
+    log_artifact = run.log_artifact
+    monkeypatch.setattr(run, "log_artifact", lambda name, type, desc, path, wandb_run, **kw: logged.append((path, kw)))
+    args = types.SimpleNamespace(input_artifact="air_quality_parquet:latest", artifact_name="aqi", artifact_type="aqi",
+                                 artifact_description="desc", threshold=100.0, incremental=True,
+                                 local_data_dir=str(tmp_path / "data"))
+    first_run = make_wandb_run(str(tmp_path / "in"), previous={"aqi:latest": types.SimpleNamespace(metadata={})})
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: first_run)
+    run.go(args)
+    output_dir = os.path.join(args.local_data_dir, "aqi")
+    assert logged[0][0] == output_dir
+    assert logged[0][1]["artefato_base"] is None
+    assert len(pd.read_parquet(output_dir)) == 48
+    assert os.path.exists(os.path.join(output_dir, run.EPISODES_FILE))
+    assert first_run.summary["aqi/linhas_adicionadas"] == 48
+
+    # A segunda versão passa pelo log_artifact real, sobre um rascunho que recusa caminhos repetidos
+    previous = make_artifact(metadata=logged[0][1]["metadados"])
+    previous.add_dir(output_dir)
+    write_input(df, tmp_path / "in")
+    second_run = make_wandb_run(str(tmp_path / "in"), previous={"aqi:latest": previous})
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: second_run)
+    monkeypatch.setattr(run, "log_artifact", log_artifact)
+    run.go(args)
+    draft = second_run.logged_artifacts[0]
+    assert draft.paths == previous.paths | {f"station=Dongsi/year={df.index[48].year}/parte-{df.index[48]:%Y%m%d%H}-0.parquet"}
+    assert second_run.summary["aqi/linhas_adicionadas"] == 24
+    new_rows = pd.read_parquet(output_dir)
+    expected = CalculadoraAQI().processar(df).iloc[48:]
+    np.testing.assert_allclose(np.sort(new_rows["AQI"].to_numpy()), np.sort(expected["AQI"].to_numpy()))
+    assert draft.metadata["marcas_d_agua"] == {"Dongsi": df.index[-1].isoformat()}
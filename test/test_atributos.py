@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.get_data.wandb_utils.atributos import gerar_atributos, nomes_atributos
+from components.get_data.wandb_utils.prsa import DIRECOES_VENTO
+
+@pytest.fixture
+def stations_df():
+    rng = np.random.default_rng(0)
+    frames = []
+    for station in ["Aotizhongxin", "Changping"]:
+        idx = pd.date_range("2013-03-01", periods=24 * 10, freq="h")
+        df = pd.DataFrame({
+            "PM2.5": rng.gamma(2.0, 40.0, len(idx)).astype("float32"),
+            "TEMP": rng.normal(10.0, 5.0, len(idx)).astype("float32"),
+            "wd": pd.Categorical(rng.choice(DIRECOES_VENTO, len(idx)), categories=DIRECOES_VENTO),
+            "station": station,
+        }, index=idx)
+        # Horas faltando no meio da série
+        frames.append(df.drop(idx[30:35]))
+    df = pd.concat(frames)
+    df["station"] = df["station"].astype("category")
+    df.iloc[[10, 50], 0] = np.nan
+    return df
+
+def test_lags_and_windows_are_in_hours_not_rows(stations_df):
+    result, metrics = gerar_atributos(stations_df, colunas=["PM2.5", "TEMP"], lags=(1, 24), janelas=(6,),
+                                      spans_ewm=(12,), quantis=(0.5, 0.9))
+    assert result.index.equals(stations_df.index)
+    assert metrics["atributos"] == len(nomes_atributos(["PM2.5", "TEMP"], (1, 24), (6,), (12,), (0.5, 0.9)))
+    assert all(result[c].dtype == np.float32 for c in nomes_atributos(["PM2.5"], (1, 24), (6,), (12,), (0.5, 0.9)))
+    station = stations_df[stations_df["station"] == "Changping"]["PM2.5"].astype("float64")
+    got = result[result["station"] == "Changping"]
+    np.testing.assert_allclose(got["PM2.5_lag_24h"], station.shift(freq="24h").reindex(station.index), rtol=1e-6)
+    np.testing.assert_allclose(got["PM2.5_lag_1h"], station.shift(freq="1h").reindex(station.index), rtol=1e-6)
+    np.testing.assert_allclose(got["PM2.5_media_6h"], station.rolling("6h").mean(), rtol=1e-5)
+    np.testing.assert_allclose(got["PM2.5_p50_6h"], station.rolling("6h").quantile(0.5), rtol=1e-5)
+    np.testing.assert_allclose(got["PM2.5_p90_6h"], station.rolling("6h").quantile(0.9), rtol=1e-5)
+    # A média exponencial decai por hora, inclusive nas horas ausentes
+    grid = station.reindex(pd.date_range(station.index[0], station.index[-1], freq="h"))
+    np.testing.assert_allclose(got["PM2.5_ewm_12h"], grid.ewm(span=12).mean().reindex(station.index), rtol=1e-5)
+
+def test_wd_and_cyclical_encodings(stations_df):
+    stations_df = stations_df.copy()
+    stations_df.iloc[0, 2] = np.nan
+    onehot, _ = gerar_atributos(stations_df, quantis=(), codificacao_wd="onehot")
+    wd_columns = [f"wd_{d}" for d in DIRECOES_VENTO]
+    assert onehot[wd_columns].iloc[0].sum() == 0
+    assert (onehot[wd_columns].iloc[1:].sum(axis=1) == 1).all()
+    sincos, _ = gerar_atributos(stations_df, quantis=(), codificacao_wd="sincos")
+    east = stations_df["wd"] == "E"
+    np.testing.assert_allclose(sincos.loc[east.to_numpy(), "wd_sin"], 1.0, atol=1e-6)
+    assert np.isnan(sincos["wd_sin"].iloc[0])
+    np.testing.assert_allclose(sincos["hora_sin"] ** 2 + sincos["hora_cos"] ** 2, 1.0, rtol=1e-6)
+    assert sincos["mes_cos"].iloc[0] == pytest.approx(np.cos(2 * np.pi * 2 / 12))
+    with pytest.raises(ValueError):
+        gerar_atributos(stations_df, codificacao_wd="polar")
+
+def test_process_pool_matches_single_process(stations_df):
+    single, _ = gerar_atributos(stations_df)
+    pooled, metrics = gerar_atributos(stations_df, processos=2)
+    assert metrics["processos"] == 2
+    pd.testing.assert_frame_equal(single, pooled)
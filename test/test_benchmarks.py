@@ -0,0 +1,61 @@
+import os
+import json
+
+import numpy as np
+import pytest
+
+from benchmarks import run as bench
+from benchmarks.dados_sinteticos import gerar_bloco_prsa, gravar_zip_prsa, interpretar_tamanho
+
+
+def test_interpretar_tamanho():
+    assert interpretar_tamanho("10k") == 10_000
+    assert interpretar_tamanho("1.5M") == 1_500_000
+    assert interpretar_tamanho("50M") == 50_000_000
+    assert interpretar_tamanho("123") == 123
+
+
+def test_gerar_bloco_prsa_datas_e_faltantes():
+    bloco = gerar_bloco_prsa("Dongsi", 24 * 365, 48, np.random.default_rng(0))
+    # 8760 horas após 2013-03-01 00h
+    assert tuple(bloco.iloc[0][["year", "month", "day", "hour"]]) == (2014, 3, 1, 0)
+    assert tuple(bloco.iloc[-1][["year", "month", "day", "hour"]]) == (2014, 3, 2, 23)
+    grande = gerar_bloco_prsa("Dongsi", 0, 10_000, np.random.default_rng(0))
+    assert 0.01 < grande["PM2.5"].isna().mean() < 0.03
+
+
+def test_gravar_zip_prsa_reaproveita(tmp_path):
+    caminho_zip, caminhos = gravar_zip_prsa(str(tmp_path), 1200, n_estacoes=3)
+    assert len(caminhos) == 3
+    mtime = (tmp_path / "csv_1200" / os.path.basename(caminhos[0])).stat().st_mtime
+    assert gravar_zip_prsa(str(tmp_path), 1200, n_estacoes=3) == (caminho_zip, caminhos)
+    assert (tmp_path / "csv_1200" / os.path.basename(caminhos[0])).stat().st_mtime == mtime
+
+
+def test_go_registra_historico_e_detecta_regressao(tmp_path):
+    historico = tmp_path / "historico.json"
+    args = bench.build_parser().parse_args([
+        "--sizes", "2k", "--repetitions", "2", "--warmup", "0", "--no_isolation",
+        "--data_dir", str(tmp_path / "dados"), "--history", str(historico),
+    ])
+    execucao = bench.go(args)
+    assert {r["caso"] for r in execucao["resultados"]} == set(bench.CASOS)
+    for resultado in execucao["resultados"]:
+        assert resultado["linhas"] == 2000
+        assert resultado["latencia_ms"]["p50"] <= resultado["latencia_ms"]["p99"]
+        assert resultado["linhas_por_segundo"] > 0
+    assert len(json.loads(historico.read_text())) == 1
+
+    # Uma execução com latência dobrada é reportada como regressão
+    mais_lenta = json.loads(json.dumps(execucao))
+    for resultado in mais_lenta["resultados"]:
+        resultado["latencia_ms"]["p50"] *= 2
+    regressoes = bench.comparar(execucao, mais_lenta)
+    assert len(regressoes) == len(bench.CASOS)
+    assert bench.comparar(execucao, execucao) == []
+
+
+def test_go_rejeita_caso_desconhecido(tmp_path):
+    args = bench.build_parser().parse_args(["--cases", "inexistente", "--history", str(tmp_path / "h.json")])
+    with pytest.raises(ValueError):
+        bench.go(args)
@@ -0,0 +1,91 @@
+import os
+import pytest
+
+from components.get_data.wandb_utils.cache import CacheDownloads
+
+class FakeResponse:
+    def __init__(self, status_code, body=b""):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {"ETag": '"v2"'}
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def raise_for_status(self): pass
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+class FakeSession:
+    def __init__(self, status_code, body=b""):
+        self.status_code = status_code
+        self.body = body
+        self.headers_sent = []
+    def get(self, url, headers=None, **kwargs):
+        self.headers_sent.append(headers)
+        return FakeResponse(self.status_code, self.body)
+
+class FakeResult:
+    algoritmo_hash = None
+    hash = None
+    etag = '"v1"'
+    last_modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+def test_cache_hit_revalidates_with_conditional_headers(tmp_path):
+    session = FakeSession(304)
+    cache = CacheDownloads(str(tmp_path / ".cache"), sessao=session)
+    arquivo = write_file(str(tmp_path / "dados.zip"), b"conteudo")
+    cache.armazenar("http://x/dados.zip", arquivo, FakeResult())
+
+    entrada = CacheDownloads(str(tmp_path / ".cache"), sessao=session).consultar("http://x/dados.zip")
+    assert entrada is not None
+    assert os.path.basename(entrada["caminho"]) == "dados.zip"
+    assert session.headers_sent == [{"If-None-Match": '"v1"', "If-Modified-Since": FakeResult.last_modified}]
+
+def test_cache_stores_revalidation_body_when_remote_changed(tmp_path):
+    session = FakeSession(200, b"conteudo novo")
+    cache = CacheDownloads(str(tmp_path / ".cache"), sessao=session)
+    arquivo = write_file(str(tmp_path / "dados.zip"), b"conteudo")
+    antiga = cache.armazenar("http://x/dados.zip", arquivo, FakeResult())
+    entrada = cache.consultar("http://x/dados.zip")
+    # O corpo da própria requisição condicional vira o novo objeto: um único GET
+    assert len(session.headers_sent) == 1
+    assert open(entrada["caminho"], "rb").read() == b"conteudo novo"
+    assert os.path.basename(entrada["caminho"]) == "dados.zip"
+    assert entrada["etag"] == '"v2"' and entrada["extraidos"] == []
+    assert not os.path.exists(antiga["caminho"])
+    assert sorted(os.listdir(tmp_path / ".cache")) == ["indice.json", "objetos"]
+
+def test_cache_miss_without_validators(tmp_path):
+    cache = CacheDownloads(str(tmp_path / ".cache"), sessao=FakeSession(200))
+    cache.armazenar("http://x/a.csv", write_file(str(tmp_path / "a.csv"), b"123"))
+    assert cache.consultar("http://x/a.csv") is None
+
+def test_materializar_replaces_stale_destination(tmp_path):
+    cache = CacheDownloads(str(tmp_path / ".cache"))
+    entrada = cache.armazenar("http://x/a.csv", write_file(str(tmp_path / "a.csv"), b"123456"))
+    destino = write_file(str(tmp_path / "data" / "a.csv"), b"antigo")
+    assert CacheDownloads.materializar(entrada, destino) == destino
+    assert open(destino, "rb").read() == b"123456"
+    # Um destino já correto é reaproveitado
+    assert CacheDownloads.materializar(entrada, destino) == destino
+
+def test_cache_content_addressed_and_lru_eviction(tmp_path):
+    cache = CacheDownloads(str(tmp_path / ".cache"), tamanho_maximo=10)
+    a = cache.armazenar("http://x/a.csv", write_file(str(tmp_path / "a.csv"), b"123456"))
+    # Mesmo conteúdo em outra URL reaproveita o objeto
+    b = cache.armazenar("http://y/a.csv", write_file(str(tmp_path / "y" / "a.csv"), b"123456"))
+    assert a["caminho"] == b["caminho"]
+    assert cache.tamanho_total() == 6
+    cache.consultar("http://x/a.csv", revalidar=False)
+    cache.armazenar("http://z/c.csv", write_file(str(tmp_path / "c.csv"), b"abcdef"))
+    # y é a menos usada; x ainda usa o objeto compartilhado, então ele também precisa sair
+    assert "http://y/a.csv" not in cache.indice
+    assert "http://x/a.csv" not in cache.indice
+    assert not os.path.exists(a["caminho"])
+    assert cache.tamanho_total() <= 10
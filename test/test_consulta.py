@@ -0,0 +1,73 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.get_data.wandb_utils.consulta import NOME_ARQUIVO_INDICE, ArmazemPRSA, CacheBlocos
+from components.get_data.wandb_utils.prsa import gravar_parquet_prsa, carregar_parquet_prsa
+
+@pytest.fixture
+def dataset(tmp_path):
+    frames = []
+    for station, offset in [("Aotizhongxin", 0.0), ("Changping", 1000.0)]:
+        idx = pd.date_range("2013-12-01", "2014-02-28 23:00", freq="h")
+        frames.append(pd.DataFrame({
+            "year": idx.year.astype("int16"), "month": idx.month.astype("int8"),
+            "day": idx.day.astype("int8"), "hour": idx.hour.astype("int8"),
+            "PM2.5": (np.arange(len(idx)) + offset).astype("float32"),
+            "TEMP": np.zeros(len(idx), dtype="float32"),
+            "wd": pd.Categorical(["N"] * len(idx)),
+            "station": station,
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    df["station"] = df["station"].astype("category")
+    path = str(tmp_path / "parquet")
+    gravar_parquet_prsa(df, path)
+    return path
+
+def test_query_returns_station_time_range(dataset):
+    store = ArmazemPRSA(dataset)
+    assert store.estacoes == ["Aotizhongxin", "Changping"]
+    result = store.consultar(["Changping"], "2013-12-31 22:00", "2014-01-01 02:00", ["PM2.5"])
+    assert list(result.columns) == ["PM2.5", "station"]
+    assert list(result.index) == list(pd.date_range("2013-12-31 22:00", periods=4, freq="h"))
+    # Horas desde 2013-12-01 00:00 + deslocamento da estação
+    assert list(result["PM2.5"]) == [1000.0 + 742, 1000.0 + 743, 1000.0 + 744, 1000.0 + 745]
+    assert result["PM2.5"].dtype == np.float32
+
+def test_full_query_matches_parquet_loader(dataset):
+    store = ArmazemPRSA(dataset)
+    expected = carregar_parquet_prsa(dataset, colunas=["PM2.5", "wd"]).sort_values(["station", "datetime"])
+    result = store.consultar(colunas=["PM2.5", "wd"])
+    np.testing.assert_array_equal(result.index, expected.index)
+    np.testing.assert_array_equal(result["PM2.5"], expected["PM2.5"])
+    assert (result["wd"] == "N").all()
+
+def test_query_reads_only_overlapping_row_groups(dataset):
+    store = ArmazemPRSA(dataset)
+    store.consultar(["Aotizhongxin"], "2014-02-10", "2014-02-11", ["PM2.5"])
+    # Um grupo de linhas (~1 mês): 3 colunas de data + PM2.5, de uma única estação e ano
+    assert store.cache.faltas == 4
+    assert {chave[0].split(os.sep)[0] for chave in store.cache._entradas} == {"station=Aotizhongxin"}
+    store.consultar(["Aotizhongxin"], "2014-02-10", "2014-02-11", ["PM2.5"])
+    assert store.cache.acertos == 4
+    assert store.consultar(["Aotizhongxin"], "2020-01-01", "2021-01-01").empty
+
+def test_index_is_persisted_and_refreshed(dataset, tmp_path):
+    ArmazemPRSA(dataset)
+    assert os.path.exists(os.path.join(dataset, NOME_ARQUIVO_INDICE))
+    # O arquivo de índice é ignorado pelo leitor de Parquet
+    assert len(carregar_parquet_prsa(dataset)) == 2 * 2160
+    store = ArmazemPRSA(dataset)
+    first, last = store.intervalo("Changping")
+    assert (first, last) == (pd.Timestamp("2013-12-01"), pd.Timestamp("2014-02-28 23:00"))
+
+def test_block_cache_evicts_least_recently_used():
+    cache = CacheBlocos(tamanho_maximo=200)
+    cache.guardar("a", np.zeros(10))
+    cache.guardar("b", np.zeros(10))
+    cache.obter("a")
+    cache.guardar("c", np.zeros(10))
+    assert cache.obter("b") is None
+    assert cache.obter("a") is not None and cache.obter("c") is not None
+    assert cache.tamanho == 160
@@ -0,0 +1,111 @@
+import os
+import types
+import pandas as pd
+import pytest
+
+import components.convert_to_parquet.run as run
+
+HEADER = "No,year,month,day,hour,PM2.5,PM10,SO2,NO2,CO,O3,TEMP,PRES,DEWP,RAIN,wd,WSPM,station\n"
+
+def write_station_csv(path, station, rows):
+    with open(path, "w") as f:
+        f.write(HEADER)
+        for i, (year, month) in enumerate(rows, start=1):
+            f.write(f"{i},{year},{month},1,0,4,4,4,7,300,77,-0.7,1023,-18.8,0,NNW,4.4,{station}\n")
+
+def make_args(tmp_path):
+    return types.SimpleNamespace(input_artifact="AirQuality.csv:latest", artifact_name="prsa_parquet",
+                                 artifact_type="parquet_data", artifact_description="desc",
+                                 local_data_dir=str(tmp_path / "data"))
+
+def test_convert_csvs_to_parquet_partitions_by_station_and_year(tmp_path):
+    write_station_csv(tmp_path / "a.csv", "Aotizhongxin", [(2013, 3), (2014, 1)])
+    write_station_csv(tmp_path / "b.csv", "Changping", [(2013, 3)])
+    (tmp_path / "other.csv").write_text("x,y\n1,2\n")
+    output_dir = str(tmp_path / "out")
+    n, watermarks = run.convert_csvs_to_parquet([str(tmp_path / f) for f in ("a.csv", "b.csv", "other.csv")], output_dir)
+    assert n == 3
+    assert watermarks == {"Aotizhongxin": "2014-01-01T00:00:00", "Changping": "2013-03-01T00:00:00"}
+    assert sorted(os.listdir(output_dir)) == ["station=Aotizhongxin", "station=Changping"]
+    assert sorted(os.listdir(os.path.join(output_dir, "station=Aotizhongxin"))) == ["year=2013", "year=2014"]
+    df = pd.read_parquet(output_dir)
+    assert len(df) == 3
+    assert df["PM2.5"].dtype == "float32"
+    assert df["hour"].dtype == "int8"
+    assert isinstance(df["wd"].dtype, pd.CategoricalDtype)
+
+def test_go_logs_parquet_directory(tmp_path, monkeypatch, make_wandb_run):
+    artifact_dir = tmp_path / "artifact"
+    artifact_dir.mkdir()
+    write_station_csv(artifact_dir / "a.csv", "Aotizhongxin", [(2013, 3)])
+    dummy_run = make_wandb_run(str(artifact_dir))
+    logged = []
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: dummy_run)
+    monkeypatch.setattr(run, "log_artifact", lambda name, type, desc, path, wandb_run, **kw: logged.append((name, path)))
+    args = make_args(tmp_path)
+    run.go(args)
+    assert logged == [("prsa_parquet", os.path.join(args.local_data_dir, "prsa_parquet"))]
+    assert os.path.isdir(logged[0][1])
+
+def test_go_without_prsa_csv_logs_nothing(tmp_path, monkeypatch, make_wandb_run):
+    artifact_dir = tmp_path / "artifact"
+    artifact_dir.mkdir()
+    (artifact_dir / "AirQuality.csv").write_text("Date;Time\n")
+    dummy_run = make_wandb_run(str(artifact_dir))
+    logged = []
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: dummy_run)
+    monkeypatch.setattr(run, "log_artifact", lambda *a, **kw: logged.append(a))
+    run.go(make_args(tmp_path))
+    assert logged == []
+
+def test_go_incremental_appends_only_new_rows(tmp_path, monkeypatch, make_wandb_run):
+    artifact_dir = tmp_path / "artifact"
+    artifact_dir.mkdir()
+    write_station_csv(artifact_dir / "a.csv", "Aotizhongxin", [(2013, 3), (2014, 1), (2014, 2)])
+    previous = types.SimpleNamespace(metadata={"marcas_d_agua": {"Aotizhongxin": "2014-01-01T00:00:00"}})
+    dummy_run = make_wandb_run(str(artifact_dir), previous={"prsa_parquet:latest": previous})
+    logged = []
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: dummy_run)
+    monkeypatch.setattr(run, "log_artifact", lambda name, type, desc, path, wandb_run, **kw: logged.append((path, kw)))
+    args = make_args(tmp_path)
+    args.incremental = True
+    run.go(args)
+    path, kw = logged[0]
+    assert kw["artefato_base"] is previous
+    assert kw["metadados"]["marcas_d_agua"] == {"Aotizhongxin": "2014-02-01T00:00:00"}
+    assert kw["metadados"]["linhas_adicionadas"] == 1
+    df = pd.read_parquet(path)
+    assert len(df) == 1 and df["month"].iloc[0] == 2
+
+def test_go_incremental_adds_only_new_paths_to_previous_version(tmp_path, monkeypatch, make_wandb_run, make_artifact):
+    write_station_csv(tmp_path / "a.csv", "Aotizhongxin", [(2014, 1)])
+    _, watermarks = run.convert_csvs_to_parquet([str(tmp_path / "a.csv")], str(tmp_path / "v0"))
+    previous = make_artifact(metadata={"marcas_d_agua": watermarks})
+    previous.add_dir(str(tmp_path / "v0"))
+    artifact_dir = tmp_path / "artifact"
+    artifact_dir.mkdir()
+    write_station_csv(artifact_dir / "a.csv", "Aotizhongxin", [(2014, 1), (2014, 2)])
+    dummy_run = make_wandb_run(str(artifact_dir), previous={"prsa_parquet:latest": previous})
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: dummy_run)
+    args = make_args(tmp_path)
+    args.incremental = True
+    run.go(args)
+    draft = dummy_run.logged_artifacts[0]
+    assert draft.paths == previous.paths | {"station=Aotizhongxin/year=2014/parte-2014020100-0.parquet"}
+    assert draft.metadata["marcas_d_agua"] == {"Aotizhongxin": "2014-02-01T00:00:00"}
+
+def test_convert_csvs_to_parquet_reads_uci_air_quality(tmp_path):
+    write_station_csv(tmp_path / "a.csv", "Aotizhongxin", [(2013, 3)])
+    (tmp_path / "AirQuality.csv").write_text(
+        "Date;Time;CO(GT);NO2(GT);T;RH;AH;;\n"
+        "10/03/2004;18.00.00;2,6;113;13,6;48,9;0,7578;;\n"
+        "10/03/2004;19.00.00;-200;92;13,3;47,7;0,7255;;\n"
+        ";;;;;;;;\n"
+    )
+    output_dir = str(tmp_path / "out")
+    n, watermarks = run.convert_csvs_to_parquet([str(tmp_path / "a.csv"), str(tmp_path / "AirQuality.csv")], output_dir)
+    assert n == 3
+    assert watermarks == {"Aotizhongxin": "2013-03-01T00:00:00", "AirQuality": "2004-03-10T19:00:00"}
+    df = pd.read_parquet(os.path.join(output_dir, "station=AirQuality"))
+    assert df["CO"].iloc[0] == 2600.0
+    assert pd.isna(df["CO"].iloc[1])
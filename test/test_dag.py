@@ -0,0 +1,79 @@
+import time
+import threading
+
+import pytest
+
+from pipeline.dag import Passo, ErroPipeline, montar_dependencias, executar_grafo
+
+
+def _diamante():
+    return [
+        Passo("download", "get_data", saidas=["bruto"]),
+        Passo("convert", "convert_to_parquet", entradas=["bruto:latest"], saidas=["parquet"]),
+        Passo("validate", "validate", entradas=["bruto"], saidas=["relatorio"]),
+        Passo("impute", "impute", entradas=["parquet", "relatorio"], saidas=["imputado"]),
+    ]
+
+
+def test_montar_dependencias():
+    deps = montar_dependencias(_diamante())
+    assert deps == {
+        "download": set(),
+        "convert": {"download"},
+        "validate": {"download"},
+        "impute": {"convert", "validate"},
+    }
+
+
+def test_montar_dependencias_ciclo_e_saida_duplicada():
+    with pytest.raises(ValueError, match="Ciclo"):
+        montar_dependencias([Passo("a", "a", entradas=["y"], saidas=["x"]), Passo("b", "b", entradas=["x"], saidas=["y"])])
+    with pytest.raises(ValueError, match="produzido"):
+        montar_dependencias([Passo("a", "a", saidas=["x"]), Passo("b", "b", saidas=["x:latest"])])
+
+
+def test_executar_grafo_ordem_e_paralelismo():
+    ordem, simultaneos, ativos = [], [], set()
+    trava = threading.Lock()
+
+    def executar(passo):
+        with trava:
+            ativos.add(passo.nome)
+            simultaneos.append(set(ativos))
+        time.sleep(0.05)
+        with trava:
+            ativos.discard(passo.nome)
+            ordem.append(passo.nome)
+
+    status = executar_grafo(_diamante(), executar, max_workers=2)
+    assert set(status.values()) == {"ok"}
+    assert ordem[0] == "download" and ordem[-1] == "impute"
+    # convert e validate são independentes e rodam ao mesmo tempo
+    assert {"convert", "validate"} in simultaneos
+
+
+def test_executar_grafo_selecionados():
+    executados = []
+    status = executar_grafo(_diamante(), lambda p: executados.append(p.nome), selecionados=["convert", "impute"])
+    assert executados == ["convert", "impute"]
+    assert status["download"] == "ignorado" and status["validate"] == "ignorado"
+
+
+def test_executar_grafo_para_na_falha():
+    executados = []
+
+    def executar(passo):
+        if passo.nome == "convert":
+            raise RuntimeError("falhou")
+        time.sleep(0.05)
+        executados.append(passo.nome)
+
+    with pytest.raises(ErroPipeline) as erro:
+        executar_grafo(_diamante(), executar, max_workers=2)
+    status = erro.value.status
+    assert status["convert"] == "falhou"
+    # validate já estava em execução e termina; impute nunca começa
+    assert status["validate"] == "ok"
+    assert status["impute"] == "cancelado"
+    assert "impute" not in executados
+    assert isinstance(erro.value.__cause__, RuntimeError)
@@ -0,0 +1,71 @@
+import os
+import textwrap
+import pytest
+
+from pipeline.executor import carregar_componente, executar_em_processo, montar_argv
+
+MLPROJECT = textwrap.dedent("""\
+    name: fake
+
+    entry_points:
+      main:
+        parameters:
+          sample:
+            type: string
+          processes:
+            type: string
+            default: 2
+          description:
+            type: string
+            default: ""
+
+        command: >
+          python run.py --sample {sample} --processes {processes} --description {description}
+    """)
+
+RUN_PY = textwrap.dedent("""\
+    import argparse
+
+    calls = []
+
+    def go(args):
+        calls.append(args)
+
+    def build_parser():
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--sample", type=str)
+        parser.add_argument("--processes", type=int)
+        parser.add_argument("--description", type=str)
+        return parser
+    """)
+
+@pytest.fixture
+def component_dir(tmp_path):
+    (tmp_path / "MLproject").write_text(MLPROJECT)
+    (tmp_path / "run.py").write_text(RUN_PY)
+    return str(tmp_path)
+
+def test_montar_argv_uses_defaults_and_quotes(component_dir):
+    argv = montar_argv(component_dir, {"sample": "http://x/a b.zip"})
+    assert argv == ["--sample", "http://x/a b.zip", "--processes", "2", "--description", ""]
+
+def test_montar_argv_missing_required(component_dir):
+    with pytest.raises(ValueError):
+        montar_argv(component_dir, {})
+
+def test_executar_em_processo_calls_go_with_parsed_args(component_dir):
+    executar_em_processo(component_dir, {"sample": "s", "processes": 4})
+    executar_em_processo(component_dir, {"sample": "t"})
+    module = carregar_componente(component_dir)
+    # O módulo é importado uma única vez e reutilizado entre passos
+    assert [(a.sample, a.processes) for a in module.calls] == [("s", 4), ("t", 2)]
+
+def test_real_components_build_same_args_as_mlproject():
+    components = os.path.join(os.path.dirname(__file__), "..", "components")
+    argv = montar_argv(os.path.join(components, "impute"), {
+        "input_artifact": "a:latest", "artifact_name": "b", "artifact_type": "c", "artifact_description": "d"})
+    module = carregar_componente(os.path.join(components, "impute"))
+    args = module.build_parser().parse_args(argv)
+    assert args.compare_strategies == ""
+    assert args.processes == 1
+    assert args.incremental is False
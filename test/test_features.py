@@ -0,0 +1,38 @@
+import os
+import types
+import numpy as np
+import pandas as pd
+
+import components.features.run as run
+from components.get_data.wandb_utils.prsa import gravar_parquet_prsa
+
+def make_parquet(path):
+    n = 48
+    idx = pd.date_range("2013-03-01", periods=n, freq="h")
+    df = pd.DataFrame({
+        "year": idx.year.astype("int16"), "month": idx.month.astype("int8"),
+        "day": idx.day.astype("int8"), "hour": idx.hour.astype("int8"),
+        "PM2.5": np.arange(n, dtype="float32"), "wd": pd.Categorical(["N"] * n),
+        "station": pd.Categorical(["Dongsi"] * n),
+    })
+    gravar_parquet_prsa(df, str(path))
+
+def test_go_writes_float32_features_and_logs_artifact(tmp_path, monkeypatch, make_wandb_run):
+    make_parquet(tmp_path / "in")
+    dummy_run = make_wandb_run(str(tmp_path / "in"))
+    logged = []
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: dummy_run)
+    monkeypatch.setattr(run, "log_artifact", lambda name, type, desc, path, wandb_run, **kw: logged.append((path, kw)))
+    args = types.SimpleNamespace(input_artifact="air_quality_imputed:latest", artifact_name="features",
+                                 artifact_type="features", artifact_description="desc", columns="", lags="1,24",
+                                 windows="6", ewm_spans="6", quantiles="0.5", wd_encoding="sincos", processes=1,
+                                 local_data_dir=str(tmp_path / "data"))
+    run.go(args)
+    output_dir = os.path.join(args.local_data_dir, "features")
+    assert logged[0][0] == output_dir
+    assert "PM2.5_lag_24h" in logged[0][1]["metadados"]["atributos"]
+    result = pd.read_parquet(output_dir).sort_values(["day", "hour"], ignore_index=True)
+    assert result["PM2.5_lag_24h"].dtype == np.float32
+    assert result["PM2.5_lag_24h"].iloc[30] == 6.0
+    assert result["wd_cos"].iloc[0] == 1.0
+    assert dummy_run.summary["atributos/linhas"] == 48
@@ -0,0 +1,49 @@
+# Benchmark de inicialização a frio: mede com -X importtime o custo de importar main.py e o
+# run.py do get_data. Sempre falha se dependências pesadas voltarem a ser importadas no
+# carregamento do módulo; os orçamentos de tempo, sensíveis à carga da máquina, só são
+# verificados com IMPORTTIME_BUDGET=1 (ex.: em uma máquina dedicada a benchmarks).
+import os
+import sys
+import subprocess
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamentos em milissegundos (tempo acumulado do módulo, melhor de algumas execuções).
+# Com wandb, mlflow e hydra importados no topo, main levava mais de 3 s.
+ORCAMENTOS_MS = {
+    "main": 600,
+    "components.get_data.run": 400,
+}
+PESADOS = {"wandb", "mlflow", "hydra", "requests", "pandas"}
+
+
+def _medir(modulo):
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    ).stderr
+    tempos, importados = {}, set()
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        _, acumulado, nome = linha.split("|")
+        nome_completo = nome.strip()
+        importados.add(nome_completo.split(".")[0])
+        if acumulado.strip().isdigit():
+            tempos[nome_completo] = int(acumulado) / 1000
+    return tempos[modulo], importados
+
+
+@pytest.mark.parametrize("modulo", sorted(ORCAMENTOS_MS))
+def test_import_does_not_load_heavy_modules(modulo):
+    _, importados = _medir(modulo)
+    assert not (importados & PESADOS), f"{modulo} importa {sorted(importados & PESADOS)} no carregamento"
+
+
+@pytest.mark.skipif(os.environ.get("IMPORTTIME_BUDGET") != "1", reason="orçamentos de tempo só com IMPORTTIME_BUDGET=1")
+@pytest.mark.parametrize("modulo", sorted(ORCAMENTOS_MS))
+def test_importtime_budget(modulo):
+    melhor = min(_medir(modulo)[0] for _ in range(3))
+    assert melhor <= ORCAMENTOS_MS[modulo], f"import {modulo}: {melhor:.0f} ms (orçamento {ORCAMENTOS_MS[modulo]} ms)"
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.get_data.wandb_utils.imputacao import imputar, interpolar_por_estacao, preencher_wd_moda
+
+@pytest.fixture
+def stations_df():
+    idx = pd.date_range("2013-03-01", periods=48, freq="h")
+    frames = []
+    for station, offset in [("Aotizhongxin", 0.0), ("Changping", 100.0)]:
+        pm = np.arange(48, dtype="float32") + offset
+        frames.append(pd.DataFrame({
+            "PM2.5": pm,
+            "TEMP": np.full(48, 10.0, dtype="float32"),
+            "wd": pd.Categorical(["N", "N", "S"] * 16),
+            "station": station,
+        }, index=idx))
+    df = pd.concat(frames)
+    df["station"] = df["station"].astype("category")
+    df.iloc[[0, 5, 50, 60], 0] = np.nan
+    df.iloc[[4, 29], 2] = np.nan
+    return df
+
+def test_interpolar_por_estacao_does_not_mix_stations(stations_df):
+    result = interpolar_por_estacao(stations_df, ["PM2.5"])
+    assert result["PM2.5"].dtype == np.float32
+    assert result["PM2.5"].iloc[5] == 5.0
+    # Primeira hora da estação é preenchida a partir dela mesma, não da estação anterior
+    assert result["PM2.5"].iloc[0] == 1.0
+    assert result["PM2.5"].iloc[50] == 102.0
+
+def test_preencher_wd_moda_by_station_and_hour(stations_df):
+    result = preencher_wd_moda(stations_df)
+    assert result["wd"].isna().sum() == 0
+    # A moda vem da mesma hora do outro dia: hora 4 é "N" e hora 5 é "S"
+    assert result["wd"].iloc[4] == "N"
+    assert result["wd"].iloc[29] == "S"
+
+@pytest.mark.parametrize("estrategia,processos,opcoes", [
+    ("interpolacao", 1, {}),
+    ("knn_janela", 1, {"janela": "1D"}),
+    ("interpolacao", 2, {}),
+])
+def test_imputar_reports_metrics(stations_df, estrategia, processos, opcoes):
+    result, metricas = imputar(stations_df, estrategia, processos=processos, **opcoes)
+    assert metricas["faltantes_restantes"] == 0
+    assert metricas["linhas"] == len(stations_df)
+    assert metricas["linhas_por_segundo"] > 0
+    assert metricas["pico_memoria_bytes"] > 0
+    assert len(result) == len(stations_df)
+
+def test_imputar_unknown_strategy(stations_df):
+    with pytest.raises(ValueError):
+        imputar(stations_df, "media")
@@ -0,0 +1,52 @@
+import os
+import types
+import numpy as np
+import pandas as pd
+
+import components.impute.run as run
+from components.get_data.wandb_utils.prsa import gravar_parquet_prsa, carregar_parquet_prsa
+
+def make_parquet(path, n=24):
+    df = pd.DataFrame({
+        "year": np.full(n, 2013, dtype="int16"), "month": np.full(n, 3, dtype="int8"),
+        "day": np.arange(n, dtype="int8") // 24 + 1, "hour": np.arange(n, dtype="int8") % 24,
+        "PM2.5": np.arange(n, dtype="float32"), "wd": pd.Categorical(["N"] * n),
+        "station": pd.Categorical(["Dongsi"] * n),
+    })
+    df.loc[[3, 4], "PM2.5"] = np.nan
+    gravar_parquet_prsa(df, str(path))
+
+def make_args(tmp_path, **kw):
+    return types.SimpleNamespace(input_artifact="air_quality_parquet:latest", artifact_name="imputed",
+                                 artifact_type="imputed_data", artifact_description="desc",
+                                 strategy="interpolacao", compare_strategies="", processes=1,
+                                 knn_neighbors=2, knn_window="1D", local_data_dir=str(tmp_path / "data"), **kw)
+
+def test_go_imputes_and_logs_metrics(tmp_path, monkeypatch, make_wandb_run):
+    make_parquet(tmp_path / "in")
+    dummy_run = make_wandb_run(str(tmp_path / "in"))
+    logged = []
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: dummy_run)
+    monkeypatch.setattr(run, "log_artifact", lambda name, type, desc, path, wandb_run, **kw: logged.append(path))
+    args = make_args(tmp_path)
+    args.compare_strategies = "knn_janela"
+    run.go(args)
+    assert logged == [os.path.join(args.local_data_dir, "imputed")]
+    result = carregar_parquet_prsa(logged[0])
+    assert result["PM2.5"].isna().sum() == 0
+    assert result["PM2.5"].iloc[3] == 3.0
+    assert "imputacao/interpolacao/linhas_por_segundo" in dummy_run.summary
+    assert "imputacao/knn_janela/linhas_por_segundo" in dummy_run.summary
+
+def test_go_incremental_adds_only_new_paths_to_previous_version(tmp_path, monkeypatch, make_wandb_run, make_artifact):
+    make_parquet(tmp_path / "v0")
+    previous = make_artifact(metadata={"marcas_d_agua": {"Dongsi": "2013-03-01T23:00:00"}})
+    previous.add_dir(str(tmp_path / "v0"))
+    make_parquet(tmp_path / "in", n=48)
+    dummy_run = make_wandb_run(str(tmp_path / "in"), previous={"imputed:latest": previous})
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: dummy_run)
+    run.go(make_args(tmp_path, incremental=True, context_hours=48))
+    draft = dummy_run.logged_artifacts[0]
+    assert draft.paths == previous.paths | {"station=Dongsi/year=2013/parte-2013030200-0.parquet"}
+    assert draft.metadata["marcas_d_agua"] == {"Dongsi": "2013-03-02T23:00:00"}
+    assert draft.metadata["linhas_adicionadas"] == 24
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from components.get_data.wandb_utils.incremental import (
+    calcular_marcas, deslocamento_apos_marca, filtrar_novas_linhas, mesclar_marcas,
+)
+
+def make_df():
+    idx = pd.DatetimeIndex(["2013-03-01 00:00", "2013-03-01 01:00", "2013-03-01 00:00", "2013-03-01 02:00"])
+    return pd.DataFrame({"PM2.5": [1.0, 2.0, 3.0, 4.0],
+                         "station": pd.Categorical(["A", "A", "B", "B"])}, index=idx)
+
+def test_calcular_marcas_per_station():
+    assert calcular_marcas(make_df()) == {"A": "2013-03-01T01:00:00", "B": "2013-03-01T02:00:00"}
+
+def test_filtrar_novas_linhas_uses_station_watermark():
+    novas = filtrar_novas_linhas(make_df(), {"A": "2013-03-01T00:00:00", "C": "2020-01-01T00:00:00"})
+    # A: só depois de 00h; B não tem marca e entra inteira
+    assert novas["PM2.5"].tolist() == [2.0, 3.0, 4.0]
+
+def test_filtrar_novas_linhas_without_watermarks_keeps_all():
+    assert len(filtrar_novas_linhas(make_df(), {})) == 4
+
+def test_mesclar_marcas_keeps_latest():
+    antigas = {"A": "2013-03-01T05:00:00", "B": "2013-03-01T00:00:00"}
+    novas = {"A": "2013-03-01T01:00:00", "B": "2013-03-02T00:00:00", "C": "2013-03-01T00:00:00"}
+    assert mesclar_marcas(antigas, novas) == {
+        "A": "2013-03-01T05:00:00", "B": "2013-03-02T00:00:00", "C": "2013-03-01T00:00:00"}
+
+def test_deslocamento_apos_marca_finds_first_new_line(tmp_path):
+    path = tmp_path / "dados.csv"
+    lines = [f"{h},{h * 10}\n" for h in range(100)]
+    path.write_text("hora,valor\n" + "".join(lines) + ",\n")
+    header = len("hora,valor\n")
+    instante = lambda linha: pd.Timestamp("2013-03-01") + pd.Timedelta(hours=int(linha.split(b",")[0])) if linha.split(b",")[0] else None
+    for marca, first in (("2013-02-01", 0), ("2013-03-01 00:00", 1), ("2013-03-02 03:00", 28), ("2013-03-05 03:00", 100)):
+        offset = deslocamento_apos_marca(str(path), marca, instante, header)
+        assert offset == header + sum(len(l) for l in lines[:first])
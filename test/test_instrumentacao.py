@@ -0,0 +1,84 @@
+import os
+import json
+import time
+import types
+
+import pytest
+
+from components.get_data.wandb_utils.instrumentacao import Instrumentacao
+
+
+def _trabalho():
+    total = 0
+    for i in range(200_000):
+        total += i * i
+    return total
+
+
+def test_fases_registram_tempos_e_extras(tmp_path):
+    with Instrumentacao("teste") as instrumentacao:
+        with instrumentacao.fase("download") as registro:
+            _trabalho()
+            (tmp_path / "saida.bin").write_bytes(b"x" * 100_000)
+            registro["bytes_baixados"] = 123
+        with instrumentacao.fase("download"):
+            time.sleep(0.05)
+        with pytest.raises(RuntimeError):
+            with instrumentacao.fase("upload"):
+                raise RuntimeError("falhou")
+
+    primeira, segunda, upload = instrumentacao.fases
+    assert primeira["cpu_segundos"] > 0 and primeira["bytes_baixados"] == 123
+    assert segunda["segundos"] >= 0.05 and segunda["cpu_segundos"] < segunda["segundos"]
+    assert upload["sucesso"] is False
+    if primeira["bytes_escritos"] is not None:
+        assert primeira["bytes_escritos"] >= 100_000
+
+    metricas = instrumentacao.metricas()
+    assert metricas["instrumentacao/download/segundos"] == pytest.approx(primeira["segundos"] + segunda["segundos"])
+    assert metricas["instrumentacao/download/pico_memoria_mb"] > 0
+
+    execucao = types.SimpleNamespace(summary={})
+    instrumentacao.registrar_wandb(execucao)
+    assert execucao.summary == metricas
+    instrumentacao.registrar_wandb(object())  # execuções sem resumo são ignoradas
+
+    caminho = instrumentacao.salvar_trace(str(tmp_path / "traces"))
+    trace = json.loads(open(caminho).read())
+    assert trace["nome"] == "teste"
+    assert [f["fase"] for f in trace["fases"]] == ["download", "download", "upload"]
+
+
+@pytest.mark.parametrize("modo, extensao", [("cprofile", ".prof"), ("amostragem", ".folded")])
+def test_perfil(tmp_path, modo, extensao):
+    import threading
+    with Instrumentacao("teste", perfil=modo) as instrumentacao:
+        # O trabalho em outra thread só aparece no perfil por amostragem
+        thread = threading.Thread(target=lambda: [_trabalho() for _ in range(5)])
+        thread.start()
+        thread.join()
+        _trabalho()
+    caminho_perfil, caminho_txt = instrumentacao.salvar_perfil(str(tmp_path))
+    assert caminho_perfil.endswith(extensao)
+    assert os.path.getsize(caminho_perfil) > 0
+    assert "_trabalho" in open(caminho_txt).read()
+
+
+def test_perfil_desligado_e_modo_invalido(tmp_path):
+    assert Instrumentacao("teste").salvar_perfil(str(tmp_path)) == []
+    with pytest.raises(ValueError):
+        Instrumentacao("teste", perfil="outro")
+
+
+def test_fase_de_processos_filhos_mede_o_subprocesso():
+    import sys
+    import subprocess
+    with Instrumentacao("teste") as instrumentacao:
+        with instrumentacao.fase("passo", processos_filhos=True):
+            subprocess.run([sys.executable, "-c", "sum(i * i for i in range(3_000_000)); b = bytearray(64 * 2**20)"], check=True)
+    (registro,) = instrumentacao.fases
+    assert registro["bytes_lidos"] is None and registro["bytes_escritos"] is None
+    if registro["cpu_segundos"] is not None:
+        # A CPU do orquestrador esperando o filho é desprezível; a do filho não
+        assert registro["cpu_segundos"] > 0.05
+        assert registro["pico_memoria_mb"] is None or registro["pico_memoria_mb"] >= 64
@@ -0,0 +1,97 @@
+import os
+import threading
+import types
+import pytest
+
+import components.get_data.wandb_utils.log_artifact as la
+
+class StubArtifact:
+    def __init__(self, name, type, description):
+        self.name = name
+        self.metadata = {}
+        self.files = []
+        self.dirs = []
+    def add_file(self, path, name=None):
+        self.files.append(path)
+    def add_dir(self, path):
+        self.dirs.append(path)
+
+class StubRun:
+    project = "proj"
+    def __init__(self):
+        self.logged = []
+        self.threads = []
+    def log_artifact(self, artifact):
+        self.threads.append(threading.current_thread().name)
+        self.logged.append(artifact)
+
+@pytest.fixture
+def stub_wandb(monkeypatch):
+    monkeypatch.setattr(la.wandb, "Artifact", StubArtifact)
+    latest = {}
+    monkeypatch.setattr(la, "obter_metadados_artefato",
+                        lambda projeto, nome, ttl=0: latest.get(nome))
+    return latest
+
+def make_dir(tmp_path):
+    d = tmp_path / "parquet"
+    for station in ["A", "B", "C"]:
+        (d / f"station={station}").mkdir(parents=True)
+        (d / f"station={station}" / "part-0.parquet").write_bytes(station.encode() * 100)
+    return str(d)
+
+def test_calcular_digest_directory_is_order_independent(tmp_path):
+    d = make_dir(tmp_path)
+    digest = la.calcular_digest(d)
+    assert digest == la.calcular_digest(d, max_workers=1)
+    (tmp_path / "parquet" / "station=A" / "part-0.parquet").write_bytes(b"changed")
+    assert la.calcular_digest(d) != digest
+
+def test_log_artifact_directory_records_digest(tmp_path, stub_wandb):
+    run = StubRun()
+    d = make_dir(tmp_path)
+    artifact = la.log_artifact("prsa", "parquet_data", "desc", d, run, deduplicar=True)
+    assert artifact.dirs == [d]
+    assert artifact.metadata[la.CHAVE_DIGEST] == la.calcular_digest(d)
+
+def test_log_artifact_skips_identical_content(tmp_path, stub_wandb):
+    run = StubRun()
+    d = make_dir(tmp_path)
+    stub_wandb["prsa:latest"] = {"versao": "v1", "metadados": {la.CHAVE_DIGEST: la.calcular_digest(d)}}
+    assert la.log_artifact("prsa", "parquet_data", "desc", d, run, deduplicar=True) is None
+    assert run.logged == []
+
+def test_log_artifact_async_returns_handle(tmp_path, stub_wandb):
+    run = StubRun()
+    f = tmp_path / "AirQuality.csv"
+    f.write_text("a,b\n1,2\n")
+    future = la.log_artifact("aq", "raw_data", "desc", str(f), run, assincrono=True)
+    assert la.aguardar_uploads() == [future.result()]
+    assert future.result().files == [str(f)]
+    assert run.threads[0].startswith("wandb-upload")
+
+def test_log_artifact_list_of_files(tmp_path, stub_wandb):
+    run = StubRun()
+    files = []
+    for station in ["B", "A"]:
+        f = tmp_path / f"PRSA_Data_{station}.csv"
+        f.write_text(f"station\n{station}\n")
+        files.append(str(f))
+    artifact = la.log_artifact("prsa", "raw_data", "desc", files, run, deduplicar=True)
+    assert artifact.files == files
+    assert la.calcular_digest(files) == la.calcular_digest(list(reversed(files)))
+
+def test_log_artifact_skips_rewritten_parquet_dataset(tmp_path, stub_wandb):
+    import pandas as pd
+    from components.get_data.wandb_utils.prsa import gravar_parquet_prsa
+    df = pd.DataFrame({"year": [2013, 2013, 2014], "month": [1, 2, 1], "day": 1, "hour": 0,
+                       "PM2.5": [1.0, 2.0, 3.0], "station": ["A", "B", "A"]})
+    d = str(tmp_path / "parquet")
+    gravar_parquet_prsa(df, d)
+    run = StubRun()
+    first = la.log_artifact("prsa", "parquet_data", "desc", d, run, deduplicar=True)
+    stub_wandb["prsa:latest"] = {"versao": "v0", "metadados": dict(first.metadata)}
+    # Regravar o mesmo conteúdo gera os mesmos nomes de arquivo e o mesmo digest
+    gravar_parquet_prsa(df, d)
+    assert la.log_artifact("prsa", "parquet_data", "desc", d, run, deduplicar=True) is None
+    assert len(run.logged) == 1
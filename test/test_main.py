@@ -3,6 +3,7 @@ import os
 import pytest
 
 import main
+from pipeline.dag import ErroPipeline
 
 class DummyWandb:
     def __init__(self, login_result=True):
@@ -73,4 +74,115 @@ def test_pipeline_skip_download(monkeypatch, dummy_config):
     monkeypatch.setattr(main, "load_dotenv", lambda: None)
     main.go(dummy_config)
     # mlflow.run não deve ser chamado
-    assert not dummy_mlflow.run_called
\ No newline at end of file
+    assert not dummy_mlflow.run_called
+
+def test_pipeline_in_process_mode(monkeypatch, dummy_config):
+    dummy_config["main"]["execution_mode"] = "in_process"
+    dummy_wandb = DummyWandb(login_result=True)
+    dummy_mlflow = DummyMlflow()
+    calls = []
+    monkeypatch.setattr(main, "wandb", dummy_wandb)
+    monkeypatch.setattr(main, "mlflow", dummy_mlflow)
+    monkeypatch.setattr(main, "load_dotenv", lambda: None)
+    monkeypatch.setattr(main, "executar_em_processo", lambda path, params: calls.append((path, params)))
+    main.go(dummy_config)
+    assert not dummy_mlflow.run_called
+    path, params = calls[0]
+    assert path.endswith(os.path.join("components", "get_data"))
+    assert params["sample"] == dummy_config["etl"]["sample"]
+
+def test_pipeline_declared_graph(monkeypatch, dummy_config):
+    from omegaconf import OmegaConf
+    dummy_config["main"]["steps"] = "all"
+    dummy_config["pipeline"] = OmegaConf.create({
+        "max_workers": 2,
+        "steps": {
+            "download": {"component": "get_data", "parameters": {"sample": "${etl.sample}"}, "outputs": ["raw"]},
+            "convert": {"component": "convert_to_parquet", "parameters": {"input_artifact": "raw:latest"}, "inputs": ["raw"]},
+        },
+    })
+    monkeypatch.setattr(main, "wandb", DummyWandb(login_result=True))
+    monkeypatch.setattr(main, "load_dotenv", lambda: None)
+    calls = []
+    monkeypatch.setattr(main, "_run_component", lambda config, component, parameters: calls.append((component, parameters)))
+    main.go(dummy_config)
+    assert calls == [
+        ("get_data", {"sample": dummy_config["etl"]["sample"]}),
+        ("convert_to_parquet", {"input_artifact": "raw:latest"}),
+    ]
+
+def test_pipeline_steps_default_to_config_yaml_graph(dummy_config):
+    passos = main._pipeline_steps(dummy_config)
+    assert [p.nome for p in passos] == ["download", "validate", "convert", "impute", "aggregate", "features", "aqi"]
+    # As interpolações usam o config recebido, não o config.yaml
+    assert passos[0].parametros["artifact_description"] == "Raw file as downloaded"
+    assert passos[2].entradas == ["AirQuality.csv", "air_quality_validation"]
+
+def test_pipeline_step_cache_and_force(monkeypatch, dummy_config, tmp_path):
+    from pipeline.cache import CachePassos
+    dummy_config["main"]["step_cache"] = True
+    dummy_config["main"]["steps"] = "download,validate"
+    digests = {"AirQuality.csv:latest": "abc", "air_quality_validation:latest": "v1"}
+    monkeypatch.setattr(main, "wandb", DummyWandb(login_result=True))
+    monkeypatch.setattr(main, "load_dotenv", lambda: None)
+    monkeypatch.setattr(main, "_step_cache", lambda config, principal: CachePassos(str(tmp_path / "cache.json"), digests.get))
+    calls = []
+    monkeypatch.setattr(main, "_run_component", lambda config, component, parameters: calls.append(component))
+
+    main.go(dummy_config)
+    main.go(dummy_config)
+    # O download (sem entradas) sempre roda; a validação da mesma entrada é reaproveitada
+    assert calls == ["get_data", "validate_data", "get_data"]
+
+    dummy_config["main"]["force"] = "validate"
+    main.go(dummy_config)
+    assert calls == ["get_data", "validate_data", "get_data", "get_data", "validate_data"]
+
+def test_pipeline_instrumentation(monkeypatch, dummy_config, tmp_path):
+    import json
+    import types
+    dummy_config["main"]["instrumentation"] = {"trace_dir": "traces", "wandb": True}
+    runs = []
+    class InstrumentedWandb(DummyWandb):
+        def init(self, **kwargs):
+            run = types.SimpleNamespace(summary={}, finished=False, kwargs=kwargs)
+            run.finish = lambda: setattr(run, "finished", True)
+            runs.append(run)
+            return run
+    monkeypatch.setattr(main, "wandb", InstrumentedWandb(login_result=True))
+    monkeypatch.setattr(main, "load_dotenv", lambda: None)
+    monkeypatch.setattr(main, "_root_dir", str(tmp_path))
+    monkeypatch.setattr(main, "_run_component", lambda config, component, parameters: None)
+    main.go(dummy_config)
+    (trace_file,) = (tmp_path / "traces").glob("pipeline_*.json")
+    trace = json.loads(trace_file.read_text())
+    assert [fase["fase"] for fase in trace["fases"]] == ["passo:download"]
+    assert trace["fases"][0]["componente"] == "get_data"
+    (run,) = runs
+    assert run.kwargs["job_type"] == "pipeline" and run.finished
+    assert "instrumentacao/passo:download/segundos" in run.summary
+
+def test_instrumentation_publish_never_masks_step_error(monkeypatch, dummy_config, tmp_path):
+    dummy_config["main"]["instrumentation"] = {"trace_dir": "traces", "wandb": True}
+    inits = []
+    class FailingWandb(DummyWandb):
+        def init(self, **kwargs):
+            inits.append(kwargs)
+            raise RuntimeError("sem rede")
+    monkeypatch.setattr(main, "wandb", FailingWandb(login_result=True))
+    monkeypatch.setattr(main, "load_dotenv", lambda: None)
+    monkeypatch.setattr(main, "_root_dir", str(tmp_path))
+    def failing_component(config, component, parameters):
+        raise ValueError("passo falhou")
+    monkeypatch.setattr(main, "_run_component", failing_component)
+    with pytest.raises(ErroPipeline) as excinfo:
+        main.go(dummy_config)
+    assert str(excinfo.value.__cause__) == "passo falhou"
+    # Pipeline com falha: trace local gravado, sem execução no W&B
+    assert inits == []
+    assert list((tmp_path / "traces").glob("pipeline_*.json"))
+
+    # Pipeline sem falha: o erro do W&B vira aviso
+    monkeypatch.setattr(main, "_run_component", lambda config, component, parameters: None)
+    main.go(dummy_config)
+    assert len(inits) == 1
@@ -0,0 +1,66 @@
+from pipeline.cache import CachePassos, versao_codigo
+from pipeline.dag import Passo
+
+
+def _fixture(tmp_path):
+    codigo = tmp_path / "componente"
+    codigo.mkdir()
+    (codigo / "run.py").write_text("print('v1')\n")
+    digests = {"bruto:latest": "d1", "parquet:latest": "p1"}
+    cache = CachePassos(str(tmp_path / "cache.json"), digests.get)
+    passo = Passo("convert", "convert_to_parquet", {"local_data_dir": "data"}, entradas=["bruto"], saidas=["parquet"])
+    return codigo, digests, cache, passo
+
+
+def test_versao_codigo_ignora_pycache(tmp_path):
+    (tmp_path / "run.py").write_text("x = 1\n")
+    antes = versao_codigo(str(tmp_path))
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "run.cpython-311.pyc").write_bytes(b"\0")
+    assert versao_codigo(str(tmp_path)) == antes
+    (tmp_path / "run.py").write_text("x = 2\n")
+    assert versao_codigo(str(tmp_path)) != antes
+
+
+def test_cache_hit_e_invalidacao(tmp_path):
+    codigo, digests, cache, passo = _fixture(tmp_path)
+    partes = cache.componentes_chave(passo, [str(codigo)])
+    assert cache.verificar(passo, partes) == ["sem execução anterior registrada"]
+    cache.registrar(passo, partes)
+
+    # Novo processo lê o registro do disco
+    cache = CachePassos(str(tmp_path / "cache.json"), digests.get)
+    assert cache.verificar(passo, cache.componentes_chave(passo, [str(codigo)])) == []
+
+    digests["bruto:latest"] = "d2"
+    motivos = cache.verificar(passo, cache.componentes_chave(passo, [str(codigo)]))
+    assert motivos == ["entrada 'bruto' alterada (d1 -> d2)"]
+
+    digests["bruto:latest"] = "d1"
+    (codigo / "run.py").write_text("print('v2')\n")
+    passo.parametros["local_data_dir"] = "outro"
+    motivos = cache.verificar(passo, cache.componentes_chave(passo, [str(codigo)]))
+    assert motivos == ["parametros alterado", "codigo alterado"]
+
+
+def test_cache_saida_removida_ou_sem_digest(tmp_path):
+    codigo, digests, cache, passo = _fixture(tmp_path)
+    partes = cache.componentes_chave(passo, [str(codigo)])
+    cache.registrar(passo, partes)
+    digests.pop("parquet:latest")
+    assert cache.verificar(passo, partes) == ["saída 'parquet' alterada ou ausente (p1 -> None)"]
+
+    digests.pop("bruto:latest")
+    partes = cache.componentes_chave(passo, [str(codigo)])
+    assert cache.verificar(passo, partes)[0].startswith("entradas sem digest")
+    cache.invalidar()
+    assert cache.registros == {}
+
+
+def test_cache_nunca_pula_passo_sem_entradas(tmp_path):
+    codigo, digests, cache, _ = _fixture(tmp_path)
+    download = Passo("download", "get_data", {"sample": "url"}, saidas=["bruto"])
+    partes = cache.componentes_chave(download, [str(codigo)])
+    cache.registrar(download, partes)
+    assert "download" not in cache.registros
+    assert cache.verificar(download, partes) == ["sem artefatos de entrada (fonte externa)"]
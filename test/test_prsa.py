@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.get_data.wandb_utils.prsa import carregar_prsa, gravar_parquet_prsa, montar_datetime, relatorio_memoria
+
+HEADER = "No,year,month,day,hour,PM2.5,PM10,SO2,NO2,CO,O3,TEMP,PRES,DEWP,RAIN,wd,WSPM,station\n"
+
+@pytest.fixture
+def station_files(tmp_path):
+    paths = []
+    for station in ["Aotizhongxin", "Changping"]:
+        path = tmp_path / f"PRSA_Data_{station}.csv"
+        with open(path, "w") as f:
+            f.write(HEADER)
+            f.write(f"1,2013,3,1,0,4,4,4,7,300,77,-0.7,1023,-18.8,0,NNW,4.4,{station}\n")
+            f.write(f"2,2016,2,29,23,NA,8,4,7,300,77,-1.1,1023.2,-18.2,0,,4.7,{station}\n")
+        paths.append(str(path))
+    return paths
+
+def test_montar_datetime_matches_pandas():
+    df = pd.DataFrame({"year": [2013, 2016, 2017], "month": [3, 2, 12], "day": [1, 29, 31], "hour": [0, 23, 5]})
+    esperado = pd.to_datetime(df[["year", "month", "day", "hour"]]).to_numpy()
+    assert np.array_equal(montar_datetime(df["year"], df["month"], df["day"], df["hour"]), esperado)
+
+def test_carregar_prsa_compact_types_and_index(station_files):
+    df = carregar_prsa(station_files, max_workers=2)
+    assert len(df) == 4
+    assert isinstance(df.index, pd.DatetimeIndex)
+    assert df.index[1] == pd.Timestamp("2016-02-29 23:00")
+    assert df["PM2.5"].dtype == np.float32
+    assert np.isnan(df["PM2.5"].iloc[1])
+    assert list(df["station"].cat.categories) == ["Aotizhongxin", "Changping"]
+    assert isinstance(df["wd"].dtype, pd.CategoricalDtype)
+
+def test_carregar_prsa_reads_only_requested_columns(station_files):
+    df = carregar_prsa(station_files, colunas=["PM2.5", "TEMP"])
+    assert list(df.columns) == ["PM2.5", "TEMP", "station"]
+
+def test_carregar_prsa_starts_after_watermarks(station_files):
+    marcas = {"Aotizhongxin": "2013-03-01T00:00:00", "Changping": "2016-02-29T23:00:00"}
+    df = carregar_prsa(station_files, marcas=marcas)
+    # Changping não tem linhas novas e nem é lido
+    assert list(df["No"]) == [2]
+    assert list(df["station"]) == ["Aotizhongxin"]
+    assert df.index[0] == pd.Timestamp("2016-02-29 23:00")
+    assert df["PM10"].dtype == np.float32
+    assert len(carregar_prsa(station_files, marcas={"Outra": "2020-01-01T00:00:00"})) == 4
+
+def test_relatorio_memoria_reports_reduction(tmp_path):
+    path = tmp_path / "PRSA_Data_Dongsi.csv"
+    with open(path, "w") as f:
+        f.write(HEADER)
+        for i in range(1000):
+            f.write(f"{i + 1},2013,3,1,{i % 24},4,4,4,7,300,77,-0.7,1023,-18.8,0,NNW,4.4,Dongsi\n")
+    relatorio = relatorio_memoria(carregar_prsa([str(path)]))
+    assert relatorio["depois_bytes"] < relatorio["antes_bytes"] / 2
+    assert relatorio["colunas"]["PM2.5"] == {"antes_bytes": 8000, "depois_bytes": 4000}
+
+def test_gravar_parquet_prsa_names_appended_parts_by_label(station_files, tmp_path):
+    df = carregar_prsa(station_files)
+    path = tmp_path / "out"
+    gravar_parquet_prsa(df, str(path))
+    gravar_parquet_prsa(df.iloc[:1], str(path), acrescentar=True, parte="2013030100")
+    assert sorted(p.name for p in (path / "station=Aotizhongxin" / "year=2013").iterdir()) == [
+        "part-0.parquet", "parte-2013030100-0.parquet"]
+    with pytest.raises(ValueError):
+        gravar_parquet_prsa(df, str(path), acrescentar=True)
@@ -1,20 +1,8 @@
 import os
-import types
 import pytest
 
 import components.get_data.run as run
 
-class DummyWandbRun:
-    def __init__(self):
-        self.logged_artifacts = []
-        self.config = types.SimpleNamespace()
-        self.config.update = lambda d: None
-        self.finished = False
-    def log_artifact(self, artifact):
-        self.logged_artifacts.append(artifact)
-    def finish(self):
-        self.finished = True
-
 class DummyArtifact:
     def __init__(self, name, type, description):
         self.name = name
@@ -27,8 +15,8 @@ class DummyArtifact:
         pass
 
 @pytest.fixture
-def dummy_wandb(monkeypatch):
-    dummy_run = DummyWandbRun()
+def dummy_wandb(monkeypatch, make_wandb_run):
+    dummy_run = make_wandb_run()
     dummy_api = type("DummyApi", (), {"artifact": lambda self, name: True})()
     monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: dummy_run)
     monkeypatch.setattr(run.wandb, "Artifact", lambda n, type, description: DummyArtifact(n, type, description))
@@ -37,12 +25,16 @@ def dummy_wandb(monkeypatch):
 
 @pytest.fixture
 def dummy_utils(monkeypatch, tmp_path):
+    # Isola os diretórios de dados e de cache criados por run.go
+    monkeypatch.chdir(tmp_path)
     # Mock download_file
     def fake_download_file(url, output_path):
         with open(output_path, "w") as f:
             f.write("col1,col2\n1,2\n")
+        return True
     # Mock extract_csv_from_zip
-    def fake_extract_csv_from_zip(zip_path, extract_dir=None):
+    def fake_extract_csv_from_zip(zip_path, diretorio_extracao=None, delete_zip_after_extraction=True, **kwargs):
+        extract_dir = diretorio_extracao
         if extract_dir is None:
             extract_dir = ".data"
         csv_path = os.path.join(extract_dir, "file.csv")
@@ -63,10 +55,11 @@ def dummy_utils(monkeypatch, tmp_path):
     monkeypatch.setattr(run, "log_artifact", fake_log_artifact)
     monkeypatch.setattr(run, "artifact_exists", fake_artifact_exists)
 
-def make_args(sample, artifact_name="test_art", artifact_type="dataset", artifact_description="desc"):
+def make_args(sample, artifact_name="test_art", artifact_type="dataset", artifact_description="desc", local_data_dir="data"):
     class Args:
         pass
     args = Args()
+    args.local_data_dir = local_data_dir
     args.sample = sample
     args.artifact_name = artifact_name
     args.artifact_type = artifact_type
@@ -81,8 +74,7 @@ def test_go_with_csv(tmp_path, dummy_wandb, dummy_utils):
     run.go(args)
     assert dummy_wandb.logged_artifacts
     artifact = dummy_wandb.logged_artifacts[0]
-    expected_paths = [os.path.join("data", "file.csv"), os.path.join(".data", "file.csv")]
-    assert artifact.files[0] in expected_paths
+    assert artifact.files[0] == os.path.join("data", "test_art", "file.csv")
     assert artifact.name == "test_art"
 
 def test_go_with_zip(tmp_path, dummy_wandb, dummy_utils):
@@ -100,4 +92,66 @@ def test_go_with_invalid_file(tmp_path, dummy_wandb, dummy_utils):
         f.write("not a csv or zip")
     run.go(args)
     # Nenhum artifact deve ser logado
-    assert not dummy_wandb.logged_artifacts
\ No newline at end of file
+    assert not dummy_wandb.logged_artifacts
+
+def test_go_uses_cache_on_second_run(tmp_path, dummy_wandb, dummy_utils, monkeypatch):
+    args = make_args("http://example.com/file.zip")
+    run.go(args)
+    downloads = []
+    monkeypatch.setattr(run, "download_file", lambda *a, **kw: downloads.append(a))
+    monkeypatch.setattr(run.CacheDownloads, "_revalidar", lambda self, url, entrada: entrada)
+    run.go(args)
+    assert downloads == []
+    assert len(dummy_wandb.logged_artifacts) == 2
+    assert dummy_wandb.logged_artifacts[1].files[0].endswith("file.csv")
+
+def test_go_fetches_sources_concurrently_with_retries(tmp_path, dummy_wandb, dummy_utils, monkeypatch):
+    import time
+    attempts = {}
+    def slow_download(url, output_path):
+        attempts[url] = attempts.get(url, 0) + 1
+        time.sleep(0.3)
+        if url.endswith("b.csv") and attempts[url] == 1:
+            return False
+        with open(output_path, "w") as f:
+            f.write("col1,col2\n1,2\n")
+        return True
+    monkeypatch.setattr(run, "download_file", slow_download)
+    monkeypatch.setattr(run, "espera_backoff", lambda attempt, base: 0)
+    args = make_args("http://a.example.com/a.csv,http://b.example.com/b.csv,http://c.example.com/c.csv", artifact_name="a,b,c")
+    start = time.perf_counter()
+    run.go(args)
+    elapsed = time.perf_counter() - start
+    assert attempts["http://b.example.com/b.csv"] == 2
+    assert sorted(a.name for a in dummy_wandb.logged_artifacts) == ["a", "b", "c"]
+    # Próximo do mais lento (b, duas tentativas), não da soma das quatro tentativas
+    assert elapsed < 1.0
+
+def test_go_extracts_each_source_into_its_own_directory(tmp_path, dummy_wandb, dummy_utils):
+    # As duas fontes têm o mesmo nome de arquivo e o mesmo CSV dentro do zip
+    run.go(make_args("http://a.example.com/file.zip,http://b.example.com/file.zip", artifact_name="a,b"))
+    files = {a.name: a.files[0] for a in dummy_wandb.logged_artifacts}
+    assert files == {"a": os.path.join("data", "a", "file.csv"), "b": os.path.join("data", "b", "file.csv")}
+
+def test_go_requires_one_artifact_name_per_source(tmp_path, dummy_wandb, dummy_utils):
+    run.go(make_args("http://example.com/a.csv,http://example.com/b.csv", artifact_name="only_one"))
+    assert not dummy_wandb.logged_artifacts
+
+def test_go_writes_phase_trace(tmp_path, dummy_wandb, dummy_utils):
+    import json
+    args = make_args("http://example.com/file.zip")
+    run.go(args)
+    (trace_file,) = (tmp_path / "data" / "traces").glob("get_data_*.json")
+    phases = [fase["fase"] for fase in json.loads(trace_file.read_text())["fases"]]
+    assert phases == ["download:test_art", "extract:test_art", "fetch", "upload:test_art"]
+
+def test_download_with_retries_uses_parallel_parts(monkeypatch):
+    calls = []
+    def fake_paralelo(url, output_path, num_partes, manter_parcial):
+        calls.append((num_partes, manter_parcial))
+        return len(calls) == 2
+    monkeypatch.setattr(run, "download_file_paralelo", fake_paralelo)
+    monkeypatch.setattr(run, "espera_backoff", lambda attempt, base: 0)
+    assert run.download_with_retries("http://example.com/a.zip", "a.zip", retries=2, parts=4)
+    # Só a última tentativa descarta os arquivos parciais
+    assert calls == [(4, True), (4, False)]
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.get_data.wandb_utils.prsa import COLUNAS_PRSA, DTYPES_PRSA
+from components.get_data.wandb_utils.uci import eh_csv_uci, ler_csv_uci
+
+HEADER = "Date;Time;CO(GT);PT08.S1(CO);NMHC(GT);C6H6(GT);PT08.S2(NMHC);NOx(GT);PT08.S3(NOx);NO2(GT);PT08.S4(NO2);PT08.S5(O3);T;RH;AH;;"
+
+
+def write_uci_csv(path, n, blank_rows=3):
+    idx = pd.date_range("2004-03-10 18:00", periods=n, freq="h")
+    lines = [HEADER]
+    for i, t in enumerate(idx):
+        co = "-200" if i % 5 == 0 else f"{1 + i % 3},{i % 10}"
+        lines.append(f"{t:%d/%m/%Y};{t:%H.%M.%S};{co};1360;150;11,9;1046;166;1056;{100 + i};1692;1268;13,6;48,9;0,7578;;")
+    lines += [";;;;;;;;;;;;;;;;"] * blank_rows
+    path.write_text("\r\n".join(lines) + "\r\n")
+    return idx
+
+
+def test_eh_csv_uci_checks_header(tmp_path):
+    write_uci_csv(tmp_path / "AirQuality.csv", 2)
+    (tmp_path / "prsa.csv").write_text("No,year,month,day,hour,station\n")
+    assert eh_csv_uci(str(tmp_path / "AirQuality.csv"))
+    assert not eh_csv_uci(str(tmp_path / "prsa.csv"))
+
+
+def test_ler_csv_uci_returns_prsa_shaped_frame(tmp_path):
+    idx = write_uci_csv(tmp_path / "AirQuality.csv", 50)
+    df = ler_csv_uci(str(tmp_path / "AirQuality.csv"))
+    assert df.index.equals(pd.DatetimeIndex(idx, name="datetime"))
+    assert list(df.columns[:len(COLUNAS_PRSA)]) == COLUNAS_PRSA
+    assert df["CO"].dtype == np.float32 and df["year"].dtype == DTYPES_PRSA["year"]
+    # -200 vira NaN, vírgula decimal e mg/m³ -> µg/m³
+    assert df["CO"].isna().sum() == 10
+    assert df["CO"].iloc[1] == 2100.0
+    assert df["TEMP"].iloc[0] == np.float32(13.6)
+    assert df["NO2"].iloc[49] == 149.0
+    # Ponto de orvalho (Magnus) de 13,6 °C e 48,9% de umidade relativa
+    assert df["DEWP"].iloc[0] == pytest.approx(3.05, abs=0.01)
+    assert df["PM2.5"].isna().all() and df["wd"].isna().all()
+    assert (df["station"] == "AirQuality").all()
+    assert list(df["No"][:3]) == [1, 2, 3]
+    assert "C6H6" in df.columns and "" not in df.columns
+
+
+def test_ler_csv_uci_blocks_match_single_read(tmp_path):
+    write_uci_csv(tmp_path / "AirQuality.csv", 500)
+    whole = ler_csv_uci(str(tmp_path / "AirQuality.csv"))
+    blocks = ler_csv_uci(str(tmp_path / "AirQuality.csv"), max_workers=4, tamanho_bloco=1000)
+    pd.testing.assert_frame_equal(blocks, whole)
+
+
+def test_ler_csv_uci_starts_after_watermark(tmp_path):
+    idx = write_uci_csv(tmp_path / "AirQuality.csv", 200)
+    whole = ler_csv_uci(str(tmp_path / "AirQuality.csv"))
+    new = ler_csv_uci(str(tmp_path / "AirQuality.csv"), tamanho_bloco=1000, marca=idx[149].isoformat())
+    pd.testing.assert_frame_equal(new, whole.iloc[150:])
+    assert ler_csv_uci(str(tmp_path / "AirQuality.csv"), marca=idx[-1].isoformat()).empty
+
+
+def test_ler_csv_uci_falls_back_for_non_padded_dates(tmp_path):
+    (tmp_path / "AirQuality.csv").write_text(HEADER + "\n1/4/2004;9.00.00;2,6;1;1;1;1;1;1;1;1;1;10;50;1;;\n")
+    df = ler_csv_uci(str(tmp_path / "AirQuality.csv"), estacao="Italia")
+    assert df.index[0] == pd.Timestamp("2004-04-01 09:00")
+    assert df["station"].iloc[0] == "Italia"
@@ -3,9 +3,17 @@ import shutil
 import zipfile
 import tempfile
 import pytest
+import re
 import sys
+import hashlib
+import requests
 
-from components.get_data.wandb_utils.utils import download_file, extract_csv_from_zip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import components.get_data.wandb_utils.utils as utils
+from components.get_data.wandb_utils.utils import download_file, download_file_paralelo, extract_csv_from_zip, iter_csv_from_zip
 
 @pytest.fixture
 def temp_dir():
@@ -13,21 +21,166 @@ def temp_dir():
     yield d
     shutil.rmtree(d)
 
+class FakeStreamResponse:
+    def __init__(self, content, fail_after=None):
+        self.content_bytes = content
+        self.fail_after = fail_after
+        self.headers = {"Content-Length": str(len(content)), "ETag": '"abc"'}
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def raise_for_status(self): pass
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content_bytes), chunk_size):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise requests.exceptions.ConnectionError("conexão perdida")
+            yield self.content_bytes[i:i + chunk_size]
+
 def test_download_file_success(monkeypatch, temp_dir):
     url = "http://example.com/test.csv"
     output_path = os.path.join(temp_dir, "test.csv")
     fake_content = b"col1,col2\n1,2\n3,4"
 
-    class FakeResponse:
-        def raise_for_status(self): pass
-        @property
-        def content(self): return fake_content
-
-    monkeypatch.setattr("requests.get", lambda u: FakeResponse())
-    download_file(url, output_path)
+    monkeypatch.setattr("requests.get", lambda u, **kw: FakeStreamResponse(fake_content))
+    resultado = download_file(url, output_path, tamanho_chunk=4)
+    assert resultado
     assert os.path.exists(output_path)
     with open(output_path, "rb") as f:
         assert f.read() == fake_content
+    assert resultado.bytes_baixados == len(fake_content)
+    assert resultado.hash == hashlib.sha256(fake_content).hexdigest()
+    assert resultado.etag == '"abc"'
+
+def test_download_file_reports_progress_in_chunks(monkeypatch, temp_dir):
+    fake_content = b"x" * 10
+    chamadas = []
+    monkeypatch.setattr("requests.get", lambda u, **kw: FakeStreamResponse(fake_content))
+    download_file("http://example.com/x.bin", os.path.join(temp_dir, "x.bin"), tamanho_chunk=3,
+                  progresso=lambda baixados, total: chamadas.append((baixados, total)))
+    assert chamadas == [(3, 10), (6, 10), (9, 10), (10, 10)]
+
+def test_download_file_failure_leaves_no_partial_file(monkeypatch, temp_dir):
+    output_path = os.path.join(temp_dir, "test.csv")
+    monkeypatch.setattr("requests.get", lambda u, **kw: FakeStreamResponse(b"abcdefgh", fail_after=4))
+    resultado = download_file("http://example.com/test.csv", output_path, tamanho_chunk=2)
+    assert not resultado
+    assert os.listdir(temp_dir) == []
+
+class RangeHandler(BaseHTTPRequestHandler):
+    # Servidor local que imita um host de arquivos com suporte opcional a Range
+    content = b""
+    accept_ranges = True
+    requested_ranges = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        content = type(self).content
+        range_header = self.headers.get("Range")
+        if range_header and type(self).accept_ranges:
+            inicio, fim = range_header.split("=")[1].split("-")
+            inicio, fim = int(inicio), min(int(fim), len(content) - 1)
+            type(self).requested_ranges.append((inicio, fim))
+            corpo = content[inicio:fim + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {inicio}-{fim}/{len(content)}")
+        else:
+            corpo = content
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(corpo)
+
+@pytest.fixture
+def http_server():
+    handler = type("Handler", (RangeHandler,), {"content": os.urandom(64 * 1024), "requested_ranges": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield handler, f"http://127.0.0.1:{server.server_port}/dados.zip"
+    server.shutdown()
+
+def test_download_file_paralelo_splits_in_ranges(http_server, temp_dir):
+    handler, url = http_server
+    output_path = os.path.join(temp_dir, "dados.zip")
+    resultado = download_file_paralelo(url, output_path, num_partes=4, tamanho_parte_minimo=8 * 1024,
+                                       tamanho_chunk=4096)
+    assert resultado
+    with open(output_path, "rb") as f:
+        assert f.read() == handler.content
+    assert resultado.hash == hashlib.sha256(handler.content).hexdigest()
+    # 1 sonda + 4 partes
+    assert len(handler.requested_ranges) == 5
+    assert not os.path.exists(output_path + ".estado.json")
+
+def test_download_file_paralelo_falls_back_without_range(http_server, temp_dir):
+    handler, url = http_server
+    handler.accept_ranges = False
+    output_path = os.path.join(temp_dir, "dados.zip")
+    resultado = download_file_paralelo(url, output_path, tamanho_parte_minimo=8 * 1024)
+    assert resultado
+    with open(output_path, "rb") as f:
+        assert f.read() == handler.content
+
+def test_download_file_paralelo_fallback_removes_partial_files(http_server, temp_dir):
+    handler, url = http_server
+    handler.accept_ranges = False
+    output_path = os.path.join(temp_dir, "dados.zip")
+    for sufixo in (".part", ".estado.json"):
+        with open(output_path + sufixo, "w") as f:
+            f.write("{}")
+    assert download_file_paralelo(url, output_path, tamanho_parte_minimo=8 * 1024)
+    assert os.listdir(temp_dir) == ["dados.zip"]
+
+def test_download_file_paralelo_final_failure_removes_partial_files(http_server, temp_dir, monkeypatch):
+    handler, url = http_server
+    output_path = os.path.join(temp_dir, "dados.zip")
+    sondagem = utils._sondar_suporte_range
+    monkeypatch.setattr(utils, "_sondar_suporte_range", lambda *a: dict(sondagem(*a), tamanho=len(handler.content) + 1))
+    # O servidor entrega um byte a menos que o anunciado: as partes nunca se completam
+    resultado = download_file_paralelo(url, output_path, tamanho_parte_minimo=8 * 1024, tentativas=1)
+    assert not resultado
+    assert sorted(os.listdir(temp_dir)) == ["dados.zip.estado.json", "dados.zip.part"]
+    resultado = download_file_paralelo(url, output_path, tamanho_parte_minimo=8 * 1024, tentativas=1, manter_parcial=False)
+    assert not resultado
+    assert os.listdir(temp_dir) == []
+
+def test_download_file_paralelo_disk_error_returns_failure(http_server, temp_dir, monkeypatch):
+    _, url = http_server
+    output_path = os.path.join(temp_dir, "dados.zip")
+    def open_sem_espaco(caminho, modo="r", *args, **kwargs):
+        if modo == "r+b":
+            raise OSError(28, "No space left on device")
+        return open(caminho, modo, *args, **kwargs)
+    monkeypatch.setattr(utils, "open", open_sem_espaco, raising=False)
+    resultado = download_file_paralelo(url, output_path, tamanho_parte_minimo=8 * 1024)
+    assert not resultado
+    assert sorted(os.listdir(temp_dir)) == ["dados.zip.estado.json", "dados.zip.part"]
+    resultado = download_file_paralelo(url, output_path, tamanho_parte_minimo=8 * 1024, manter_parcial=False)
+    assert not resultado
+    assert os.listdir(temp_dir) == []
+
+def test_download_file_paralelo_resumes_from_state(http_server, temp_dir):
+    handler, url = http_server
+    output_path = os.path.join(temp_dir, "dados.zip")
+    tamanho = len(handler.content)
+    metade = tamanho // 2
+    # Simula uma execução anterior interrompida com a primeira metade já em disco
+    with open(output_path + ".part", "wb") as f:
+        f.write(handler.content[:metade])
+        f.truncate(tamanho)
+    estado = {"url": url, "tamanho": tamanho, "etag": '"v1"', "last_modified": None,
+              "partes": [{"inicio": 0, "fim": metade - 1, "baixados": metade},
+                         {"inicio": metade, "fim": tamanho - 1, "baixados": 0}]}
+    with open(output_path + ".estado.json", "w") as f:
+        json.dump(estado, f)
+    resultado = download_file_paralelo(url, output_path, tamanho_parte_minimo=8 * 1024)
+    assert resultado
+    assert resultado.bytes_baixados == tamanho - metade
+    assert handler.requested_ranges[1:] == [(metade, tamanho - 1)]
+    with open(output_path, "rb") as f:
+        assert f.read() == handler.content
 
 def test_extract_csv_from_zip_creates_dir_and_extracts(temp_dir):
     # Cria um zip com dois CSVs e um TXT
@@ -57,4 +210,124 @@ def test_extract_csv_from_zip_no_csv(temp_dir):
     os.makedirs(extract_dir, exist_ok=True)
     csv_files = extract_csv_from_zip(zip_path, extract_dir)
     assert csv_files == []
-    assert not os.path.exists(zip_path)
\ No newline at end of file
+    assert not os.path.exists(zip_path)
+
+def make_prsa_zip(temp_dir):
+    zip_path = os.path.join(temp_dir, "prsa.zip")
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        for station in ["Aotizhongxin", "Changping", "Dingling"]:
+            z.writestr(f"PRSA_Data/PRSA_Data_{station}_20130301-20170228.csv", f"station\n{station}\n")
+        z.writestr("PRSA_Data/readme.csv", "x\n1\n")
+    return zip_path
+
+def test_extract_csv_from_zip_parallel_with_glob_filter(temp_dir):
+    zip_path = make_prsa_zip(temp_dir)
+    extract_dir = os.path.join(temp_dir, "out")
+    csv_files = extract_csv_from_zip(zip_path, extract_dir, filtro="PRSA_Data_*.csv", max_workers=3)
+    assert sorted(os.path.basename(f) for f in csv_files) == [
+        "PRSA_Data_Aotizhongxin_20130301-20170228.csv",
+        "PRSA_Data_Changping_20130301-20170228.csv",
+        "PRSA_Data_Dingling_20130301-20170228.csv",
+    ]
+    for f in csv_files:
+        with open(f) as fh:
+            assert fh.read().startswith("station\n")
+
+def test_iter_csv_from_zip_streams_without_extracting(temp_dir):
+    zip_path = make_prsa_zip(temp_dir)
+    lidos = {nome: stream.read() for nome, stream in iter_csv_from_zip(
+        zip_path, filtro=re.compile(r"Changping|Dingling"), encoding="utf-8")}
+    assert sorted(os.path.basename(n) for n in lidos) == [
+        "PRSA_Data_Changping_20130301-20170228.csv",
+        "PRSA_Data_Dingling_20130301-20170228.csv",
+    ]
+    assert all(v.startswith("station\n") for v in lidos.values())
+    assert os.listdir(temp_dir) == ["prsa.zip"]
+
+class FakeArtifact:
+    def __init__(self, name):
+        self.name = name
+        self.version = "v3"
+        self.digest = "d" * 32
+        self.metadata = {"linhas": 10}
+
+class FakeApi:
+    def __init__(self, existing):
+        self.existing = existing
+        self.calls = []
+    def artifact(self, path):
+        self.calls.append(path)
+        name = path.split("/", 1)[1]
+        if name == "offline:latest":
+            raise utils.wandb.errors.CommError("HTTP 502", ConnectionError("reset"))
+        if name not in self.existing:
+            raise utils.wandb.errors.CommError(f"artifact {name!r} not found", ValueError(name))
+        return FakeArtifact(name)
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    api = FakeApi({"a:latest", "b:latest"})
+    created = []
+    monkeypatch.setattr(utils.wandb, "Api", lambda: created.append(1) or api)
+    utils.limpar_cache_artefatos(descartar_api=True)
+    yield api, created
+    utils.limpar_cache_artefatos(descartar_api=True)
+
+def test_artifact_exists_memoizes_lookups_and_client(fake_api):
+    api, created = fake_api
+    assert utils.artifact_exists("proj", "a:latest")
+    assert utils.artifact_exists("proj", "a:latest")
+    assert not utils.artifact_exists("proj", "x:latest")
+    assert not utils.artifact_exists("proj", "x:latest")
+    assert api.calls == ["proj/a:latest", "proj/x:latest"]
+    assert created == [1]
+    assert utils.obter_metadados_artefato("proj", "a:latest")["versao"] == "v3"
+
+def test_artifact_exists_ttl_expires(fake_api):
+    api, _ = fake_api
+    utils.artifact_exists("proj", "a:latest", ttl=0)
+    utils.artifact_exists("proj", "a:latest", ttl=0)
+    assert len(api.calls) == 2
+
+def test_artifact_lookup_does_not_cache_communication_errors(fake_api):
+    api, _ = fake_api
+    assert not utils.artifact_exists("proj", "offline:latest")
+    assert not utils.artifact_exists("proj", "offline:latest")
+    assert api.calls == ["proj/offline:latest", "proj/offline:latest"]
+
+def test_obter_metadados_artefatos(fake_api):
+    api, _ = fake_api
+    utils.artifact_exists("proj", "a:latest")
+    result = utils.obter_metadados_artefatos("proj", ["a:latest", "b:latest", "c:latest", "b:latest"])
+    assert set(result) == {"a:latest", "b:latest", "c:latest"}
+    assert result["b:latest"]["digest"] == "d" * 32
+    assert result["c:latest"] is None
+    assert sorted(api.calls) == ["proj/a:latest", "proj/b:latest", "proj/c:latest"]
+
+def test_limitador_por_host():
+    import threading
+    import time
+    limitador = utils.LimitadorPorHost(max_por_host=2)
+    assert limitador("http://a.com/x.zip") is limitador("http://A.com/y.zip")
+    assert limitador("http://a.com/x.zip") is not limitador("http://b.com/x.zip")
+
+    ativos, pico, trava = [0], [0], threading.Lock()
+    def baixar():
+        with limitador("http://a.com/x.zip"):
+            with trava:
+                ativos[0] += 1
+                pico[0] = max(pico[0], ativos[0])
+            time.sleep(0.05)
+            with trava:
+                ativos[0] -= 1
+    threads = [threading.Thread(target=baixar) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert pico[0] == 2
+
+def test_espera_backoff_cresce_e_respeita_maximo():
+    assert 0.5 <= utils.espera_backoff(1, 1.0) <= 1.0
+    assert 2.0 <= utils.espera_backoff(3, 1.0) <= 4.0
+    assert utils.espera_backoff(10, 1.0, espera_maxima=5.0) <= 5.0
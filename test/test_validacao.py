@@ -0,0 +1,100 @@
+import pytest
+
+from components.get_data.wandb_utils.validacao import ESQUEMA_PRSA, validar, validar_arquivo
+
+HEADER = "No,year,month,day,hour,PM2.5,PM10,SO2,NO2,CO,O3,TEMP,PRES,DEWP,RAIN,wd,WSPM,station\n"
+
+def row(i, day=1, hour=0, pm="4", temp="-0.7", station="Dongsi"):
+    return f"{i},2013,3,{day},{hour},{pm},4,4,7,300,77,{temp},1023,-18.8,0,NNW,4.4,{station}\n"
+
+def write_csv(path, rows, header=HEADER):
+    path.write_text(header + "".join(rows))
+    return str(path)
+
+def hourly_rows(n, **kw):
+    return [row(i + 1, day=1 + i // 24, hour=i % 24, **kw) for i in range(n)]
+
+def test_clean_file_passes_with_continuity_report(tmp_path):
+    path = write_csv(tmp_path / "a.csv", hourly_rows(48))
+    report = validar_arquivo(path, tamanho_bloco=10)
+    assert report["aprovado"], report["violacoes"]
+    assert report["linhas"] == 48
+    assert report["estacoes"]["Dongsi"] == {
+        "inicio": "2013-03-01T00", "fim": "2013-03-02T23", "horas_esperadas": 48,
+        "lacunas": 0, "maior_lacuna_horas": 0, "duplicadas": 0,
+    }
+
+def test_detects_gaps_duplicates_ranges_types_and_nulls(tmp_path):
+    rows = hourly_rows(48)
+    del rows[10:20]
+    rows.append(row(99, day=1, hour=0))
+    rows[1] = row(2, hour=1, pm="abc")
+    rows[2] = row(3, hour=2, temp="95")
+    rows[3] = row(4, hour=3, pm="")
+    rows.append(row(100, day=30, hour=0).replace(",3,30,", ",2,30,"))
+    report = validar_arquivo(write_csv(tmp_path / "a.csv", rows), limites={"max_razao_nulos": 0.01})
+    assert not report["aprovado"]
+    assert report["colunas"]["PM2.5"] == {"nulos": 1, "invalidos": 1}
+    assert report["colunas"]["TEMP"] == {"fora_da_faixa": 1}
+    assert report["datas_invalidas"] == 1
+    assert report["estacoes"]["Dongsi"]["duplicadas"] == 1
+    assert report["estacoes"]["Dongsi"]["lacunas"] == 10
+    assert report["estacoes"]["Dongsi"]["maior_lacuna_horas"] == 10
+    assert len(report["violacoes"]) == 6
+
+def test_shifted_columns_fail_on_missing_columns_and_types(tmp_path):
+    shifted = HEADER.replace("PM2.5,", "")
+    report = validar_arquivo(write_csv(tmp_path / "a.csv", hourly_rows(5), header=shifted))
+    assert report["colunas_faltantes"] == ["PM2.5"]
+    assert report["linhas"] == 0
+    assert not report["aprovado"]
+
+def test_unknown_schema_fails_unless_allowed(tmp_path):
+    path = write_csv(tmp_path / "x.csv", ["1;2\n"], header="x;y\n")
+    assert not validar_arquivo(path)["aprovado"]
+    report = validar_arquivo(path, limites={"permitir_esquema_desconhecido": True})
+    assert report["aprovado"]
+    assert report["avisos"]
+
+UCI_HEADER = "Date;Time;CO(GT);PT08.S1(CO);NMHC(GT);C6H6(GT);PT08.S2(NMHC);NOx(GT);PT08.S3(NOx);NO2(GT);PT08.S4(NO2);PT08.S5(O3);T;RH;AH;;\n"
+
+def uci_rows(n, co="2,6", temp="13,6"):
+    return [f"{10 + i // 24:02d}/03/2004;{i % 24:02d}.00.00;{co};1360;-200;11,9;1046;166;1056;113;1692;1268;{temp};48,9;0,7578;;\n"
+            for i in range(n)]
+
+def test_uci_file_is_checked_against_its_schema(tmp_path):
+    path = write_csv(tmp_path / "AirQuality.csv", uci_rows(48) + [";;;;;;;;;;;;;;;;\n"] * 2, header=UCI_HEADER)
+    report = validar_arquivo(path, tamanho_bloco=10)
+    assert report["esquema"] == "uci"
+    assert report["aprovado"], report["violacoes"]
+    assert report["linhas"] == 48
+    # -200 é ausente; o NMHC(GT) tolera até 100% de nulos
+    assert report["colunas"] == {"NMHC(GT)": {"nulos": 48}}
+    assert report["estacoes"]["AirQuality"]["horas_esperadas"] == 48
+
+def test_uci_file_fails_on_ranges_types_and_gaps(tmp_path):
+    rows = uci_rows(48)
+    rows[1] = uci_rows(2, temp="95,0")[1]
+    rows[2] = uci_rows(3, co="abc")[2]
+    del rows[10:20]
+    report = validar_arquivo(write_csv(tmp_path / "AirQuality.csv", rows, header=UCI_HEADER))
+    assert report["colunas"]["T"] == {"fora_da_faixa": 1}
+    assert report["colunas"]["CO(GT)"] == {"invalidos": 1}
+    assert report["estacoes"]["AirQuality"]["lacunas"] == 10
+    assert len(report["violacoes"]) == 3
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_validar_fails_fast(tmp_path, processes):
+    bad = write_csv(tmp_path / "a.csv", hourly_rows(24, temp="200"))
+    good = [write_csv(tmp_path / f"b{i}.csv", hourly_rows(24, station=f"S{i}")) for i in range(6)]
+    report = validar([bad] + good, processos=processes)
+    assert not report["aprovado"]
+    assert report["violacoes"][0].startswith(bad)
+    complete = validar([bad] + good, processos=processes, parar_na_primeira_falha=False)
+    assert len(complete["arquivos"]) == 7
+    assert not complete["interrompido"]
+    if processes == 1:
+        assert report["interrompido"] and len(report["arquivos"]) == 1
+
+def test_schema_declares_ranges_for_requested_columns():
+    assert {"PM2.5", "PM10", "SO2", "NO2", "CO", "O3", "TEMP", "PRES"} <= set(ESQUEMA_PRSA["faixas"])
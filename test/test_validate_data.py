@@ -0,0 +1,50 @@
+import os
+import json
+import pytest
+
+import components.validate_data.run as run
+
+HEADER = "No,year,month,day,hour,PM2.5,PM10,SO2,NO2,CO,O3,TEMP,PRES,DEWP,RAIN,wd,WSPM,station\n"
+
+def make_args(tmp_path, **kw):
+    args = run.build_parser().parse_args([
+        "--input_artifact", "AirQuality.csv:latest", "--artifact_name", "validation",
+        "--artifact_type", "validation_report", "--artifact_description", "desc",
+        "--local_data_dir", str(tmp_path / "data"),
+    ])
+    vars(args).update(kw)
+    return args
+
+def write_station(path, pm="4"):
+    with open(path, "w") as f:
+        f.write(HEADER)
+        for i in range(24):
+            f.write(f"{i + 1},2013,3,1,{i},{pm},4,4,7,300,77,-0.7,1023,-18.8,0,NNW,4.4,Dongsi\n")
+
+def test_go_logs_report_and_passes(tmp_path, monkeypatch, make_wandb_run):
+    (tmp_path / "in").mkdir()
+    write_station(tmp_path / "in" / "a.csv")
+    dummy_run = make_wandb_run(str(tmp_path / "in"))
+    logged = []
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: dummy_run)
+    monkeypatch.setattr(run, "log_artifact", lambda name, type, desc, path, wandb_run, **kw: logged.append((path, kw)))
+    run.go(make_args(tmp_path))
+    with open(os.path.join(logged[0][0], run.REPORT_FILE)) as f:
+        report = json.load(f)
+    assert report["aprovado"]
+    assert report["arquivos"][0]["arquivo"] == "a.csv"
+    assert logged[0][1]["metadados"]["aprovado"] is True
+    assert dummy_run.summary["validacao/aprovado"] is True
+
+def test_go_raises_after_logging_report_when_thresholds_are_exceeded(tmp_path, monkeypatch, make_wandb_run):
+    (tmp_path / "in").mkdir()
+    write_station(tmp_path / "in" / "a.csv", pm="5000")
+    dummy_run = make_wandb_run(str(tmp_path / "in"))
+    logged = []
+    monkeypatch.setattr(run.wandb, "init", lambda *a, **kw: dummy_run)
+    monkeypatch.setattr(run, "log_artifact", lambda name, type, desc, path, wandb_run, **kw: logged.append(path))
+    with pytest.raises(run.ErroValidacao, match="a.csv: PM2.5"):
+        run.go(make_args(tmp_path))
+    assert logged and dummy_run.finished
+    # Com um limite mais folgado o mesmo arquivo passa
+    run.go(make_args(tmp_path, max_out_of_range_ratio=1.0))